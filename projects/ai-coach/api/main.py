@@ -4,24 +4,35 @@ WebSocket chat + REST API for sessions.
 """
 
 import sys
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
+from typing import AsyncIterator, Callable, Dict, Optional
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from config import get_config
 from vectorstore import VectorStore
+from embeddings import create_embedding_function
+from embedding_cache import create_embedding_cache
 from rag_engine import RAGEngine
 from conversation_manager import ConversationManager
+from session_registry import SessionRegistry
 from coach import AICoach
+import metrics
 from api.models.schemas import (
     ChatMessage,
+    ChatToken,
     ChatResponse,
+    ChatFinal,
     SessionList,
     Session,
     NewSessionResponse,
@@ -40,44 +51,174 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Map state names to frontend format
+STATE_MAPPING = {
+    "fatigue": "tired",
+    "energie": "energetic",
+    "resistance": "resistance",
+    "normal": None
+}
+
 # Global instances (initialized on startup)
 coach: Optional[AICoach] = None
 conversation_manager: Optional[ConversationManager] = None
 
+# Live chat sessions, one per session ID
+session_registry: Optional[SessionRegistry] = None
+
+# Bounded pool running the blocking coach pipeline (Chroma + Claude) off the event loop
+coach_executor: Optional[ThreadPoolExecutor] = None
+
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize AI Coach components on startup."""
-    global coach, conversation_manager
+    global coach, conversation_manager, session_registry, coach_executor
 
     # Load configuration
     config = get_config()
 
+    # Per-request latency traces as JSON lines
+    metrics.setup_metrics_logging(config.get_metrics_log_path())
+
     # Initialize vectorstore
-    vectorstore = VectorStore(str(config.get_chroma_path()))
+    vectorstore = VectorStore(
+        str(config.get_chroma_path()),
+        query_cache_size=config.query_embedding_cache_size,
+        embedding_function=create_embedding_function(config),
+        embedding_cache=create_embedding_cache(config)
+    )
 
     # Initialize RAG engine
     rag_engine = RAGEngine(vectorstore, config)
 
-    # Initialize conversation manager
+    # Initialize conversation manager (reads saved history)
     conversation_manager = ConversationManager(
         str(config.get_conversation_history_path()),
-        auto_ingest_every=config.auto_ingest_history_every
+        auto_ingest_every=config.auto_ingest_history_every,
+        journal_fsync=config.journal_fsync,
+        compact_every=config.journal_compact_every
     )
 
-    # Start new session
-    conversation_manager.start_new_session()
+    # Index sessions saved before the index existed or by other processes
+    conversation_manager.sync_index()
+
+    # Live sessions of the connected users
+    session_registry = SessionRegistry(
+        str(config.get_conversation_history_path()),
+        auto_ingest_every=config.auto_ingest_history_every,
+        idle_timeout_seconds=config.session_idle_timeout_seconds,
+        max_sessions=config.max_active_sessions,
+        journal_fsync=config.journal_fsync,
+        compact_every=config.journal_compact_every
+    )
+    asyncio.create_task(_evict_idle_sessions())
 
     # Initialize coach
     coach = AICoach(rag_engine, conversation_manager, config)
 
+    # Serve requests right away; the first one waits for whatever is still loading
+    coach.warm_up(background=config.warm_up_in_background)
+
+    coach_executor = ThreadPoolExecutor(
+        max_workers=config.api_max_workers,
+        thread_name_prefix="coach"
+    )
+
     print("✅ AI Coach API initialized successfully")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Save live sessions, finish history ingestion and stop the coach worker pool."""
+    if session_registry is not None:
+        session_registry.save_all()
+    if coach is not None:
+        coach.shutdown(timeout=30)
+    if coach_executor is not None:
+        coach_executor.shutdown(wait=False)
+
+
+async def _evict_idle_sessions(interval_seconds: float = 60):
+    """Periodically save and drop sessions nobody uses anymore."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            evicted = await _run_blocking(session_registry.evict_idle)
+            if evicted:
+                print(f"Evicted {evicted} idle session(s)")
+        except Exception as e:
+            print(f"Session eviction error: {e}")
+
+
+async def _run_blocking(func: Callable, *args):
+    """Run a blocking call on the coach worker pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(coach_executor, func, *args)
+
+
+async def _iterate_blocking(make_iterator: Callable, *args) -> AsyncIterator[Dict]:
+    """
+    Consume a blocking iterator on the coach worker pool.
+
+    Items are handed back to the event loop through a queue as soon as they
+    are produced, so the loop keeps serving other connections meanwhile.
+    Closing this generator early (aclose(), e.g. after a disconnect) stops
+    the producer at its next item, closes the blocking iterator and waits
+    for the worker thread to finish.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    done = object()
+    cancelled = threading.Event()
+
+    def produce():
+        iterator = make_iterator(*args)
+        try:
+            for item in iterator:
+                if cancelled.is_set():
+                    break
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+        finally:
+            # Runs the generator's cleanup (closes the Claude stream) on this thread
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+            loop.call_soon_threadsafe(queue.put_nowait, done)
+
+    producer = loop.run_in_executor(coach_executor, produce)
+
+    try:
+        while True:
+            item = await queue.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        cancelled.set()
+        await producer
+
+
 @app.get("/")
 async def root():
     """Health check endpoint."""
-    return {"status": "ok", "message": "AI Coach API is running"}
+    status = {"status": "ok", "message": "AI Coach API is running"}
+    if coach is not None:
+        status["ingestion_queue_depth"] = coach.ingestion_worker.queue_depth()
+    return status
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Latency and token metrics in Prometheus text format."""
+    return PlainTextResponse(
+        metrics.REGISTRY.render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
 
 
 @app.websocket("/ws/chat")
@@ -85,11 +226,28 @@ async def chat_websocket(websocket: WebSocket):
     """
     WebSocket endpoint for real-time chat.
 
-    Receives: {"message": "user message"}
-    Sends: {"response": "coach response", "state": "fatigue|energie|resistance", "timestamp": "ISO8601"}
+    Connect with ?session_id=... to continue a session (a new one is started otherwise).
+    The first frame is {"type": "session", "session_id": ..., "resumed": bool}.
+
+    Receives: {"message": "user message", "stream": false}
+    Sends: {"response": "coach response", "state": "tired|energetic|resistance", "timestamp": "ISO8601"}
+
+    With "stream": true, sends {"type": "token", "delta": "..."} frames as the
+    reply is generated, then {"type": "final", "response": ..., "state": ..., "timestamp": ...}.
     """
     await websocket.accept()
 
+    # Each connection works on its own session
+    requested_session_id = websocket.query_params.get("session_id")
+    session_manager = await _run_blocking(session_registry.acquire, requested_session_id)
+
+    # Tell the client which session it is on (a new one if the ID was unknown or invalid)
+    await websocket.send_json({
+        "type": "session",
+        "session_id": session_manager.current_session_id,
+        "resumed": session_manager.current_session_id == requested_session_id
+    })
+
     try:
         while True:
             # Receive user message
@@ -103,27 +261,38 @@ async def chat_websocket(websocket: WebSocket):
                 })
                 continue
 
+            if data.get("stream"):
+                # Forward tokens as they arrive
+                events = _iterate_blocking(coach.stream_response, user_message, session_manager)
+                try:
+                    async for event in events:
+                        if event["type"] == "token":
+                            frame = ChatToken(delta=event["text"])
+                        else:
+                            frame = ChatFinal(
+                                response=event["response"],
+                                state=STATE_MAPPING.get(event["user_state"]),
+                                timestamp=datetime.now().isoformat()
+                            )
+                        await websocket.send_json(jsonable_encoder(frame))
+                finally:
+                    # On disconnect, stop the Claude stream before the session is released
+                    await events.aclose()
+                continue
+
             # Get coach response
-            coach_response = coach.get_response(user_message)
+            coach_response = await _run_blocking(coach.get_response, user_message, session_manager)
 
             # Detect state from last exchange
-            last_exchange = conversation_manager.get_current_session()["exchanges"][-1]
+            last_exchange = session_manager.get_current_session()["exchanges"][-1]
             user_state = last_exchange.get("user_state", "normal")
 
-            # Map state names to frontend format
-            state_mapping = {
-                "fatigue": "tired",
-                "energie": "energetic",
-                "resistance": "resistance",
-                "normal": None
-            }
-
             # Send response
-            await websocket.send_json({
-                "response": coach_response,
-                "state": state_mapping.get(user_state, None),
-                "timestamp": datetime.now().isoformat()
-            })
+            await websocket.send_json(jsonable_encoder(ChatResponse(
+                response=coach_response,
+                state=STATE_MAPPING.get(user_state, None),
+                timestamp=datetime.now().isoformat()
+            )))
 
     except WebSocketDisconnect:
         print("WebSocket disconnected")
@@ -136,31 +305,40 @@ async def chat_websocket(websocket: WebSocket):
             })
         except:
             pass
+    finally:
+        # Persist the connection's conversation
+        await _run_blocking(session_registry.release, session_manager)
 
 
 @app.get("/api/sessions", response_model=SessionList)
-async def get_sessions():
-    """Get list of all conversation sessions."""
-    sessions_data = conversation_manager.get_all_sessions()
+def get_sessions(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None
+):
+    """Get a page of conversation sessions, most recent first."""
+    try:
+        summaries, next_cursor = conversation_manager.get_session_page(limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     sessions = [
         Session(
-            id=session["session_id"],
-            title=session.get("title", f"Session {session['session_id'][:8]}"),
-            created_at=session["start_time"],
-            updated_at=session["end_time"] or session["start_time"],
-            message_count=len(session["exchanges"])
+            id=summary["session_id"],
+            title=summary["title"],
+            created_at=summary["start_time"],
+            updated_at=summary["end_time"] or summary["start_time"],
+            message_count=summary["message_count"]
         )
-        for session in sessions_data
+        for summary in summaries
     ]
 
-    return SessionList(sessions=sessions)
+    return SessionList(sessions=sessions, next_cursor=next_cursor)
 
 
 @app.post("/api/sessions/new", response_model=NewSessionResponse)
-async def create_new_session():
-    """Create a new conversation session."""
-    session_id = conversation_manager.start_new_session()
+def create_new_session():
+    """Create a new conversation session (join it with /ws/chat?session_id=...)."""
+    session_id = session_registry.create().current_session_id
 
     return NewSessionResponse(
         session_id=session_id,
@@ -169,12 +347,9 @@ async def create_new_session():
 
 
 @app.get("/api/sessions/{session_id}", response_model=SessionDetail)
-async def get_session_detail(session_id: str):
+def get_session_detail(session_id: str):
     """Get detailed session information with messages."""
-    sessions_data = conversation_manager.get_all_sessions()
-
-    # Find the session
-    session = next((s for s in sessions_data if s["session_id"] == session_id), None)
+    session = conversation_manager.get_session(session_id)
 
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
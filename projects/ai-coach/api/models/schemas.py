@@ -10,6 +10,13 @@ from datetime import datetime
 class ChatMessage(BaseModel):
     """Message sent via WebSocket."""
     message: str
+    stream: bool = False
+
+
+class ChatToken(BaseModel):
+    """Incremental text frame of a streamed response."""
+    type: str = "token"
+    delta: str
 
 
 class ChatResponse(BaseModel):
@@ -19,6 +26,11 @@ class ChatResponse(BaseModel):
     timestamp: str
 
 
+class ChatFinal(ChatResponse):
+    """Last frame of a streamed response, with the full text."""
+    type: str = "final"
+
+
 class Session(BaseModel):
     """Conversation session."""
     id: str
@@ -29,8 +41,9 @@ class Session(BaseModel):
 
 
 class SessionList(BaseModel):
-    """List of sessions."""
+    """Page of sessions."""
     sessions: List[Session]
+    next_cursor: Optional[str] = None  # Pass as ?cursor= to get the next page
 
 
 class SessionDetail(BaseModel):
@@ -20,19 +20,36 @@ export function ChatInterface() {
     };
     setMessages((prev) => [...prev, userMsg]);
 
+    const coachId = crypto.randomUUID();
+    let streamed = false;
+
     try {
-      // Send via WebSocket and wait for response
-      const response = await sendMessage(content);
+      // Send via WebSocket, showing the reply as it is generated
+      const response = await sendMessage(content, (delta) => {
+        if (!streamed) {
+          streamed = true;
+          setMessages((prev) => [
+            ...prev,
+            { id: coachId, role: 'coach', content: delta, timestamp: new Date().toISOString() },
+          ]);
+          return;
+        }
+        setMessages((prev) =>
+          prev.map((msg) => (msg.id === coachId ? { ...msg, content: msg.content + delta } : msg))
+        );
+      });
 
-      // Add coach response
+      // Add (or finalize) coach response
       const coachMsg: Message = {
-        id: crypto.randomUUID(),
+        id: coachId,
         role: 'coach',
         content: response.response,
         state: response.state,
         timestamp: response.timestamp,
       };
-      setMessages((prev) => [...prev, coachMsg]);
+      setMessages((prev) =>
+        streamed ? prev.map((msg) => (msg.id === coachId ? coachMsg : msg)) : [...prev, coachMsg]
+      );
       setCurrentState(response.state);
     } catch (err) {
       console.error('Failed to send message:', err);
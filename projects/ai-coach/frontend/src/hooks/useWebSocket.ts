@@ -2,10 +2,11 @@ import { useEffect, useRef, useState, useCallback } from 'react';
 import type { ChatResponse } from '@/types/chat';
 
 interface UseWebSocketReturn {
-  sendMessage: (message: string) => Promise<ChatResponse>;
+  sendMessage: (message: string, onToken?: (delta: string) => void) => Promise<ChatResponse>;
   isConnected: boolean;
   isTyping: boolean;
   error: string | null;
+  sessionId: string | null;
 }
 
 export function useWebSocket(url: string): UseWebSocketReturn {
@@ -13,7 +14,9 @@ export function useWebSocket(url: string): UseWebSocketReturn {
   const [isConnected, setIsConnected] = useState(false);
   const [isTyping, setIsTyping] = useState(false);
   const [error, setError] = useState<string | null>(null);
+  const [sessionId, setSessionId] = useState<string | null>(null);
   const messageResolver = useRef<((value: ChatResponse) => void) | null>(null);
+  const tokenHandler = useRef<((delta: string) => void) | null>(null);
 
   useEffect(() => {
     const wsUrl = `ws://localhost:8000${url}`;
@@ -36,17 +39,31 @@ export function useWebSocket(url: string): UseWebSocketReturn {
     };
 
     ws.current.onmessage = (event) => {
-      setIsTyping(false);
       const data = JSON.parse(event.data);
 
+      // Session actually used by the server (a new one if the requested ID was unknown)
+      if (data.type === 'session') {
+        setSessionId(data.session_id);
+        return;
+      }
+
+      setIsTyping(false);
+
       if (data.error) {
         setError(data.error);
         return;
       }
 
+      // Streamed reply: forward partial text until the final frame
+      if (data.type === 'token') {
+        tokenHandler.current?.(data.delta);
+        return;
+      }
+
       if (messageResolver.current) {
         messageResolver.current(data);
         messageResolver.current = null;
+        tokenHandler.current = null;
       }
     };
 
@@ -55,7 +72,7 @@ export function useWebSocket(url: string): UseWebSocketReturn {
     };
   }, [url]);
 
-  const sendMessage = useCallback((message: string): Promise<ChatResponse> => {
+  const sendMessage = useCallback((message: string, onToken?: (delta: string) => void): Promise<ChatResponse> => {
     return new Promise((resolve, reject) => {
       if (!ws.current || ws.current.readyState !== WebSocket.OPEN) {
         reject(new Error('WebSocket not connected'));
@@ -65,9 +82,10 @@ export function useWebSocket(url: string): UseWebSocketReturn {
       setIsTyping(true);
       setError(null);
       messageResolver.current = resolve;
+      tokenHandler.current = onToken ?? null;
 
       try {
-        ws.current.send(JSON.stringify({ message }));
+        ws.current.send(JSON.stringify({ message, stream: Boolean(onToken) }));
       } catch (err) {
         setIsTyping(false);
         setError('Failed to send message');
@@ -81,5 +99,6 @@ export function useWebSocket(url: string): UseWebSocketReturn {
     isConnected,
     isTyping,
     error,
+    sessionId,
   };
 }
@@ -22,6 +22,12 @@ export interface ChatResponse {
   timestamp: string;
 }
 
+export interface ChatToken {
+  type: 'token';
+  delta: string;
+}
+
 export interface WSMessage {
   message: string;
+  stream?: boolean;
 }
@@ -10,10 +10,13 @@ sys.path.insert(0, str(Path(__file__).parent / "src"))
 
 from config import get_config
 from vectorstore import VectorStore
+from embeddings import create_embedding_function
+from embedding_cache import create_embedding_cache
 from rag_engine import RAGEngine
 from conversation_manager import ConversationManager
 from coach import AICoach
 from cli import CoachCLI
+import metrics
 from rich.console import Console
 
 
@@ -26,13 +29,20 @@ def main():
         console.print("[dim]Chargement de la configuration...[/dim]")
         config = get_config()
 
+        # Per-request latency traces as JSON lines
+        metrics.setup_metrics_logging(config.get_metrics_log_path())
+
         # Initialize vectorstore
         console.print("[dim]Connexion à la base vectorielle...[/dim]")
-        vectorstore = VectorStore(str(config.get_chroma_path()))
+        vectorstore = VectorStore(
+            str(config.get_chroma_path()),
+            query_cache_size=config.query_embedding_cache_size,
+            embedding_function=create_embedding_function(config),
+            embedding_cache=create_embedding_cache(config)
+        )
 
-        # Check if database has been initialized
-        collections = vectorstore.list_collections()
-        if not collections or len(collections) == 0:
+        # Check if database has been initialized (without opening it: that is deferred)
+        if not vectorstore.has_database():
             console.print("\n[bold red]❌ Base vectorielle vide![/bold red]\n")
             console.print("[yellow]Veuillez d'abord ingérer vos documents:[/yellow]")
             console.print("[cyan]  python scripts/ingest_all.py[/cyan]\n")
@@ -46,9 +56,14 @@ def main():
         console.print("[dim]Préparation du gestionnaire de conversations...[/dim]")
         conversation_manager = ConversationManager(
             str(config.get_conversation_history_path()),
-            auto_ingest_every=config.auto_ingest_history_every
+            auto_ingest_every=config.auto_ingest_history_every,
+            journal_fsync=config.journal_fsync,
+            compact_every=config.journal_compact_every
         )
 
+        # Index sessions saved by earlier versions or other processes
+        conversation_manager.sync_index()
+
         # Start new session
         conversation_manager.start_new_session()
 
@@ -56,6 +71,10 @@ def main():
         console.print("[dim]Initialisation du coach IA...[/dim]")
         coach = AICoach(rag_engine, conversation_manager, config)
 
+        # Load the SDK, collections and embedding model while the user types
+        if config.warm_up_in_background:
+            coach.warm_up(background=True)
+
         # Start CLI
         console.print("[dim]Démarrage de l'interface...[/dim]\n")
         cli = CoachCLI(coach)
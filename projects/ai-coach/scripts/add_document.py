@@ -13,6 +13,8 @@ from config import get_config
 from document_loader import DocumentLoader
 from text_chunker import TextChunker
 from vectorstore import VectorStore
+from embeddings import create_embedding_function
+from embedding_cache import create_embedding_cache
 from rich.console import Console
 
 
@@ -46,11 +48,12 @@ def main():
             sys.exit(1)
 
         # Initialize components
-        vectorstore = VectorStore(str(config.get_chroma_path()))
-        chunker = TextChunker(
-            chunk_size=config.chunk_size,
-            chunk_overlap=config.chunk_overlap
+        vectorstore = VectorStore(
+            str(config.get_chroma_path()),
+            embedding_function=create_embedding_function(config),
+            embedding_cache=create_embedding_cache(config)
         )
+        chunker = TextChunker.from_config(config)
         loader = DocumentLoader()
 
         # Load document
@@ -58,7 +61,7 @@ def main():
         content, metadata = loader.load_document(str(file_path))
 
         # Chunk document
-        console.print("[yellow]Chunking document...[/yellow]")
+        console.print(f"[yellow]Chunking document ({chunker.counter_name})...[/yellow]")
         chunks = chunker.chunk_text(content, metadata)
 
         # Add collection metadata
@@ -72,10 +75,14 @@ def main():
             console.print(f"[yellow]Creating collection: {args.collection}...[/yellow]")
             vectorstore.create_collection(
                 args.collection,
-                metadata={"description": collection_config.get("description", "")}
+                metadata={"description": collection_config.get("description", "")},
+                hnsw=collection_config.get("hnsw")
             )
         else:
-            vectorstore.collections[args.collection] = vectorstore.client.get_collection(args.collection)
+            vectorstore.load_collection(args.collection)
+
+        # Replace any previous version of the same file
+        vectorstore.delete_chunks(args.collection, where={"source_file_path": metadata["file_path"]})
 
         # Add chunks
         console.print(f"[yellow]Adding {len(chunks)} chunks to {args.collection}...[/yellow]")
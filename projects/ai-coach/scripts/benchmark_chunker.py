@@ -0,0 +1,106 @@
+"""
+Benchmark script for the TextChunker.
+Chunks synthetic documents of growing size and reports throughput,
+to check that chunking time grows linearly with input size.
+"""
+
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from config import get_config
+from text_chunker import TextChunker
+from rich.console import Console
+from rich.table import Table
+
+
+WORDS = (
+    "je me sens fatigué aujourd'hui mais je veux avancer sur mon projet . "
+    "le coach m'aide à garder le cap ! est-ce que c'est le bon moment ? "
+    "objectif discipline routine énergie motivation écriture sport travail"
+).split()
+
+
+def make_document(num_chars: int, seed: int = 42) -> str:
+    """
+    Generate a French-like document with paragraphs and sentences of varied length.
+
+    Args:
+        num_chars: Approximate size of the document in characters
+        seed: Random seed (same size and seed give the same document)
+
+    Returns:
+        Document text
+    """
+    rng = random.Random(seed)
+    paragraphs = []
+    size = 0
+
+    while size < num_chars:
+        # Mostly short paragraphs, some far larger than a chunk
+        num_words = rng.choice([20, 60, 150, 400, 1500])
+        paragraph = " ".join(rng.choice(WORDS) for _ in range(num_words))
+        paragraphs.append(paragraph)
+        size += len(paragraph) + 2
+
+    return "\n\n".join(paragraphs)[:num_chars]
+
+
+def main():
+    """Main function."""
+    console = Console()
+
+    parser = argparse.ArgumentParser(description="Benchmark the text chunker")
+    parser.add_argument(
+        "--sizes",
+        type=float,
+        nargs="+",
+        default=[0.5, 1, 2, 4, 8],
+        help="Document sizes to test, in megabytes of text"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size (best time is kept)")
+    args = parser.parse_args()
+
+    config = get_config()
+    chunker = TextChunker.from_config(config)
+
+    console.print("\n[bold cyan]⏱️  AI Coach - Benchmark du découpage[/bold cyan]\n")
+    console.print(f"[dim]chunk_size={chunker.chunk_size}, chunk_overlap={chunker.chunk_overlap}[/dim]\n")
+
+    table = Table(title="Découpage de documents synthétiques")
+    table.add_column("Taille (Mo)", justify="right")
+    table.add_column("Chunks", justify="right")
+    table.add_column("Temps (s)", justify="right")
+    table.add_column("Débit (Mo/s)", justify="right")
+    table.add_column("µs / Ko", justify="right")
+
+    for size_mb in args.sizes:
+        text = make_document(int(size_mb * 1_000_000))
+
+        best = float("inf")
+        num_chunks = 0
+        for _ in range(args.repeat):
+            start_time = time.perf_counter()
+            num_chunks = sum(1 for _ in chunker.iter_chunks(text))
+            best = min(best, time.perf_counter() - start_time)
+
+        # Constant time per kilobyte across sizes means linear scaling
+        table.add_row(
+            f"{size_mb:g}",
+            str(num_chunks),
+            f"{best:.3f}",
+            f"{size_mb / best:.1f}" if best > 0 else "-",
+            f"{best * 1e6 / (len(text) / 1000):.1f}"
+        )
+
+    console.print(table)
+    console.print()
+
+
+if __name__ == "__main__":
+    main()
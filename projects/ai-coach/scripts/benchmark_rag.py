@@ -0,0 +1,275 @@
+"""
+Benchmark script for the RAG retrieval stack.
+Ingests a synthetic corpus into a temporary ChromaDB, then measures ingest
+throughput, query latency percentiles and recall@k against exact
+(brute-force) cosine search. Results are written as JSON.
+"""
+
+import sys
+import json
+import time
+import random
+import shutil
+import zlib
+import argparse
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from config import get_config
+from embeddings import create_embedding_function
+from text_chunker import TextChunker
+from vectorstore import VectorStore
+from rich.console import Console
+from rich.table import Table
+
+
+VOCABULARY = (
+    "objectif discipline routine énergie motivation fatigue procrastination peur confiance "
+    "travail carrière entretien projet écriture rap texte sport sommeil méditation habitude "
+    "semaine matin soir journée plan étape progrès échec réussite doute envie famille ami "
+    "argent temps focus stress calme colère joie patience effort résultat décision priorité"
+).split()
+
+
+class HashingEmbedding:
+    """
+    Deterministic bag-of-words embedding (hashed word counts).
+
+    Needs no model download; vectors are not semantic, but HNSW recall and
+    latency only depend on the vectors, not on their meaning.
+    """
+
+    model_id = "hashing-384"
+
+    def __init__(self, dimensions: int = 384):
+        self.dimensions = dimensions
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        vectors = np.zeros((len(input), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(input):
+            for word in text.lower().split():
+                vectors[row, zlib.crc32(word.encode("utf-8")) % self.dimensions] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return (vectors / np.clip(norms, 1e-12, None)).tolist()
+
+
+def make_document(rng: random.Random, num_paragraphs: int) -> str:
+    """Generate a synthetic document of short French-like paragraphs."""
+    paragraphs = []
+    for _ in range(num_paragraphs):
+        sentences = [
+            " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(6, 18))).capitalize() + "."
+            for _ in range(rng.randint(2, 6))
+        ]
+        paragraphs.append(" ".join(sentences))
+    return "\n\n".join(paragraphs)
+
+
+def make_query(rng: random.Random) -> str:
+    """Generate a short synthetic query."""
+    return " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(3, 8)))
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Summarize latencies (seconds) as milliseconds percentiles."""
+    values = np.asarray(samples) * 1000
+    return {
+        "p50": float(np.percentile(values, 50)),
+        "p95": float(np.percentile(values, 95)),
+        "p99": float(np.percentile(values, 99)),
+        "mean": float(values.mean())
+    }
+
+
+def exact_top_k(vectorstore: VectorStore, collection_name: str, query_vectors: np.ndarray, k: int) -> List[List[str]]:
+    """
+    Compute the exact cosine top-k of each query by brute force.
+
+    Args:
+        vectorstore: VectorStore instance
+        collection_name: Name of the collection
+        query_vectors: Matrix of query embeddings (one row per query)
+        k: Number of neighbours
+
+    Returns:
+        List of chunk ID lists, best first
+    """
+    stored = vectorstore.collections[collection_name].get(include=["embeddings"])
+    ids = stored["ids"]
+    matrix = np.asarray(stored["embeddings"], dtype=np.float32)
+    matrix /= np.clip(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12, None)
+
+    queries = query_vectors / np.clip(np.linalg.norm(query_vectors, axis=1, keepdims=True), 1e-12, None)
+    similarities = queries @ matrix.T
+
+    top = np.argsort(-similarities, axis=1)[:, :k]
+    return [[ids[i] for i in row] for row in top]
+
+
+def benchmark_collection(
+    vectorstore: VectorStore,
+    chunker: TextChunker,
+    collection_name: str,
+    rng: random.Random,
+    num_documents: int,
+    num_queries: int,
+    k: int,
+    hnsw: Dict
+) -> Dict:
+    """Ingest one synthetic collection and measure it."""
+    vectorstore.create_collection(collection_name, metadata={"description": "benchmark"}, hnsw=hnsw)
+
+    chunks = []
+    for doc_index in range(num_documents):
+        document = make_document(rng, rng.randint(3, 15))
+        chunks.extend(chunker.chunk_text(document, {"file_path": f"{collection_name}/doc_{doc_index}.md"}))
+
+    # Ingest
+    start_time = time.perf_counter()
+    vectorstore.add_chunks(collection_name, chunks)
+    ingest_seconds = time.perf_counter() - start_time
+
+    # Queries: embedding and index search are timed separately
+    queries = [make_query(rng) for _ in range(num_queries)]
+    embed_times = []
+    search_times = []
+    found_ids = []
+    query_vectors = []
+
+    for query in queries:
+        start_time = time.perf_counter()
+        query_embedding = vectorstore.embedding_function([query])[0]
+        embed_times.append(time.perf_counter() - start_time)
+
+        start_time = time.perf_counter()
+        results = vectorstore.search(collection_name, query, n_results=k, query_embedding=query_embedding)
+        search_times.append(time.perf_counter() - start_time)
+
+        found_ids.append([result["id"] for result in results])
+        query_vectors.append(query_embedding)
+
+    # Recall@k against exact search
+    expected_ids = exact_top_k(vectorstore, collection_name, np.asarray(query_vectors, dtype=np.float32), k)
+    recalls = [
+        len(set(found) & set(expected)) / len(expected)
+        for found, expected in zip(found_ids, expected_ids)
+        if expected
+    ]
+
+    return {
+        "documents": num_documents,
+        "chunks": len(chunks),
+        "ingest_seconds": ingest_seconds,
+        "chunks_per_second": len(chunks) / ingest_seconds if ingest_seconds > 0 else 0.0,
+        "embed_ms": percentiles(embed_times),
+        "search_ms": percentiles(search_times),
+        f"recall_at_{k}": float(np.mean(recalls)) if recalls else 0.0
+    }
+
+
+def main():
+    """Main function."""
+    console = Console()
+
+    parser = argparse.ArgumentParser(description="Benchmark RAG ingestion, latency and recall")
+    parser.add_argument("--collections", type=int, default=2, help="Number of synthetic collections")
+    parser.add_argument("--documents", type=int, default=200, help="Documents per collection")
+    parser.add_argument("--queries", type=int, default=100, help="Queries per collection")
+    parser.add_argument("--k", type=int, default=5, help="Number of results per query (recall@k)")
+    parser.add_argument(
+        "--embedder",
+        choices=["config", "hashing"],
+        default="config",
+        help="Embedding backend from settings.json, or a model-free hashing embedder"
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Random seed of the corpus and queries")
+    parser.add_argument("--M", type=int, default=None, help="HNSW graph degree")
+    parser.add_argument("--construction-ef", type=int, default=None, help="HNSW construction_ef")
+    parser.add_argument("--search-ef", type=int, default=None, help="HNSW search_ef")
+    parser.add_argument("--output", type=str, default=None, help="JSON result file")
+    args = parser.parse_args()
+
+    config = get_config()
+    chunker = TextChunker.from_config(config)
+    embedding_function = HashingEmbedding() if args.embedder == "hashing" else create_embedding_function(config)
+    hnsw = {
+        key: value
+        for key, value in (("M", args.M), ("construction_ef", args.construction_ef), ("search_ef", args.search_ef))
+        if value is not None
+    }
+
+    output_path = Path(args.output) if args.output else (
+        config.base_path / "data" / "benchmarks" / f"rag_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json"
+    )
+
+    console.print("\n[bold cyan]⏱️  AI Coach - Benchmark RAG[/bold cyan]\n")
+
+    # Throwaway database: the real one is never touched
+    work_dir = tempfile.mkdtemp(prefix="ai_coach_bench_")
+    rng = random.Random(args.seed)
+    results = {}
+
+    try:
+        vectorstore = VectorStore(work_dir, query_cache_size=0, embedding_function=embedding_function)
+
+        for index in range(args.collections):
+            collection_name = f"bench_{index}"
+            console.print(f"[yellow]Collection {collection_name}...[/yellow]")
+            results[collection_name] = benchmark_collection(
+                vectorstore, chunker, collection_name, rng, args.documents, args.queries, args.k, hnsw
+            )
+            results[collection_name]["hnsw"] = vectorstore.get_hnsw_params(collection_name)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "parameters": {
+            "collections": args.collections,
+            "documents": args.documents,
+            "queries": args.queries,
+            "k": args.k,
+            "seed": args.seed,
+            "embedding_model": getattr(embedding_function, "model_id", type(embedding_function).__name__),
+            "chunk_unit": config.chunk_unit,
+            "chunk_size": chunker.chunk_size,
+            "chunk_overlap": chunker.chunk_overlap
+        },
+        "collections": results
+    }
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    table = Table(title=f"Résultats (k={args.k})")
+    table.add_column("Collection", style="cyan")
+    table.add_column("Chunks", justify="right")
+    table.add_column("Ingestion (chunks/s)", justify="right")
+    table.add_column("Recherche p50/p95/p99 (ms)", justify="right")
+    table.add_column("Embedding p50 (ms)", justify="right")
+    table.add_column(f"Recall@{args.k}", justify="right")
+
+    for collection_name, result in results.items():
+        search = result["search_ms"]
+        table.add_row(
+            collection_name,
+            str(result["chunks"]),
+            f"{result['chunks_per_second']:.0f}",
+            f"{search['p50']:.2f} / {search['p95']:.2f} / {search['p99']:.2f}",
+            f"{result['embed_ms']['p50']:.2f}",
+            f"{result[f'recall_at_{args.k}']:.3f}"
+        )
+
+    console.print(table)
+    console.print(f"\n[green]Résultats écrits dans: {output_path}[/green]\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,10 @@
 """
 Ingestion script to load all documents into ChromaDB.
-Creates collections and processes all source documents.
+Creates collections and processes new, modified and removed source documents.
 """
 
 import sys
+import argparse
 from pathlib import Path
 
 # Add src to path
@@ -11,8 +12,12 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from config import get_config
 from document_loader import DocumentLoader
+from ingestion_manifest import IngestionManifest
+from ingestion_pipeline import IngestionPipeline
 from text_chunker import TextChunker
 from vectorstore import VectorStore
+from embeddings import create_embedding_function
+from embedding_cache import create_embedding_cache
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
 from rich.table import Table
@@ -22,6 +27,14 @@ def main():
     """Main ingestion function."""
     console = Console()
 
+    parser = argparse.ArgumentParser(description="Ingest all AI Coach collections")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Ignore the ingestion manifest and rebuild every collection from scratch"
+    )
+    args = parser.parse_args()
+
     console.print("\n[bold cyan]🤖 AI Coach - Ingestion de documents[/bold cyan]\n")
 
     try:
@@ -31,17 +44,32 @@ def main():
 
         # Initialize vectorstore
         console.print("[yellow]Initialisation de ChromaDB...[/yellow]")
-        vectorstore = VectorStore(str(config.get_chroma_path()))
+        vectorstore = VectorStore(
+            str(config.get_chroma_path()),
+            embedding_function=create_embedding_function(config),
+            embedding_cache=create_embedding_cache(config)
+        )
 
         # Initialize chunker
-        chunker = TextChunker(
-            chunk_size=config.chunk_size,
-            chunk_overlap=config.chunk_overlap
-        )
+        chunker = TextChunker.from_config(config)
+        console.print(f"[yellow]Découpage en {chunker.counter_name}[/yellow]")
 
         # Initialize document loader
         loader = DocumentLoader()
 
+        # Streaming loader -> chunker -> vectorstore pipeline
+        pipeline = IngestionPipeline(
+            vectorstore,
+            chunker,
+            workers=config.loader_workers,
+            max_in_flight=config.ingest_max_in_flight,
+            batch_size=config.ingest_batch_size,
+            load_timeout=config.loader_timeout_seconds
+        )
+
+        # Files already ingested (path, mtime, size, digest)
+        manifest = IngestionManifest(str(config.get_ingestion_manifest_path()))
+
         # Statistics
         stats = {}
 
@@ -57,62 +85,109 @@ def main():
         ) as progress:
 
             for collection_name, collection_config in collections.items():
+                empty_stat = {"documents": 0, "chunks": 0, "unchanged": 0, "removed": 0}
+
                 # Skip historique_coach (will be populated by conversations)
                 if collection_name == "historique_coach":
                     console.print(f"[dim]Skipping {collection_name} (populated by conversations)[/dim]")
-                    stats[collection_name] = {"chunks": 0, "documents": 0}
+                    stats[collection_name] = empty_stat
                     continue
 
-                task = progress.add_task(
-                    f"Processing {collection_name}...",
-                    total=100
-                )
-
                 # Get source path
                 source_path = config.get_collection_path(collection_name)
 
                 if not source_path.exists():
                     console.print(f"[red]⚠ Source path not found: {source_path}[/red]")
-                    stats[collection_name] = {"chunks": 0, "documents": 0}
+                    stats[collection_name] = empty_stat
                     continue
 
-                # Load documents
-                progress.update(task, advance=20, description=f"Loading {collection_name}...")
-                documents = loader.load_directory(str(source_path))
+                if args.full:
+                    # Start over: drop the collection and forget its files
+                    if vectorstore.collection_exists(collection_name):
+                        vectorstore.delete_collection(collection_name)
+                    manifest.clear(collection_name)
 
-                if not documents:
+                # Compare files on disk with the manifest
+                files = loader.list_files(str(source_path))
+                changes = manifest.diff(collection_name, files)
+
+                if not files and not changes["removed"]:
                     console.print(f"[yellow]⚠ No documents found in {collection_name}[/yellow]")
-                    stats[collection_name] = {"chunks": 0, "documents": 0}
-                    progress.update(task, completed=100)
+                    stats[collection_name] = empty_stat
                     continue
 
-                # Chunk documents
-                progress.update(task, advance=30, description=f"Chunking {collection_name}...")
-                chunks = chunker.chunk_documents(documents)
-
-                # Add collection type to metadata
-                for chunk in chunks:
-                    chunk["collection"] = collection_name
-                    chunk["type"] = collection_config.get("description", "")
-
                 # Create collection
-                progress.update(task, advance=20, description=f"Creating collection {collection_name}...")
                 vectorstore.create_collection(
                     collection_name,
-                    metadata={"description": collection_config.get("description", "")}
+                    metadata={"description": collection_config.get("description", "")},
+                    hnsw=collection_config.get("hnsw")
+                )
+
+                total_steps = max(len(changes["changed"]) + len(changes["removed"]), 1)
+                task = progress.add_task(f"Processing {collection_name}...", total=total_steps)
+
+                # Drop chunks of files that disappeared
+                for file_path in changes["removed"]:
+                    progress.update(task, description=f"Removing {Path(file_path).name}...")
+                    vectorstore.delete_chunks(collection_name, where={"source_file_path": file_path})
+                    manifest.remove(collection_name, file_path)
+                    progress.advance(task)
+                if changes["removed"]:
+                    manifest.save()
+
+                # Re-embed new and modified files only, streamed from loader to store
+                changed_files = {file_info["path"]: file_info for file_info in changes["changed"]}
+
+                def replace_previous(metadata):
+                    progress.update(task, description=f"Ingesting {metadata['source']}...")
+                    vectorstore.delete_chunks(collection_name, where={"source_file_path": metadata["file_path"]})
+
+                # Called once the document's chunks are stored
+                def record_ingested(metadata, num_chunks):
+                    file_info = changed_files[metadata["file_path"]]
+                    manifest.record(
+                        collection_name,
+                        file_info["path"],
+                        mtime=file_info["mtime"],
+                        size=file_info["size"],
+                        digest=file_info["digest"],
+                        num_chunks=num_chunks
+                    )
+                    progress.advance(task)
+
+                result = pipeline.run(
+                    collection_name,
+                    list(changed_files),
+                    extra_metadata={
+                        "collection": collection_name,
+                        "type": collection_config.get("description", "")
+                    },
+                    on_document_start=replace_previous,
+                    on_document_done=record_ingested,
+                    # A failed write later on keeps the files already stored
+                    on_batch_stored=lambda _: manifest.save()
                 )
+                num_added = result["chunks"]
 
-                # Add chunks
-                progress.update(task, advance=20, description=f"Adding chunks to {collection_name}...")
-                num_added = vectorstore.add_chunks(collection_name, chunks)
+                if num_added:
+                    console.print(
+                        f"[dim]{collection_name}: {num_added} chunks "
+                        f"({result['chunks_per_second']:.1f} chunks/s, "
+                        f"{result['cached']} embeddings en cache)[/dim]"
+                    )
+
+                # Persist progress after each collection
+                manifest.save()
 
                 # Update stats
                 stats[collection_name] = {
-                    "documents": len(documents),
-                    "chunks": num_added
+                    "documents": len(changes["changed"]),
+                    "chunks": num_added,
+                    "unchanged": len(changes["unchanged"]),
+                    "removed": len(changes["removed"])
                 }
 
-                progress.update(task, completed=100)
+                progress.update(task, completed=total_steps, description=f"{collection_name} done")
 
         # Display statistics
         console.print("\n[bold green]✓ Ingestion terminée![/bold green]\n")
@@ -121,27 +196,39 @@ def main():
         table.add_column("Collection", style="cyan")
         table.add_column("Documents", justify="right", style="magenta")
         table.add_column("Chunks", justify="right", style="green")
+        table.add_column("Inchangés", justify="right", style="dim")
+        table.add_column("Supprimés", justify="right", style="red")
 
-        total_docs = 0
-        total_chunks = 0
+        totals = {"documents": 0, "chunks": 0, "unchanged": 0, "removed": 0}
 
         for collection_name, stat in stats.items():
             table.add_row(
                 collection_name,
                 str(stat["documents"]),
-                str(stat["chunks"])
+                str(stat["chunks"]),
+                str(stat["unchanged"]),
+                str(stat["removed"])
             )
-            total_docs += stat["documents"]
-            total_chunks += stat["chunks"]
+            for key in totals:
+                totals[key] += stat[key]
 
         table.add_row(
             "[bold]TOTAL[/bold]",
-            f"[bold]{total_docs}[/bold]",
-            f"[bold]{total_chunks}[/bold]",
+            f"[bold]{totals['documents']}[/bold]",
+            f"[bold]{totals['chunks']}[/bold]",
+            f"[bold]{totals['unchanged']}[/bold]",
+            f"[bold]{totals['removed']}[/bold]",
             style="bold"
         )
 
         console.print(table)
+        if chunker.token_counter is not None and not chunker.token_counter.exact:
+            console.print(
+                f"\n[bold yellow]⚠ Chunks découpés avec des estimations ({chunker.counter_name}): "
+                f"la limite de {config.embedding_max_tokens} tokens n'est pas garantie[/bold yellow]"
+            )
+        else:
+            console.print(f"\n[dim]Découpage: {chunker.counter_name}[/dim]")
         console.print(f"\n[green]Base vectorielle créée dans: {config.get_chroma_path()}[/green]\n")
 
     except Exception as e:
@@ -0,0 +1,160 @@
+"""
+Import-time profile of the AI Coach startup.
+Runs the CLI startup imports in a fresh interpreter with -X importtime and
+reports the slowest modules, then times the construction of the coach
+(without warm-up) to check that the CLI starts in well under a second.
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from rich.console import Console
+from rich.table import Table
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Modules imported by main.py before the prompt is shown
+STARTUP_MODULES = [
+    "config", "vectorstore", "embeddings", "embedding_cache", "rag_engine",
+    "conversation_manager", "coach", "cli", "metrics"
+]
+
+# Startup of main.py up to the prompt, without the background warm-up
+STARTUP_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, "src")
+from config import get_config
+from vectorstore import VectorStore
+from embeddings import create_embedding_function
+from embedding_cache import create_embedding_cache
+from rag_engine import RAGEngine
+from conversation_manager import ConversationManager
+from coach import AICoach
+from cli import CoachCLI
+config = get_config()
+vectorstore = VectorStore(
+    str(config.get_chroma_path()),
+    query_cache_size=config.query_embedding_cache_size,
+    embedding_function=create_embedding_function(config),
+    embedding_cache=create_embedding_cache(config)
+)
+rag_engine = RAGEngine(vectorstore, config)
+conversation_manager = ConversationManager(str(config.get_conversation_history_path()))
+coach = AICoach(rag_engine, conversation_manager, config)
+print(time.perf_counter() - start)
+"""
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """
+    Parse the output of -X importtime.
+
+    Args:
+        stderr: Standard error of the profiled interpreter
+
+    Returns:
+        List of (module, self microseconds, cumulative microseconds)
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            entries.append((name.strip(), int(self_us), int(cumulative_us)))
+        except ValueError:
+            continue
+    return entries
+
+
+def run_python(code: str, importtime: bool = False) -> subprocess.CompletedProcess:
+    """Run code in a fresh interpreter from the project root."""
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", code]
+    return subprocess.run(
+        command,
+        cwd=str(PROJECT_ROOT),
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    )
+
+
+def main():
+    """Main function."""
+    console = Console()
+
+    parser = argparse.ArgumentParser(description="Profile the import time of the AI Coach startup")
+    parser.add_argument("--top", type=int, default=15, help="Number of modules listed")
+    parser.add_argument("--runs", type=int, default=3, help="Startup timings (best is kept)")
+    parser.add_argument(
+        "--modules",
+        nargs="+",
+        default=STARTUP_MODULES,
+        help="Modules to import (default: those of the CLI startup)"
+    )
+    args = parser.parse_args()
+
+    console.print("\n[bold cyan]⏱️  AI Coach - Profil des imports[/bold cyan]\n")
+
+    # Import profile
+    code = "import sys; sys.path.insert(0, 'src')\n" + "\n".join(f"import {module}" for module in args.modules)
+    result = run_python(code, importtime=True)
+    if result.returncode != 0:
+        console.print(f"[bold red]❌ Import failed:[/bold red]\n{result.stderr[-2000:]}")
+        sys.exit(1)
+
+    entries = parse_importtime(result.stderr)
+    cumulative: Dict[str, int] = {}
+    for name, _, cumulative_us in entries:
+        cumulative[name] = max(cumulative.get(name, 0), cumulative_us)
+
+    # Top-level packages are what lazy imports can remove
+    packages: Dict[str, int] = {}
+    for name, self_us, _ in entries:
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + self_us
+
+    table = Table(title=f"Paquets les plus lents ({len(entries)} modules importés)")
+    table.add_column("Paquet", style="cyan")
+    table.add_column("Temps (ms)", justify="right")
+    for package, self_us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        table.add_row(package, f"{self_us / 1000:.1f}")
+    console.print(table)
+
+    table = Table(title="Modules du projet (temps cumulé)")
+    table.add_column("Module", style="cyan")
+    table.add_column("Temps (ms)", justify="right")
+    for module in args.modules:
+        if module in cumulative:
+            table.add_row(module, f"{cumulative[module] / 1000:.1f}")
+    console.print(table)
+
+    heavy = [package for package in ("chromadb", "anthropic", "onnxruntime", "pypdf", "docx") if package in packages]
+    if heavy:
+        console.print(f"[yellow]⚠ Importés au démarrage: {', '.join(heavy)}[/yellow]")
+
+    # Startup time
+    timings = []
+    for _ in range(args.runs):
+        result = run_python(STARTUP_SCRIPT)
+        if result.returncode != 0:
+            console.print(f"[bold red]❌ Startup failed:[/bold red]\n{result.stderr[-2000:]}")
+            sys.exit(1)
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+
+    best = min(timings)
+    color = "green" if best < 1.0 else "red"
+    console.print(f"\n[{color}]Démarrage jusqu'à l'invite (sans warm-up): {best * 1000:.0f} ms[/{color}]\n")
+
+
+if __name__ == "__main__":
+    main()
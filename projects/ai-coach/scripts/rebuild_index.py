@@ -0,0 +1,106 @@
+"""
+Script to rebuild the HNSW index of collections.
+Copies each collection (with its stored embeddings) into a new one built
+with the HNSW parameters of collections_config.json, then swaps it in.
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from config import get_config
+from embeddings import create_embedding_function
+from embedding_cache import create_embedding_cache
+from vectorstore import VectorStore
+from rich.console import Console
+from rich.table import Table
+
+
+def format_params(params: dict) -> str:
+    """Format HNSW parameters on one line."""
+    return ", ".join(f"{key}={value}" for key, value in params.items())
+
+
+def main():
+    """Main function."""
+    console = Console()
+
+    parser = argparse.ArgumentParser(description="Rebuild the HNSW index of collections")
+    parser.add_argument("collections", nargs="*", help="Collections to rebuild")
+    parser.add_argument("--all", action="store_true", help="Rebuild every configured collection")
+    parser.add_argument("--M", type=int, default=None, help="Override M (graph degree)")
+    parser.add_argument("--construction-ef", type=int, default=None, help="Override construction_ef")
+    parser.add_argument("--search-ef", type=int, default=None, help="Override search_ef")
+    args = parser.parse_args()
+
+    config = get_config()
+
+    names = list(config.collections) if args.all else args.collections
+    if not names:
+        parser.error("give at least one collection name, or --all")
+
+    unknown = [name for name in names if name not in config.collections]
+    if unknown:
+        console.print(f"[bold red]❌ Unknown collection(s): {', '.join(unknown)}[/bold red]")
+        console.print(f"Available: {', '.join(config.collections.keys())}")
+        sys.exit(1)
+
+    overrides = {
+        "M": args.M,
+        "construction_ef": args.construction_ef,
+        "search_ef": args.search_ef
+    }
+
+    console.print("\n[bold cyan]🔧 AI Coach - Index Rebuild[/bold cyan]\n")
+
+    vectorstore = VectorStore(
+        str(config.get_chroma_path()),
+        embedding_function=create_embedding_function(config),
+        embedding_cache=create_embedding_cache(config)
+    )
+
+    table = Table(title="Rebuilt collections")
+    table.add_column("Collection", style="cyan")
+    table.add_column("Chunks", justify="right")
+    table.add_column("Old HNSW")
+    table.add_column("New HNSW")
+    table.add_column("Time (s)", justify="right")
+
+    failed = False
+    for name in names:
+        if vectorstore.load_collection(name) is None:
+            console.print(f"[yellow]⚠ Collection {name} does not exist yet, skipped[/yellow]")
+            continue
+
+        hnsw = dict(config.collections[name].get("hnsw") or {})
+        hnsw.update({key: value for key, value in overrides.items() if value is not None})
+
+        console.print(f"[yellow]Rebuilding {name}...[/yellow]")
+        try:
+            result = vectorstore.rebuild_collection(name, hnsw)
+        except Exception as e:
+            console.print(f"[bold red]❌ Error rebuilding {name}: {e}[/bold red]")
+            failed = True
+            continue
+
+        table.add_row(
+            name,
+            str(result["chunks"]),
+            format_params(result["old"]),
+            format_params(result["new"]),
+            f"{result['seconds']:.1f}"
+        )
+
+    console.print()
+    console.print(table)
+    console.print()
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from config import get_config
 from vectorstore import VectorStore
+from embeddings import create_embedding_function
+from embedding_cache import create_embedding_cache
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
@@ -55,7 +57,11 @@ def main():
         config = get_config()
 
         # Initialize vectorstore
-        vectorstore = VectorStore(str(config.get_chroma_path()))
+        vectorstore = VectorStore(
+            str(config.get_chroma_path()),
+            embedding_function=create_embedding_function(config),
+            embedding_cache=create_embedding_cache(config)
+        )
 
         # Check if database exists
         collections = vectorstore.list_collections()
@@ -75,7 +75,7 @@ Parlez simplement au coach comme si vous parliez à un ami. Le coach:
 
     def display_history(self):
         """Display recent sessions."""
-        sessions = self.coach.conversation_manager.get_recent_sessions(5)
+        sessions = self.coach.conversation_manager.get_session_summaries(limit=5)
 
         if not sessions:
             self.console.print("[yellow]Aucune session précédente.[/yellow]\n")
@@ -91,7 +91,7 @@ Parlez simplement au coach comme si vous parliez à un ami. Le coach:
             table.add_row(
                 session.get("date", "Unknown"),
                 session.get("session_id", "Unknown"),
-                str(len(session.get("exchanges", []))),
+                str(session.get("message_count", 0)),
                 session.get("summary", "")[:60] + "..." if len(session.get("summary", "")) > 60 else session.get("summary", "")
             )
 
@@ -120,6 +120,32 @@ Parlez simplement au coach comme si vous parliez à un ami. Le coach:
             table.add_row("[bold]TOTAL[/bold]", f"[bold]{total}[/bold]", style="bold")
 
             self.console.print(table)
+
+            # Background history ingestion
+            ingestion_stats = self.coach.ingestion_worker.stats()
+            self.console.print(
+                f"[dim]Indexation de l'historique: {ingestion_stats['queue_depth']} en attente, "
+                f"{ingestion_stats['ingested_chunks']} chunks indexés, "
+                f"{ingestion_stats['errors']} erreurs[/dim]"
+            )
+
+            # Retrieved context of the last reply
+            context_stats = self.coach.conversation_manager.last_context_stats
+            if context_stats:
+                self.console.print(
+                    f"[dim]Dernier contexte: {context_stats['tokens']}/{context_stats['budget']} tokens, "
+                    f"{context_stats['chunks_used']}/{context_stats['chunks_available']} extraits[/dim]"
+                )
+
+            # Semantic response cache counters
+            if self.coach.response_cache is not None:
+                cache_stats = self.coach.response_cache.stats()
+                self.console.print(
+                    f"[dim]Cache de réponses: {cache_stats['hits']} hits, "
+                    f"{cache_stats['misses']} misses ({cache_stats['hit_rate']:.0%}), "
+                    f"{cache_stats['entries']} entrées[/dim]"
+                )
+
             self.console.print()
 
         except Exception as e:
@@ -158,6 +184,9 @@ Parlez simplement au coach comme si vous parliez à un ami. Le coach:
         elif command == "/exit":
             self.console.print("\n[cyan]Sauvegarde de la session...[/cyan]")
             self.coach.save_session()
+            if self.coach.ingestion_worker.queue_depth():
+                self.console.print("[dim]Indexation de l'historique en cours...[/dim]")
+            self.coach.shutdown()
             self.console.print("[green]✓ Session sauvegardée. À bientôt ![/green]\n")
             self.running = False
             return True
@@ -4,10 +4,19 @@ Combines RAG context with conversation history.
 """
 
 import os
-from anthropic import Anthropic
-from typing import Optional
+import threading
+import time
+from typing import Dict, Iterator, Optional
+import metrics
 from rag_engine import RAGEngine
 from conversation_manager import ConversationManager
+from response_cache import SemanticResponseCache
+from text_chunker import TextChunker
+from ingestion_worker import HistoryIngestionWorker
+
+
+# Recent exchanges included in the system prompt
+PROMPT_HISTORY_EXCHANGES = 3
 
 
 class AICoach:
@@ -31,104 +40,338 @@ class AICoach:
         self.conversation_manager = conversation_manager
         self.config = config
 
-        # Initialize Anthropic client
-        self.client = Anthropic(api_key=config.anthropic_api_key)
+        # Anthropic client, created on first use (importing the SDK takes over a second)
+        self._client = None
+        self._client_lock = threading.Lock()
 
         # Load system prompt template
         self.system_prompt_template = config.get_prompt_template()
 
-    def get_response(self, user_message: str) -> str:
+        # Conversation history is embedded off the reply path
+        self.ingestion_worker = HistoryIngestionWorker(
+            rag_engine.vectorstore,
+            TextChunker.from_config(config),
+            hnsw=config.collections.get("historique_coach", {}).get("hnsw")
+        )
+
+        # Optional cache of answers to near-identical questions
+        self.response_cache = None
+        if config.response_cache_enabled:
+            self.response_cache = SemanticResponseCache(
+                similarity_threshold=config.response_cache_threshold,
+                ttl_seconds=config.response_cache_ttl_seconds,
+                max_entries=config.response_cache_max_entries
+            )
+
+    @property
+    def client(self):
+        """Anthropic client, created on first access."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from anthropic import Anthropic
+
+                    self._client = Anthropic(api_key=self.config.anthropic_api_key)
+        return self._client
+
+    @client.setter
+    def client(self, client):
+        self._client = client
+
+    def warm_up(self, background: bool = False) -> Optional[threading.Thread]:
+        """
+        Load what the first reply needs: Anthropic SDK, collections and embedding model.
+
+        Without warm-up, all of it is loaded by the first message instead.
+
+        Args:
+            background: Load on a daemon thread and return immediately
+
+        Returns:
+            The warm-up thread if background, else None
+        """
+        if background:
+            thread = threading.Thread(target=self._warm_up_safe, name="coach-warm-up", daemon=True)
+            thread.start()
+            return thread
+
+        self.client
+        self.rag_engine.warm_up()
+        return None
+
+    def _warm_up_safe(self):
+        """Warm up, reporting errors instead of raising (they resurface on the first message)."""
+        try:
+            self.warm_up()
+        except Exception as e:
+            print(f"Warm-up error: {e}")
+
+    def get_response(
+        self,
+        user_message: str,
+        conversation_manager: Optional[ConversationManager] = None
+    ) -> str:
         """
         Get coach response to user message.
 
         Args:
             user_message: User's message
+            conversation_manager: Session to use instead of the coach's own
+                (lets one coach serve several independent conversations)
 
         Returns:
             Coach's response
         """
-        # Detect user state
-        user_state = self.rag_engine.detect_user_state(user_message)
+        with metrics.trace_request("get_response") as trace:
+            # Detect user state
+            with metrics.span("detect_user_state"):
+                user_state = self.rag_engine.detect_user_state(user_message)
 
-        # Retrieve relevant context via RAG
-        rag_context = self.rag_engine.retrieve_context(user_message, user_state)
+            # Answer near-identical questions asked in the same context from the cache
+            query_embedding, history_key, coach_response = self._lookup_cache(
+                user_message, user_state, conversation_manager
+            )
+            trace.set(user_state=user_state, cache_hit=coach_response is not None)
 
-        # Get recent conversation history
-        conversation_history = self.conversation_manager.get_formatted_history(n_exchanges=3)
+            if coach_response is None:
+                coach_response, succeeded = self._generate_response(
+                    user_message, user_state, conversation_manager
+                )
 
-        # Build system prompt with context
-        system_prompt = self.system_prompt_template.format(
-            rag_context=rag_context,
-            conversation_history=conversation_history
-        )
+                if succeeded and self.response_cache is not None:
+                    self.response_cache.put(query_embedding, user_state, coach_response, history_key)
 
-        # Call Claude API
-        try:
-            response = self.client.messages.create(
-                model=self.config.claude_model,
-                max_tokens=self.config.max_tokens,
-                temperature=self.config.temperature,
-                system=system_prompt,
-                messages=[
-                    {"role": "user", "content": user_message}
-                ]
+            self._record_exchange(user_message, coach_response, user_state, conversation_manager)
+
+        return coach_response
+
+    def stream_response(
+        self,
+        user_message: str,
+        conversation_manager: Optional[ConversationManager] = None
+    ) -> Iterator[Dict]:
+        """
+        Get coach response to user message as a stream of tokens.
+
+        Args:
+            user_message: User's message
+            conversation_manager: Session to use instead of the coach's own
+
+        Yields:
+            {"type": "token", "text": ...} for each text delta, then
+            {"type": "done", "response": ..., "user_state": ...} once the
+            exchange has been saved
+        """
+        with metrics.trace_request("stream_response") as trace:
+            # Detect user state
+            with metrics.span("detect_user_state"):
+                user_state = self.rag_engine.detect_user_state(user_message)
+
+            # Answer near-identical questions asked in the same context from the cache
+            query_embedding, history_key, coach_response = self._lookup_cache(
+                user_message, user_state, conversation_manager
             )
+            trace.set(user_state=user_state, cache_hit=coach_response is not None)
 
-            coach_response = response.content[0].text
+            if coach_response is not None:
+                yield {"type": "token", "text": coach_response}
+            else:
+                system_prompt = self._build_system_prompt(user_message, user_state, conversation_manager)
+                parts = []
+                succeeded = True
 
-        except Exception as e:
-            coach_response = f"Erreur lors de l'appel à l'API Claude: {e}"
+                # Call Claude streaming API (the span includes the time the caller takes per token)
+                start_time = time.perf_counter()
+                try:
+                    with metrics.span("claude_call"):
+                        with self.client.messages.stream(
+                            model=self.config.claude_model,
+                            max_tokens=self.config.max_tokens,
+                            temperature=self.config.temperature,
+                            system=system_prompt,
+                            messages=[
+                                {"role": "user", "content": user_message}
+                            ]
+                        ) as stream:
+                            for text in stream.text_stream:
+                                if not parts:
+                                    trace.set(first_token_ms=round((time.perf_counter() - start_time) * 1000, 3))
+                                parts.append(text)
+                                yield {"type": "token", "text": text}
 
-        # Save exchange
-        self.conversation_manager.add_exchange(user_message, coach_response, user_state)
+                            self._record_usage(stream.get_final_message())
 
-        # Auto-ingest if needed
-        if self.conversation_manager.should_auto_ingest():
-            self._auto_ingest_conversation()
+                except Exception as e:
+                    succeeded = False
+                    error_text = f"Erreur lors de l'appel à l'API Claude: {e}"
+                    if parts:
+                        error_text = "\n\n" + error_text
+                    parts.append(error_text)
+                    yield {"type": "token", "text": error_text}
 
-        return coach_response
+                coach_response = "".join(parts)
 
-    def _auto_ingest_conversation(self):
-        """Auto-ingest conversation history into vector database."""
-        try:
-            # Get session data for ingestion
-            session_data = self.conversation_manager.get_session_for_ingestion()
+                if succeeded and self.response_cache is not None:
+                    self.response_cache.put(query_embedding, user_state, coach_response, history_key)
+
+            self._record_exchange(user_message, coach_response, user_state, conversation_manager)
+
+        yield {"type": "done", "response": coach_response, "user_state": user_state}
 
-            if not session_data:
-                return
+    def _lookup_cache(
+        self,
+        user_message: str,
+        user_state: str,
+        conversation_manager: Optional[ConversationManager] = None
+    ) -> tuple:
+        """
+        Look up a cached response for a message.
 
-            # Prepare for vectorstore
-            from text_chunker import TextChunker
-            chunker = TextChunker(
-                chunk_size=self.config.chunk_size,
-                chunk_overlap=self.config.chunk_overlap
+        The reply depends on the recent history put in the prompt, so only
+        answers generated with the same history are reused: a first message
+        can be answered from another session, a follow-up cannot.
+
+        Args:
+            user_message: User's message
+            user_state: Detected user state
+            conversation_manager: Session providing the history (defaults to the coach's own)
+
+        Returns:
+            Tuple of (query embedding or None, history digest or None, cached response or None)
+        """
+        if self.response_cache is None:
+            return None, None, None
+
+        conversation_manager = conversation_manager or self.conversation_manager
+
+        with metrics.span("cache_lookup"):
+            query_embedding = self.rag_engine.vectorstore.embed_query(user_message)
+            history_key = conversation_manager.get_history_digest(n_exchanges=PROMPT_HISTORY_EXCHANGES)
+            return query_embedding, history_key, self.response_cache.get(query_embedding, user_state, history_key)
+
+    @staticmethod
+    def _record_usage(message) -> None:
+        """Add the token usage reported by the Claude API to the current trace."""
+        usage = getattr(message, "usage", None)
+        if usage is not None:
+            metrics.add_tokens("input", getattr(usage, "input_tokens", None))
+            metrics.add_tokens("output", getattr(usage, "output_tokens", None))
+
+    def _record_exchange(
+        self,
+        user_message: str,
+        coach_response: str,
+        user_state: str,
+        conversation_manager: Optional[ConversationManager] = None
+    ):
+        """Save an exchange and auto-ingest the session if needed."""
+        conversation_manager = conversation_manager or self.conversation_manager
+
+        with metrics.span("record_exchange"):
+            # Save exchange
+            conversation_manager.add_exchange(user_message, coach_response, user_state)
+
+            # Auto-ingest if needed
+            if conversation_manager.should_auto_ingest():
+                self._auto_ingest_conversation(conversation_manager)
+
+    def _build_system_prompt(
+        self,
+        user_message: str,
+        user_state: str,
+        conversation_manager: Optional[ConversationManager] = None
+    ) -> str:
+        """
+        Build the system prompt with RAG context and recent history.
+
+        Args:
+            user_message: User's message
+            user_state: Detected user state
+            conversation_manager: Session providing the history (defaults to the coach's own)
+
+        Returns:
+            System prompt
+        """
+        conversation_manager = conversation_manager or self.conversation_manager
+
+        # Retrieve relevant context via RAG
+        with metrics.span("retrieve_context"):
+            rag_context, context_stats = self.rag_engine.retrieve_context(user_message, user_state)
+        # Per session: the engine is shared by concurrent requests
+        conversation_manager.last_context_stats = context_stats
+
+        with metrics.span("prompt_assembly"):
+            # Get recent conversation history
+            conversation_history = conversation_manager.get_formatted_history(n_exchanges=PROMPT_HISTORY_EXCHANGES)
+
+            # Build system prompt with context
+            return self.system_prompt_template.format(
+                rag_context=rag_context,
+                conversation_history=conversation_history
             )
 
-            chunks = chunker.chunk_text(session_data["text"], session_data["metadata"])
+    def _generate_response(
+        self,
+        user_message: str,
+        user_state: str,
+        conversation_manager: Optional[ConversationManager] = None
+    ) -> tuple:
+        """
+        Run retrieval and the Claude call for a message.
 
-            # Add collection metadata
-            for chunk in chunks:
-                chunk["collection"] = "historique_coach"
-                chunk["type"] = "Conversations passées avec le coach"
+        Args:
+            user_message: User's message
+            user_state: Detected user state
+            conversation_manager: Session providing the history (defaults to the coach's own)
+
+        Returns:
+            Tuple of (response text, whether the API call succeeded)
+        """
+        system_prompt = self._build_system_prompt(user_message, user_state, conversation_manager)
 
-            # Ensure collection exists
-            if not self.rag_engine.vectorstore.collection_exists("historique_coach"):
-                self.rag_engine.vectorstore.create_collection(
-                    "historique_coach",
-                    metadata={"description": "Conversations passées avec le coach"}
+        # Call Claude API
+        try:
+            with metrics.span("claude_call"):
+                response = self.client.messages.create(
+                    model=self.config.claude_model,
+                    max_tokens=self.config.max_tokens,
+                    temperature=self.config.temperature,
+                    system=system_prompt,
+                    messages=[
+                        {"role": "user", "content": user_message}
+                    ]
                 )
 
-            # Add to vectorstore
-            self.rag_engine.vectorstore.add_chunks("historique_coach", chunks)
+            self._record_usage(response)
+            return response.content[0].text, True
+
+        except Exception as e:
+            return f"Erreur lors de l'appel à l'API Claude: {e}", False
 
-            # Reset counter
-            self.conversation_manager.reset_auto_ingest_counter()
+    def _auto_ingest_conversation(self, conversation_manager: Optional[ConversationManager] = None):
+        """Queue the exchanges added since the last ingestion for background ingestion."""
+        conversation_manager = conversation_manager or self.conversation_manager
 
-            print(f"\n[Auto-ingestion] Session {session_data['metadata']['session_id']} ingérée dans la base vectorielle.\n")
+        session_data = conversation_manager.take_pending_ingestion()
 
-        except Exception as e:
-            print(f"\n[Erreur auto-ingestion] {e}\n")
+        if session_data:
+            # The session only records the batch as ingested once it is stored,
+            # and drops it if an earlier batch failed in the meantime
+            self.ingestion_worker.submit(
+                session_data,
+                on_done=conversation_manager.finish_ingestion,
+                should_ingest=conversation_manager.should_ingest
+            )
 
     def save_session(self):
         """Save current conversation session."""
         self.conversation_manager.save_session()
+
+    def shutdown(self, timeout: Optional[float] = None):
+        """
+        Finish pending background ingestion.
+
+        Args:
+            timeout: Maximum time to wait (None waits indefinitely)
+        """
+        self.ingestion_worker.stop(timeout)
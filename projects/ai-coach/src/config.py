@@ -6,7 +6,7 @@ Loads settings from JSON files and environment variables.
 import json
 import os
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from dotenv import load_dotenv
 
 
@@ -33,6 +33,7 @@ class Config:
         # Load settings
         self.settings = self._load_json("config/settings.json")
         self.collections_config = self._load_json("config/collections_config.json")
+        self.keywords_config = self._load_json("config/keywords.json")
 
         # Get API key
         self.anthropic_api_key = os.getenv("ANTHROPIC_API_KEY")
@@ -87,6 +88,23 @@ class Config:
         """Get the ChromaDB persistence path."""
         return self.base_path / "data" / "chroma_db"
 
+    def get_ingestion_manifest_path(self) -> Path:
+        """Get the ingestion manifest path (removed along with the database)."""
+        return self.get_chroma_path() / "ingestion_manifest.json"
+
+    def get_embedding_cache_db_path(self) -> Path:
+        """Get the embedding cache database path (kept outside chroma_db so resets keep it)."""
+        return self.base_path / "data" / "embedding_cache.sqlite"
+
+    def get_embedding_cache_path(self) -> Path:
+        """Get the directory caching downloaded embedding models."""
+        return self.base_path / "data" / "models"
+
+    def get_metrics_log_path(self) -> Optional[Path]:
+        """Get the file receiving per-request JSON metrics (None if disabled)."""
+        log_file = self.settings.get("metrics_log_file", "data/logs/metrics.jsonl")
+        return self.base_path / log_file if log_file else None
+
     def get_conversation_history_path(self) -> Path:
         """Get the conversation history path."""
         return self.base_path / "data" / "conversation_history"
@@ -136,11 +154,171 @@ class Config:
         """Get frequency for auto-ingesting conversation history."""
         return self.settings.get("auto_ingest_history_every", 5)
 
+    @property
+    def parallel_retrieval(self) -> bool:
+        """Get whether collections are searched concurrently."""
+        return self.settings.get("parallel_retrieval", True)
+
+    @property
+    def query_embedding_cache_size(self) -> int:
+        """Get number of query embeddings kept in the LRU cache."""
+        return self.settings.get("query_embedding_cache_size", 128)
+
+    @property
+    def chunk_unit(self) -> str:
+        """Get unit of chunk sizes: "chars" or "tokens"."""
+        return self.settings.get("chunk_unit", "chars")
+
+    @property
+    def chunk_size_tokens(self) -> int:
+        """Get target chunk size in tokens (token chunking)."""
+        return self.settings.get("chunk_size_tokens", 200)
+
+    @property
+    def chunk_overlap_tokens(self) -> int:
+        """Get chunk overlap in tokens (token chunking)."""
+        return self.settings.get("chunk_overlap_tokens", 40)
+
+    @property
+    def tokenizer(self) -> Optional[str]:
+        """Get tokenizer.json path or Hugging Face model name used to count tokens (None: the embedding model's)."""
+        return self.settings.get("tokenizer")
+
+    @property
+    def embedding_max_tokens(self) -> int:
+        """Get maximum sequence length of the embedding model, special tokens included."""
+        return self.settings.get("embedding_max_tokens", 256)
+
+    @property
+    def embedding_backend(self) -> str:
+        """Get embedding backend: "chroma" (built-in model) or "onnx" (local onnxruntime)."""
+        return self.settings.get("embedding_backend", "chroma")
+
+    @property
+    def embedding_model(self) -> str:
+        """Get Hugging Face model used by the onnx embedding backend."""
+        return self.settings.get("embedding_model", "sentence-transformers/all-MiniLM-L6-v2")
+
+    @property
+    def embedding_batch_size(self) -> int:
+        """Get number of texts per inference call (onnx backend)."""
+        return self.settings.get("embedding_batch_size", 32)
+
+    @property
+    def embedding_threads(self) -> int:
+        """Get number of CPU threads for inference (0: onnxruntime default)."""
+        return self.settings.get("embedding_threads", 0)
+
+    @property
+    def embedding_quantize(self) -> bool:
+        """Check if the onnx backend runs an int8-quantized model."""
+        return self.settings.get("embedding_quantize", False)
+
+    @property
+    def embedding_cache_enabled(self) -> bool:
+        """Check if chunk embeddings are cached on disk."""
+        return self.settings.get("embedding_cache_enabled", True)
+
+    @property
+    def context_token_budget(self) -> int:
+        """Get maximum number of tokens of retrieved context in the prompt."""
+        return self.settings.get("context_token_budget", 1500)
+
+    @property
+    def hybrid_search(self) -> bool:
+        """Check if dense and BM25 results are fused (reciprocal rank fusion)."""
+        return self.settings.get("hybrid_search", True)
+
+    @property
+    def rrf_k(self) -> int:
+        """Get reciprocal rank fusion constant (higher flattens rank differences)."""
+        return self.settings.get("rrf_k", 60)
+
+    @property
+    def loader_workers(self) -> int:
+        """Get number of processes used to parse documents during ingestion."""
+        return self.settings.get("loader_workers", 1)
+
+    @property
+    def loader_timeout_seconds(self) -> Optional[float]:
+        """Get time after which a document still parsing is skipped (None: no limit)."""
+        return self.settings.get("loader_timeout_seconds", 120)
+
+    @property
+    def ingest_max_in_flight(self) -> int:
+        """Get maximum number of documents parsed ahead of the vector store."""
+        return self.settings.get("ingest_max_in_flight", 8)
+
+    @property
+    def ingest_batch_size(self) -> int:
+        """Get number of chunks written to the vector store at once."""
+        return self.settings.get("ingest_batch_size", 100)
+
+    @property
+    def response_cache_enabled(self) -> bool:
+        """Get whether the semantic response cache is enabled."""
+        return self.settings.get("response_cache_enabled", False)
+
+    @property
+    def response_cache_threshold(self) -> float:
+        """Get minimum cosine similarity for a response cache hit."""
+        return self.settings.get("response_cache_threshold", 0.95)
+
+    @property
+    def response_cache_ttl_seconds(self) -> float:
+        """Get lifetime of a response cache entry."""
+        return self.settings.get("response_cache_ttl_seconds", 3600)
+
+    @property
+    def response_cache_max_entries(self) -> int:
+        """Get maximum number of cached responses."""
+        return self.settings.get("response_cache_max_entries", 256)
+
+    @property
+    def warm_up_in_background(self) -> bool:
+        """Check if the SDK, collections and embedding model load in the background at startup."""
+        return self.settings.get("warm_up_in_background", True)
+
+    @property
+    def api_max_workers(self) -> int:
+        """Get number of coach requests the API processes concurrently."""
+        return self.settings.get("api_max_workers", 8)
+
+    @property
+    def session_idle_timeout_seconds(self) -> float:
+        """Get idle time after which an API session is saved and unloaded."""
+        return self.settings.get("session_idle_timeout_seconds", 1800)
+
+    @property
+    def max_active_sessions(self) -> int:
+        """Get maximum number of API sessions kept in memory."""
+        return self.settings.get("max_active_sessions", 1000)
+
+    @property
+    def journal_fsync(self) -> bool:
+        """Check if session journal appends are forced to disk."""
+        return self.settings.get("journal_fsync", True)
+
+    @property
+    def journal_compact_every(self) -> int:
+        """Get number of journaled exchanges after which a session file is rewritten."""
+        return self.settings.get("journal_compact_every", 50)
+
     @property
     def collections(self) -> Dict[str, Any]:
         """Get all collection configurations."""
         return self.collections_config["collections"]
 
+    @property
+    def keyword_categories(self) -> Dict[str, Any]:
+        """Get keyword sets used to classify messages (category -> keywords)."""
+        return self.keywords_config["categories"]
+
+    @property
+    def user_state_priority(self) -> list:
+        """Get user state categories, most important first."""
+        return self.keywords_config.get("state_priority", ["fatigue", "resistance", "energie"])
+
 
 # Global config instance (lazy-loaded)
 _config_instance = None
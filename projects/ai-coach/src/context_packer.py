@@ -0,0 +1,194 @@
+"""
+Context packer for the coach prompt.
+Fits the most relevant retrieved chunks into a token budget.
+"""
+
+from typing import Callable, Dict, List, Tuple
+from text_chunker import OVERLAP_MARKER
+from token_counter import estimate_tokens
+
+
+# Below this many free tokens, a chunk that does not fit is dropped rather than cut
+MIN_PARTIAL_TOKENS = 64
+
+NO_CONTEXT = "Aucun contexte pertinent trouvé."
+BLOCK_SEPARATOR = "\n---\n"
+
+
+class ContextPacker:
+    """Greedy packer: best results first, until the token budget is spent."""
+
+    def __init__(self, token_budget: int, count_tokens: Callable[[str], int] = estimate_tokens):
+        """
+        Initialize packer.
+
+        Args:
+            token_budget: Maximum number of tokens of the packed context
+            count_tokens: Function returning the token count of a text
+        """
+        self.token_budget = token_budget
+        self.count_tokens = count_tokens
+
+    def pack(self, results: List[Dict]) -> Tuple[str, Dict]:
+        """
+        Build the context string from search results.
+
+        Chunks are taken in relevance order. Consecutive chunks of the same
+        source are merged into one block and the overlap TextChunker copied
+        from the previous chunk is dropped, so no text is paid for twice.
+        A chunk that does not fit is skipped; the first one that does not fit
+        is cut to the remaining budget if enough of it is left.
+
+        Args:
+            results: Search results, most relevant first
+
+        Returns:
+            Tuple of (context string, stats with tokens, budget,
+            chunks_used, chunks_available, blocks and truncated)
+        """
+        # source key -> {"rank", "collection", "metadata",
+        #                "chunks": {chunk_index: (text, final, metadata)}}
+        # where final means the text must not be stripped of its overlap again
+        groups = {}
+        seen_texts = set()
+        used = 0
+        chunks_used = 0
+        truncated = False
+
+        for rank, result in enumerate(results):
+            text = result["text"]
+            if text in seen_texts:
+                continue
+            seen_texts.add(text)
+
+            metadata = result.get("metadata") or {}
+            chunk_index = metadata.get("chunk_index")
+            key = self._source_key(result) if chunk_index is not None else ("result", rank)
+            group = groups.get(key)
+
+            if group is not None and chunk_index is not None and chunk_index in group["chunks"]:
+                continue
+
+            joins_block = group is not None and chunk_index is not None and (
+                chunk_index - 1 in group["chunks"] or chunk_index + 1 in group["chunks"]
+            )
+            follows_previous = joins_block and chunk_index - 1 in group["chunks"]
+            body = self._strip_overlap(text, metadata) if follows_previous else text
+
+            # A chunk joining a block only adds its text; otherwise it also adds a header
+            header = self._header(0, result.get("collection", "unknown"), metadata)
+            overhead = 1 if joins_block else self.count_tokens(header + BLOCK_SEPARATOR)
+            cost = self.count_tokens(body) + overhead
+
+            if used + cost > self.token_budget:
+                remaining = self.token_budget - used - overhead
+                if truncated or remaining < MIN_PARTIAL_TOKENS:
+                    continue
+                body = self._truncate(body, remaining)
+                cost = self.count_tokens(body) + overhead
+                truncated = True
+                # Offsets no longer describe a cut text: keep it as is when rendering
+                follows_previous = True
+
+            if group is None:
+                group = groups[key] = {
+                    "rank": rank,
+                    "collection": result.get("collection", "unknown"),
+                    "metadata": metadata,
+                    "chunks": {}
+                }
+            group["chunks"][chunk_index if chunk_index is not None else 0] = (body, follows_previous, metadata)
+            used += cost
+            chunks_used += 1
+
+        context, num_blocks = self._render(groups)
+
+        stats = {
+            "tokens": self.count_tokens(context),
+            "budget": self.token_budget,
+            "chunks_used": chunks_used,
+            "chunks_available": len(results),
+            "blocks": num_blocks,
+            "truncated": truncated
+        }
+
+        return context, stats
+
+    def _render(self, groups: Dict) -> Tuple[str, int]:
+        """Format groups as numbered blocks of consecutive chunks."""
+        blocks = []
+
+        for group in sorted(groups.values(), key=lambda g: g["rank"]):
+            indices = sorted(group["chunks"])
+            run = [indices[0]]
+
+            for index in indices[1:] + [None]:
+                if index is not None and index == run[-1] + 1:
+                    run.append(index)
+                    continue
+
+                # Inside a run, every chunk after the first repeats the tail of its predecessor
+                parts = []
+                for position, i in enumerate(run):
+                    text, final, chunk_metadata = group["chunks"][i]
+                    parts.append(text if position == 0 or final else self._strip_overlap(text, chunk_metadata))
+
+                text = "\n\n".join(parts)
+                header = self._header(len(blocks) + 1, group["collection"], group["metadata"])
+                blocks.append(f"{header}{text}\n")
+                run = [index]
+
+        if not blocks:
+            return NO_CONTEXT, 0
+
+        return BLOCK_SEPARATOR.join(blocks), len(blocks)
+
+    @staticmethod
+    def _header(number: int, collection: str, metadata: Dict) -> str:
+        """Format the header line of a block."""
+        source = metadata.get("source_source", "Unknown")
+        return f"[{number}] Source: {collection} - {source}\n"
+
+    @staticmethod
+    def _source_key(result: Dict) -> Tuple:
+        """Identify the chunk sequence a result belongs to."""
+        metadata = result.get("metadata") or {}
+        source = metadata.get("source_file_path") or metadata.get("source_session_id") \
+            or metadata.get("source_source")
+        if source is None:
+            # Unknown origin: never merged with another result
+            return ("result", result.get("id") or id(result))
+        return (result.get("collection"), source, metadata.get("source_first_exchange"))
+
+    @staticmethod
+    def _strip_overlap(text: str, metadata: Dict) -> str:
+        """Remove the copy of the previous chunk's tail from a chunk."""
+        own_length = metadata.get("length")
+        if own_length is None and metadata.get("start") is not None and metadata.get("end") is not None:
+            # Chunks stored with their span only: the span is the chunk's own text
+            own_length = metadata["end"] - metadata["start"]
+        if own_length is not None:
+            # The chunk's own text is the last own_length characters
+            return text[-own_length:] if 0 < own_length < len(text) else text
+
+        # Chunks ingested before offsets were stored
+        if not metadata.get("chunk_index"):
+            return text
+        _, marker, body = text.partition(OVERLAP_MARKER)
+        return body if marker else text
+
+    def _truncate(self, text: str, max_tokens: int) -> str:
+        """Cut text at a word boundary so it fits in max_tokens (ellipsis included)."""
+        low, high = 0, len(text)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.count_tokens(text[:middle] + "...") <= max_tokens:
+                low = middle
+            else:
+                high = middle - 1
+
+        cut = text[:low]
+        space_idx = cut.rfind(" ")
+        if space_idx > 0:
+            cut = cut[:space_idx]
+        return cut + "..."
@@ -3,30 +3,70 @@ Conversation manager for maintaining chat history.
 Handles session persistence and auto-ingestion into vector database.
 """
 
+import hashlib
 import json
+import os
+import re
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Optional
+from session_index import SessionIndex
+
+
+# Session IDs become file names: letters, digits, "_" and "-" only
+SESSION_ID_PATTERN = re.compile(r"[\w-]+")
 
 
 class ConversationManager:
     """Manages conversation history and sessions."""
 
-    def __init__(self, history_path: str, auto_ingest_every: int = 5):
+    # Session IDs handed out in this process (several managers may run side by side)
+    _issued_session_ids = set()
+    _issued_lock = threading.Lock()
+
+    def __init__(
+        self,
+        history_path: str,
+        auto_ingest_every: int = 5,
+        journal_fsync: bool = True,
+        compact_every: int = 50
+    ):
         """
         Initialize conversation manager.
 
+        Exchanges are appended to a per-session journal ({session_id}.jsonl)
+        as they happen; save_session compacts the journal into the session
+        JSON file.
+
         Args:
             history_path: Path to store conversation history
             auto_ingest_every: Auto-ingest into vectorstore every N conversations
+            journal_fsync: Force each journal append to disk before returning
+            compact_every: Compact the journal after this many appended exchanges (0 disables)
         """
         self.history_path = Path(history_path)
         self.history_path.mkdir(parents=True, exist_ok=True)
 
         self.auto_ingest_every = auto_ingest_every
+        self.journal_fsync = journal_fsync
+        self.compact_every = compact_every
+        self._journaled_since_compaction = 0
+        # End of the exchanges handed to the ingestion worker but not yet confirmed
+        self._ingestion_queued_until = 0
+        # Bumped when a batch fails: batches queued before that are dropped
+        self._ingestion_epoch = 0
         self.current_session_id = None
         self.current_session = None
         self.conversation_count = 0
+        # Token usage of the retrieved context of the last reply (set by the coach)
+        self.last_context_stats: Dict = {}
+
+        # Guards the current session when it is shared between threads
+        self._lock = threading.RLock()
+
+        # Summary table of saved sessions (call sync_index() to pick up external changes)
+        self.index = SessionIndex(str(self.history_path / "sessions_index.sqlite"))
 
     def start_new_session(self) -> str:
         """
@@ -35,19 +75,63 @@ class ConversationManager:
         Returns:
             Session ID
         """
-        session_id = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-
-        self.current_session_id = session_id
-        self.current_session = {
-            "session_id": session_id,
-            "date": datetime.now().strftime("%Y-%m-%d"),
-            "start_time": datetime.now().isoformat(),
-            "exchanges": [],
-            "summary": ""
-        }
+        session_id = self._unique_session_id(datetime.now().strftime("%Y-%m-%d_%H-%M-%S"))
+
+        with self._lock:
+            self.current_session_id = session_id
+            self.current_session = {
+                "session_id": session_id,
+                "date": datetime.now().strftime("%Y-%m-%d"),
+                "start_time": datetime.now().isoformat(),
+                "exchanges": [],
+                "summary": ""
+            }
+            self._journaled_since_compaction = 0
+            self._ingestion_queued_until = 0
 
         return session_id
 
+    def resume_session(self, session_id: str) -> bool:
+        """
+        Continue a saved session.
+
+        Args:
+            session_id: Session ID to resume
+
+        Returns:
+            True if the session was found and loaded
+        """
+        session = self.load_session(session_id)
+        if session is None:
+            return False
+
+        with self._lock:
+            self.current_session_id = session_id
+            self.current_session = session
+            self.conversation_count = 0
+            self._journaled_since_compaction = 0
+            self._ingestion_queued_until = 0
+
+        return True
+
+    @staticmethod
+    def is_valid_session_id(session_id: Optional[str]) -> bool:
+        """Check that a session ID cannot point outside the history directory."""
+        return bool(session_id) and SESSION_ID_PATTERN.fullmatch(session_id) is not None
+
+    def _unique_session_id(self, base_id: str) -> str:
+        """Make a timestamp-based session ID unique across managers and saved files."""
+        with ConversationManager._issued_lock:
+            session_id = base_id
+            suffix = 2
+            while (session_id in ConversationManager._issued_session_ids
+                   or (self.history_path / f"{session_id}.json").exists()
+                   or self._journal_path(session_id).exists()):
+                session_id = f"{base_id}_{suffix}"
+                suffix += 1
+            ConversationManager._issued_session_ids.add(session_id)
+            return session_id
+
     def add_exchange(self, user_message: str, coach_response: str, user_state: str = "normal"):
         """
         Add an exchange to the current session.
@@ -57,50 +141,199 @@ class ConversationManager:
             coach_response: Coach's response
             user_state: Detected user state
         """
-        if self.current_session is None:
-            self.start_new_session()
+        with self._lock:
+            if self.current_session is None:
+                self.start_new_session()
 
-        exchange = {
-            "timestamp": datetime.now().isoformat(),
-            "user_message": user_message,
-            "coach_response": coach_response,
-            "user_state": user_state
-        }
+            exchange = {
+                "timestamp": datetime.now().isoformat(),
+                "user_message": user_message,
+                "coach_response": coach_response,
+                "user_state": user_state
+            }
+
+            self.current_session["exchanges"].append(exchange)
+            self.conversation_count += 1
+
+            # Durable right away, at constant cost
+            self._append_to_journal(exchange, len(self.current_session["exchanges"]) - 1)
+
+            if self.compact_every and self._journaled_since_compaction >= self.compact_every:
+                self.save_session()
+
+    def _journal_path(self, session_id: str) -> Path:
+        """Get the journal file of a session."""
+        return self.history_path / f"{session_id}.jsonl"
+
+    def _append_to_journal(self, exchange: Dict, position: int):
+        """
+        Append one exchange to the current session's journal.
+
+        The first append writes a header with the session fields. Each
+        exchange records its position so replay can skip exchanges already
+        compacted into the JSON file.
+
+        Args:
+            exchange: Exchange dictionary
+            position: Index of the exchange in the session
+        """
+        self._write_journal_record({"type": "exchange", "position": position, **exchange})
+        self._journaled_since_compaction += 1
+
+    def _write_journal_record(self, record: Dict):
+        """Append one record to the current session's journal (header first if new)."""
+        journal_path = self._journal_path(self.current_session_id)
+        lines = []
+
+        if not journal_path.exists():
+            header = {key: value for key, value in self.current_session.items() if key != "exchanges"}
+            lines.append(json.dumps({"type": "session", **header}, ensure_ascii=False))
+        elif self._has_torn_tail(journal_path):
+            # Terminate a line left half-written by a crash so it stays isolated
+            lines.append("")
+
+        lines.append(json.dumps(record, ensure_ascii=False))
+
+        with open(journal_path, 'a', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+            if self.journal_fsync:
+                os.fsync(f.fileno())
+
+    @staticmethod
+    def _has_torn_tail(journal_path: Path) -> bool:
+        """Check if a journal does not end with a complete line."""
+        with open(journal_path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return False
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+
+    def _replay_journal(self, session_id: str, session: Optional[Dict]) -> Optional[Dict]:
+        """
+        Apply a session's journal on top of its saved JSON (if any).
+
+        Args:
+            session_id: Session ID
+            session: Session loaded from the JSON file, or None
+
+        Returns:
+            Session with journaled exchanges, or the input if there is no journal
+        """
+        journal_path = self._journal_path(session_id)
+        if not journal_path.exists():
+            return session
+
+        with open(journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn write at the end of the journal (crash mid-append)
+                    continue
+
+                record_type = record.pop("type", None)
+                if record_type == "session":
+                    if session is None:
+                        session = {**record, "exchanges": []}
+                elif record_type == "exchange" and session is not None:
+                    position = record.pop("position", len(session["exchanges"]))
+                    if position >= len(session["exchanges"]):
+                        session["exchanges"].append(record)
+                elif record_type == "ingested" and session is not None:
+                    session["ingested_exchanges"] = record.get("count", 0)
+
+        return session
+
+    def recover_journals(self) -> int:
+        """
+        Compact journals left behind by sessions that were never saved (e.g. after a crash).
+
+        Returns:
+            Number of sessions recovered
+        """
+        recovered = 0
+        for journal_path in self.history_path.glob("*.jsonl"):
+            session_id = journal_path.stem
+            if session_id == self.current_session_id:
+                continue
 
-        self.current_session["exchanges"].append(exchange)
-        self.conversation_count += 1
+            try:
+                session = self.load_session(session_id)
+                if session and session.get("exchanges"):
+                    recovery = ConversationManager(
+                        str(self.history_path),
+                        journal_fsync=self.journal_fsync,
+                        compact_every=0
+                    )
+                    recovery.current_session_id = session_id
+                    recovery.current_session = session
+                    recovery.save_session()
+                else:
+                    journal_path.unlink()
+                recovered += 1
+            except Exception as e:
+                print(f"Error recovering session journal {journal_path}: {e}")
+
+        return recovered
 
     def save_session(self):
         """Save current session to file."""
-        if self.current_session is None or not self.current_session["exchanges"]:
-            return
+        with self._lock:
+            if self.current_session is None or not self.current_session["exchanges"]:
+                return
+
+            # Generate summary
+            self.current_session["summary"] = self._generate_summary()
 
-        # Generate summary
-        self.current_session["summary"] = self._generate_summary()
+            # Save to file (write-then-rename so a crash never leaves a truncated file)
+            session_file = self.history_path / f"{self.current_session_id}.json"
+            tmp_file = session_file.with_suffix(".json.tmp")
 
-        # Save to file
-        session_file = self.history_path / f"{self.current_session_id}.json"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.current_session, f, ensure_ascii=False, indent=2)
+                f.flush()
+                if self.journal_fsync:
+                    os.fsync(f.fileno())
 
-        with open(session_file, 'w', encoding='utf-8') as f:
-            json.dump(self.current_session, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, session_file)
+
+            # The snapshot now holds every journaled exchange
+            self._journal_path(self.current_session_id).unlink(missing_ok=True)
+            self._journaled_since_compaction = 0
+
+            # Keep the session index up to date
+            self.index.upsert(
+                SessionIndex.entry_from_session(self.current_session, session_file.stat().st_mtime)
+            )
 
     def load_session(self, session_id: str) -> Optional[Dict]:
         """
-        Load a session from file.
+        Load a session from file, including exchanges still in its journal.
 
         Args:
             session_id: Session ID to load
 
         Returns:
-            Session data or None if not found
+            Session data or None if not found (or the ID or file is not a valid session)
         """
+        if not self.is_valid_session_id(session_id):
+            return None
+
         session_file = self.history_path / f"{session_id}.json"
+        session = None
 
-        if not session_file.exists():
-            return None
+        if session_file.exists():
+            with open(session_file, 'r', encoding='utf-8') as f:
+                session = json.load(f)
+
+            if not isinstance(session, dict) or not isinstance(session.get("exchanges"), list):
+                print(f"Warning: {session_file.name} is not a session file, ignored")
+                return None
 
-        with open(session_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        # Exchanges not yet compacted into the JSON file
+        return self._replay_journal(session_id, session)
 
     def get_recent_sessions(self, n: int = 5) -> List[Dict]:
         """
@@ -145,21 +378,84 @@ class ConversationManager:
         for session_file in session_files:
             try:
                 with open(session_file, 'r', encoding='utf-8') as f:
-                    session_data = json.load(f)
-                    # Add end_time if missing
-                    if "end_time" not in session_data:
-                        session_data["end_time"] = None
-                    # Fix key names for API
-                    if "user" in session_data.get("exchanges", [{}])[0]:
-                        for exchange in session_data["exchanges"]:
-                            exchange["user_message"] = exchange.pop("user", "")
-                            exchange["coach_response"] = exchange.pop("coach", "")
-                    sessions.append(session_data)
+                    sessions.append(self._normalize_session(json.load(f)))
             except Exception as e:
                 print(f"Error loading session {session_file}: {e}")
 
         return sessions
 
+    def sync_index(self) -> int:
+        """
+        Index session files saved outside this manager (or before the index existed).
+
+        Journals left by interrupted sessions are compacted first.
+
+        Returns:
+            Number of session files (re)indexed
+        """
+        self.recover_journals()
+        return self.index.sync(self.history_path)
+
+    def get_session_summaries(self, limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        """
+        Get session summaries from the index, most recent first.
+
+        Args:
+            limit: Maximum number of sessions (all if None)
+            offset: Number of sessions to skip
+
+        Returns:
+            List of dictionaries with session_id, date, start_time, end_time,
+            message_count, title and summary
+        """
+        return self.index.list(limit=limit, offset=offset)
+
+    def get_session_page(self, limit: int = 50, cursor: Optional[str] = None) -> tuple:
+        """
+        Get one page of session summaries, most recent first.
+
+        Args:
+            limit: Number of sessions per page
+            cursor: Cursor returned with the previous page
+
+        Returns:
+            Tuple of (list of summaries, next cursor or None)
+        """
+        return self.index.list_page(limit, cursor)
+
+    def get_session(self, session_id: str) -> Optional[Dict]:
+        """
+        Load one session with API-ready field names.
+
+        Args:
+            session_id: Session ID to load
+
+        Returns:
+            Session data or None if not found
+        """
+        try:
+            session = self.load_session(session_id)
+        except Exception as e:
+            print(f"Error loading session {session_id}: {e}")
+            return None
+
+        return self._normalize_session(session) if session else None
+
+    @staticmethod
+    def _normalize_session(session_data: Dict) -> Dict:
+        """Fill missing fields and rename legacy exchange keys."""
+        # Add end_time if missing
+        if "end_time" not in session_data:
+            session_data["end_time"] = None
+
+        # Fix key names for API
+        for exchange in session_data.get("exchanges", []):
+            if "user" in exchange:
+                exchange["user_message"] = exchange.pop("user", "")
+                exchange["coach_response"] = exchange.pop("coach", "")
+
+        return session_data
+
     def get_current_session(self) -> Dict:
         """
         Get current session data.
@@ -199,6 +495,33 @@ class ConversationManager:
 
         return "\n".join(history_parts)
 
+    def get_history_digest(self, n_exchanges: int = 5) -> str:
+        """
+        Get a digest of the messages of the recent conversation history.
+
+        Two sessions get the same digest only if their last n_exchanges
+        exchanges have the same messages (timestamps are ignored).
+
+        Args:
+            n_exchanges: Number of recent exchanges to include
+
+        Returns:
+            Hex digest, or "" when there is no history
+        """
+        if not self.current_session or not self.current_session["exchanges"]:
+            return ""
+
+        digest = hashlib.sha256()
+        for exchange in self.current_session["exchanges"][-n_exchanges:]:
+            for text in (
+                exchange.get('user_message', exchange.get('user', '')),
+                exchange.get('coach_response', exchange.get('coach', ''))
+            ):
+                digest.update(text.encode("utf-8"))
+                digest.update(b"\0")
+
+        return digest.hexdigest()
+
     def should_auto_ingest(self) -> bool:
         """Check if we should auto-ingest conversation history."""
         return self.conversation_count >= self.auto_ingest_every
@@ -231,19 +554,26 @@ class ConversationManager:
 
         return summary
 
-    def get_session_for_ingestion(self) -> Optional[Dict]:
+    def get_session_for_ingestion(self, start_index: int = 0) -> Optional[Dict]:
         """
         Get current session formatted for ingestion into vector database.
 
+        Args:
+            start_index: Index of the first exchange to include
+
         Returns:
-            Dictionary with text and metadata for ingestion
+            Dictionary with text and metadata for ingestion, or None if there
+            are no exchanges from start_index on
         """
-        if not self.current_session or not self.current_session["exchanges"]:
+        if not self.current_session or len(self.current_session["exchanges"]) <= start_index:
             return None
 
-        # Build comprehensive text from all exchanges
+        exchanges = self.current_session["exchanges"][start_index:]
+        end_index = start_index + len(exchanges)
+
+        # Build text from the selected exchanges
         exchanges_text = []
-        for exchange in self.current_session["exchanges"]:
+        for exchange in exchanges:
             user_msg = exchange.get('user_message', exchange.get('user', ''))
             coach_msg = exchange.get('coach_response', exchange.get('coach', ''))
             exchanges_text.append(
@@ -253,18 +583,114 @@ class ConversationManager:
 
         full_text = "\n\n".join(exchanges_text)
 
-        # Add summary at the beginning
-        summary = self._generate_summary()
-        full_text = f"{summary}\n\n---\n\n{full_text}"
+        # Header depends only on the selected range so re-ingesting it yields the same chunks
+        header = (
+            f"Session du {self.current_session['date']}, "
+            f"échanges {start_index + 1} à {end_index}."
+        )
+        full_text = f"{header}\n\n---\n\n{full_text}"
 
         metadata = {
             "session_id": self.current_session_id,
             "date": self.current_session["date"],
-            "num_exchanges": len(self.current_session["exchanges"]),
-            "summary": summary
+            "num_exchanges": len(exchanges),
+            "first_exchange": start_index,
+            "summary": self._generate_summary()
         }
 
         return {
             "text": full_text,
             "metadata": metadata
         }
+
+    def take_pending_ingestion(self) -> Optional[Dict]:
+        """
+        Get the exchanges not yet ingested nor queued for ingestion.
+
+        The ingested position is only advanced by finish_ingestion(), once
+        the chunks are stored, so a failed or lost batch is retried later.
+
+        Returns:
+            Dictionary with text and metadata for ingestion, or None if
+            everything is already ingested or queued
+        """
+        with self._lock:
+            if not self.current_session:
+                return None
+
+            start_index = max(self.current_session.get("ingested_exchanges", 0), self._ingestion_queued_until)
+            session_data = self.get_session_for_ingestion(start_index)
+            self.reset_auto_ingest_counter()
+
+            if session_data:
+                self._ingestion_queued_until = start_index + session_data["metadata"]["num_exchanges"]
+                session_data["ingestion_epoch"] = self._ingestion_epoch
+
+            return session_data
+
+    def should_ingest(self, session_data: Dict) -> bool:
+        """
+        Check if a queued batch should still be stored (called by the ingestion worker).
+
+        Once a batch has failed, the batches queued after it are dropped:
+        the retry covers their exchanges too, under another excerpt header,
+        so storing them as well would duplicate those exchanges.
+
+        Args:
+            session_data: Batch returned by take_pending_ingestion()
+
+        Returns:
+            False if a batch failed since this one was queued
+        """
+        with self._lock:
+            return session_data.get("ingestion_epoch") == self._ingestion_epoch
+
+    def finish_ingestion(self, session_data: Dict, succeeded: bool) -> None:
+        """
+        Record the outcome of an ingestion batch (called by the ingestion worker).
+
+        On success the position is stored in the session ("ingested_exchanges")
+        and journaled, so a resumed session continues where the last stored
+        batch stopped. Batches only advance the position when they start
+        exactly at it. On failure the batches queued after this one are
+        dropped (see should_ingest) and the next auto-ingestion starts again
+        from the stored position.
+
+        Args:
+            session_data: Batch returned by take_pending_ingestion()
+            succeeded: Whether its chunks were stored
+        """
+        metadata = session_data["metadata"]
+        session_id = metadata["session_id"]
+        first = metadata["first_exchange"]
+        end = first + metadata["num_exchanges"]
+
+        with self._lock:
+            if not succeeded:
+                self._ingestion_epoch += 1
+
+            if session_id == self.current_session_id:
+                ingested = self.current_session.get("ingested_exchanges", 0)
+                if not succeeded:
+                    self._ingestion_queued_until = ingested
+                elif first == ingested:
+                    self.current_session["ingested_exchanges"] = end
+                    self._write_journal_record({"type": "ingested", "count": end})
+                return
+
+        # The manager moved on to another session: update the saved one
+        if succeeded:
+            session = self.load_session(session_id)
+            if session is not None and session.get("ingested_exchanges", 0) == first:
+                self._append_record(session_id, {"type": "ingested", "count": end})
+
+    def _append_record(self, session_id: str, record: Dict) -> None:
+        """Append a record to the journal of a saved session (replayed on top of its JSON file)."""
+        journal_path = self._journal_path(session_id)
+        prefix = "\n" if journal_path.exists() and self._has_torn_tail(journal_path) else ""
+
+        with open(journal_path, 'a', encoding='utf-8') as f:
+            f.write(prefix + json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            if self.journal_fsync:
+                os.fsync(f.fileno())
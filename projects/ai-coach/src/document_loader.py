@@ -4,11 +4,39 @@ Preserves metadata and handles encoding properly.
 """
 
 import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime
-import pypdf
-from docx import Document
+
+
+def _load_document_safe(file_path: str) -> Tuple[str, Optional[Tuple[str, Dict]], Optional[str]]:
+    """Load a document in a worker process, returning errors instead of raising."""
+    try:
+        return file_path, DocumentLoader.load_document(file_path), None
+    except Exception as e:
+        return file_path, None, str(e)
+
+
+def _new_process_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Create a pool of loader processes.
+
+    Workers are spawned rather than forked: the caller may already run
+    threads (embedding pipeline, Chroma, background warm-up), and a forked
+    child can inherit one of their locks in a held state and hang.
+    """
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def _terminate_process_pool(executor: ProcessPoolExecutor) -> None:
+    """Kill the workers of a pool (a hung parser cannot be interrupted otherwise)."""
+    for process in list((getattr(executor, "_processes", None) or {}).values()):
+        process.terminate()
+    executor.shutdown(wait=False, cancel_futures=True)
 
 
 class DocumentLoader:
@@ -77,6 +105,9 @@ class DocumentLoader:
             raise FileNotFoundError(f"File not found: {file_path}")
 
         try:
+            # Imported on use: only ingestion reads PDF files
+            import pypdf
+
             reader = pypdf.PdfReader(file_path)
 
             # Extract text from all pages
@@ -125,6 +156,8 @@ class DocumentLoader:
             raise FileNotFoundError(f"File not found: {file_path}")
 
         try:
+            from docx import Document
+
             doc = Document(file_path)
 
             # Extract text from all paragraphs
@@ -174,35 +207,34 @@ class DocumentLoader:
         else:
             raise ValueError(f"Unsupported file type: {extension}")
 
+    SUPPORTED_EXTENSIONS = {'.txt', '.pdf', '.docx'}
+
     @staticmethod
-    def load_directory(directory_path: str, recursive: bool = True) -> List[Tuple[str, Dict]]:
+    def list_files(directory_path: str, recursive: bool = True) -> List[Path]:
         """
-        Load all supported documents from a directory.
+        List all supported documents in a directory.
 
         Args:
             directory_path: Path to the directory
             recursive: Whether to search subdirectories
 
         Returns:
-            List of (content, metadata) tuples
+            Sorted list of file paths
         """
         path = Path(directory_path)
 
         if not path.exists() or not path.is_dir():
             raise ValueError(f"Invalid directory: {directory_path}")
 
-        supported_extensions = {'.txt', '.pdf', '.docx'}
-        documents = []
-
         # Get all files
         if recursive:
             files = path.rglob('*')
         else:
             files = path.glob('*')
 
-        # Load each supported file
+        supported = []
         for file_path in files:
-            if file_path.is_file() and file_path.suffix.lower() in supported_extensions:
+            if file_path.is_file() and file_path.suffix.lower() in DocumentLoader.SUPPORTED_EXTENSIONS:
                 # Skip symlinks that don't point to valid files
                 if file_path.is_symlink():
                     try:
@@ -213,10 +245,160 @@ class DocumentLoader:
                         print(f"Skipping invalid symlink: {file_path}")
                         continue
 
-                try:
-                    content, metadata = DocumentLoader.load_document(str(file_path))
-                    documents.append((content, metadata))
-                except Exception as e:
-                    print(f"Error loading {file_path}: {e}")
+                supported.append(file_path)
+
+        return sorted(supported)
+
+    @staticmethod
+    def iter_documents(
+        file_paths: Iterable,
+        workers: int = 1,
+        max_in_flight: Optional[int] = None,
+        timeout: Optional[float] = None
+    ) -> Iterator[Tuple[str, Dict]]:
+        """
+        Load documents, yielding each one as soon as it is parsed.
+
+        With more than one worker, files are parsed in a process pool and
+        results arrive in completion order. At most max_in_flight files are
+        submitted at once. When a worker crashes, the files that were in
+        flight are retried one at a time, so only a file crashing its worker
+        on its own is skipped. A file parsing for longer than timeout
+        seconds is skipped and the pool is restarted, the other files in
+        flight being resubmitted. Files that fail to load are reported and
+        skipped.
+
+        Args:
+            file_paths: Paths of the files to load
+            workers: Number of worker processes (1 loads in this process)
+            max_in_flight: Maximum number of files queued or parsing at once
+                (defaults to twice the number of workers)
+            timeout: Maximum parsing time of a file in seconds (None: no
+                limit; only enforced with worker processes)
+
+        Yields:
+            (content, metadata) tuples
+        """
+        if workers <= 1:
+            for file_path in file_paths:
+                _, document, error = _load_document_safe(str(file_path))
+                if error:
+                    print(f"Error loading {file_path}: {error}")
+                else:
+                    yield document
+            return
+
+        max_in_flight = max(max_in_flight or workers * 2, 1)
+        poll_interval = min(timeout / 4, 1.0) if timeout else None
+        pending_paths = iter(file_paths)
+        requeued = []  # Files to submit again, not suspected of anything
+        suspects = []  # Files in flight when a worker crashed, retried alone
+        executor = _new_process_pool(workers)
+        in_flight = {}  # Future -> (file path, submitted alone)
+        started = {}  # Future -> time it was first seen running
+
+        def submit(file_path: str, alone: bool = False) -> None:
+            in_flight[executor.submit(_load_document_safe, file_path)] = (file_path, alone)
+
+        def fill() -> None:
+            if suspects:
+                # Isolate suspects: a crash with one file in flight names the culprit
+                if not in_flight:
+                    submit(suspects.pop(), alone=True)
+                return
+
+            while len(in_flight) < max_in_flight:
+                if requeued:
+                    submit(requeued.pop())
+                    continue
+                file_path = next(pending_paths, None)
+                if file_path is None:
+                    return
+                submit(str(file_path))
+
+        try:
+            fill()
+
+            while in_flight:
+                done, _ = wait(in_flight, timeout=poll_interval, return_when=FIRST_COMPLETED)
+
+                crashed = False
+                for future in done:
+                    file_path, alone = in_flight.pop(future)
+                    started.pop(future, None)
+                    try:
+                        _, document, error = future.result()
+                    except BrokenProcessPool:
+                        # A worker died (e.g. native crash in a parser)
+                        crashed = True
+                        if alone:
+                            print(f"Error loading {file_path}: worker process crashed")
+                        else:
+                            suspects.append(file_path)
+                        continue
+
+                    if error:
+                        print(f"Error loading {file_path}: {error}")
+                    else:
+                        yield document
+
+                timed_out = False
+                if timeout and not crashed:
+                    now = time.monotonic()
+                    for future in in_flight:
+                        if future.running():
+                            started.setdefault(future, now)
+                    for future in [future for future, since in started.items() if now - since > timeout]:
+                        file_path, _ = in_flight.pop(future)
+                        del started[future]
+                        print(f"Error loading {file_path}: no result after {timeout:g}s, skipped")
+                        timed_out = True
+
+                if crashed or timed_out:
+                    # The pool is unusable (or hung): resubmit what it still held on a fresh one.
+                    # After a crash any of them may be the culprit, after a timeout none is.
+                    for file_path, _ in in_flight.values():
+                        (suspects if crashed else requeued).append(file_path)
+                    in_flight.clear()
+                    started.clear()
+                    _terminate_process_pool(executor)
+                    executor = _new_process_pool(workers)
+
+                fill()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def iter_directory(
+        directory_path: str,
+        recursive: bool = True,
+        workers: int = 1
+    ) -> Iterator[Tuple[str, Dict]]:
+        """
+        Load all supported documents from a directory as a stream.
+
+        Args:
+            directory_path: Path to the directory
+            recursive: Whether to search subdirectories
+            workers: Number of worker processes
+
+        Yields:
+            (content, metadata) tuples, in completion order
+        """
+        file_paths = DocumentLoader.list_files(directory_path, recursive)
+        yield from DocumentLoader.iter_documents(file_paths, workers=workers)
+
+    @staticmethod
+    def load_directory(directory_path: str, recursive: bool = True, workers: int = 1) -> List[Tuple[str, Dict]]:
+        """
+        Load all supported documents from a directory.
+
+        Args:
+            directory_path: Path to the directory
+            recursive: Whether to search subdirectories
+            workers: Number of worker processes
 
-        return documents
+        Returns:
+            List of (content, metadata) tuples
+        """
+        return list(DocumentLoader.iter_directory(directory_path, recursive, workers))
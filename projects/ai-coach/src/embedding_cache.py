@@ -0,0 +1,140 @@
+"""
+Persistent embedding cache.
+Maps a digest of (model, text) to its vector so unchanged text is never
+embedded twice, even after the vector database is rebuilt.
+"""
+
+import hashlib
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+import numpy as np
+
+
+class EmbeddingCache:
+    """Content-addressed store of float32 vectors in SQLite."""
+
+    # SQLite limits the number of parameters of a statement
+    MAX_QUERY_PARAMS = 500
+
+    def __init__(self, db_path: str):
+        """
+        Initialize cache (creates the database if needed).
+
+        Args:
+            db_path: Path of the SQLite database file
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+
+        with self._connect() as conn:
+            # Ingestion writes while the chat process reads
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    digest TEXT PRIMARY KEY,
+                    vector BLOB NOT NULL
+                ) WITHOUT ROWID
+                """
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a short-lived connection (safe to use from any thread)."""
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(model_id: str, text: str) -> str:
+        """Build the cache key of a text embedded by a model."""
+        return hashlib.sha256(f"{model_id}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, model_id: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Look up the vectors of several texts.
+
+        Args:
+            model_id: Identifier of the embedding model
+            texts: Texts to look up
+
+        Returns:
+            Vectors aligned with texts (None where not cached)
+        """
+        keys = [self.make_key(model_id, text) for text in texts]
+        found: Dict[str, bytes] = {}
+
+        with self._connect() as conn:
+            for first in range(0, len(keys), self.MAX_QUERY_PARAMS):
+                page = keys[first:first + self.MAX_QUERY_PARAMS]
+                rows = conn.execute(
+                    f"SELECT digest, vector FROM embeddings WHERE digest IN ({', '.join('?' for _ in page)})",
+                    page
+                ).fetchall()
+                found.update(rows)
+
+        vectors = [
+            np.frombuffer(found[key], dtype=np.float32).tolist() if key in found else None
+            for key in keys
+        ]
+
+        hits = len(found)
+        self.hits += hits
+        self.misses += len(keys) - hits
+
+        return vectors
+
+    def put_many(self, model_id: str, texts: List[str], vectors: List[List[float]]) -> None:
+        """
+        Store the vectors of several texts.
+
+        Args:
+            model_id: Identifier of the embedding model
+            texts: Embedded texts
+            vectors: Their vectors, aligned with texts
+        """
+        rows = [
+            (self.make_key(model_id, text), np.asarray(vector, dtype=np.float32).tobytes())
+            for text, vector in zip(texts, vectors)
+        ]
+
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?)", rows)
+
+    def count(self) -> int:
+        """Get the number of cached vectors."""
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def stats(self) -> Dict:
+        """Get hit/miss counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": self.count()
+        }
+
+
+def create_embedding_cache(config) -> Optional[EmbeddingCache]:
+    """
+    Build the embedding cache described by the configuration.
+
+    Args:
+        config: Configuration object
+
+    Returns:
+        EmbeddingCache, or None if disabled
+    """
+    if not config.embedding_cache_enabled:
+        return None
+    return EmbeddingCache(str(config.get_embedding_cache_db_path()))
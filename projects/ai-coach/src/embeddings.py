@@ -0,0 +1,309 @@
+"""
+Embedding backends for the vectorstore.
+Chroma's default model, or a sentence-transformers model run locally
+with onnxruntime (batching, thread count and int8 quantization on CPU).
+"""
+
+import threading
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Callable, List, Optional
+import numpy as np
+
+
+def onnx_model_id(model_name: str, quantized: bool) -> str:
+    """
+    Build the identifier of a model run by the onnx backend.
+
+    It differs from Chroma's id for the same model, and the int8 copy gets
+    its own id: their vectors are close but not identical, so they must not
+    share collections or embedding cache entries.
+
+    Args:
+        model_name: Hugging Face repository of the model
+        quantized: Whether the int8 copy is run
+
+    Returns:
+        Identifier such as "onnx:all-MiniLM-L6-v2:int8"
+    """
+    return f"onnx:{model_name.split('/')[-1]}:{'int8' if quantized else 'fp32'}"
+
+
+def quantization_available() -> bool:
+    """Check, without importing them, that the packages used by int8 quantization are installed."""
+    return find_spec("onnxruntime") is not None and find_spec("onnx") is not None
+
+
+class ChromaDefaultEmbedding:
+    """Chroma's built-in all-MiniLM-L6-v2 (ONNX) embedding function."""
+
+    model_id = "all-MiniLM-L6-v2"
+    # Hugging Face repository of the same model (same tokenizer)
+    model_name = "sentence-transformers/all-MiniLM-L6-v2"
+
+    def __init__(self):
+        from chromadb.utils import embedding_functions
+
+        self._function = embedding_functions.DefaultEmbeddingFunction()
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        """Embed texts."""
+        return [[float(x) for x in embedding] for embedding in self._function(input)]
+
+
+class LazyEmbedding:
+    """
+    Embedding backend built on first use.
+
+    Loading a model (and importing its runtime) takes seconds, while the
+    model id is known upfront: collections can be opened and checked
+    before the model is needed.
+    """
+
+    def __init__(self, factory: Callable, model_id: str):
+        """
+        Initialize wrapper.
+
+        Args:
+            factory: Callable building the real embedding function
+            model_id: Identifier the real function is expected to report
+        """
+        self.factory = factory
+        self._model_id = model_id
+        self._function = None
+        self._lock = threading.Lock()
+
+    @property
+    def model_id(self) -> str:
+        """Get the id reported by the loaded function (the expected one before loading)."""
+        if self._function is not None:
+            return getattr(self._function, "model_id", self._model_id)
+        return self._model_id
+
+    @property
+    def loaded(self) -> bool:
+        """Check if the model has been loaded."""
+        return self._function is not None
+
+    def get(self):
+        """Get the real embedding function, building it if needed."""
+        if self._function is None:
+            with self._lock:
+                if self._function is None:
+                    self._function = self.factory()
+        return self._function
+
+    def warm_up(self) -> None:
+        """Load the model and run it once (backends load weights on their first call)."""
+        self.get()(["warm-up"])
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        """Embed texts."""
+        return self.get()(input)
+
+
+class LocalOnnxEmbedding:
+    """Sentence-transformers model exported to ONNX, run on CPU with onnxruntime."""
+
+    def __init__(
+        self,
+        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        cache_dir: Optional[str] = None,
+        batch_size: int = 32,
+        num_threads: int = 0,
+        quantize: bool = False,
+        max_length: int = 256
+    ):
+        """
+        Initialize backend (model files are downloaded once into cache_dir).
+
+        Args:
+            model_name: Hugging Face repository with onnx/model.onnx and tokenizer.json
+            cache_dir: Directory caching downloaded and quantized models
+            batch_size: Number of texts per inference call
+            num_threads: Threads used by onnxruntime (0 lets it decide)
+            quantize: Run an int8 dynamically quantized copy of the model
+            max_length: Maximum sequence length (longer texts are truncated)
+        """
+        self.model_name = model_name
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.batch_size = batch_size
+        self.num_threads = num_threads
+        self.max_length = max_length
+
+        self.tokenizer = self._load_tokenizer()
+        model_path = self._download("onnx/model.onnx")
+        self.quantized = False
+
+        if quantize:
+            try:
+                model_path = self._quantize(model_path)
+                self.quantized = True
+            except ImportError as e:
+                print(f"int8 quantization unavailable ({e}), using the fp32 model")
+
+        # Set once the model actually run is known
+        self.model_id = onnx_model_id(model_name, self.quantized)
+
+        self.session = self._create_session(model_path)
+        self._input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        """
+        Embed texts.
+
+        Texts are sorted by length before batching so each batch is padded
+        only to its own longest text.
+
+        Args:
+            input: Texts to embed
+
+        Returns:
+            Normalized embeddings, in input order
+        """
+        order = sorted(range(len(input)), key=lambda i: len(input[i]))
+        embeddings = [None] * len(input)
+
+        for first in range(0, len(order), self.batch_size):
+            batch_indices = order[first:first + self.batch_size]
+            vectors = self._embed_batch([input[i] for i in batch_indices])
+            for i, vector in zip(batch_indices, vectors):
+                embeddings[i] = vector.tolist()
+
+        return embeddings
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Run the model on one batch and mean-pool the token embeddings."""
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+
+        inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            inputs["token_type_ids"] = np.zeros_like(input_ids)
+
+        token_embeddings = self.session.run(None, inputs)[0]
+
+        mask = attention_mask[..., None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return pooled / np.clip(norms, 1e-12, None)
+
+    def _download(self, filename: str) -> str:
+        """Get a model file from the local cache, downloading it the first time."""
+        from huggingface_hub import hf_hub_download
+
+        return hf_hub_download(
+            repo_id=self.model_name,
+            filename=filename,
+            cache_dir=str(self.cache_dir) if self.cache_dir else None
+        )
+
+    def _load_tokenizer(self):
+        """Load the model's tokenizer (truncated to max_length, padded to the longest text)."""
+        from tokenizers import Tokenizer
+
+        tokenizer = Tokenizer.from_file(self._download("tokenizer.json"))
+        tokenizer.enable_truncation(max_length=self.max_length)
+        tokenizer.enable_padding(pad_id=tokenizer.token_to_id("[PAD]") or 0, pad_token="[PAD]")
+        return tokenizer
+
+    def _quantize(self, model_path: str) -> str:
+        """Create (once) an int8 copy of the model with dynamic quantization."""
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        base_dir = self.cache_dir or Path(model_path).parent
+        quantized_path = base_dir / "quantized" / f"{self.model_name.split('/')[-1]}-int8.onnx"
+
+        if not quantized_path.exists():
+            quantized_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = quantized_path.with_suffix(".tmp")
+            quantize_dynamic(model_path, str(tmp_path), weight_type=QuantType.QInt8)
+            tmp_path.replace(quantized_path)
+
+        return str(quantized_path)
+
+    def _create_session(self, model_path: str):
+        """Open an onnxruntime CPU session."""
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.num_threads:
+            options.intra_op_num_threads = self.num_threads
+        # Batches are processed one after another: no use for parallel graph branches
+        options.inter_op_num_threads = 1
+
+        return onnxruntime.InferenceSession(
+            model_path,
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+
+
+def create_embedding_function(config):
+    """
+    Build the embedding backend selected in the configuration.
+
+    Args:
+        config: Configuration object
+
+    Returns:
+        Embedding function (callable on a list of texts, with a model_id),
+        loaded on its first call
+    """
+    if config.embedding_backend == "onnx":
+        return LazyEmbedding(
+            lambda: LocalOnnxEmbedding(
+                model_name=config.embedding_model,
+                cache_dir=str(config.get_embedding_cache_path()),
+                batch_size=config.embedding_batch_size,
+                num_threads=config.embedding_threads,
+                quantize=config.embedding_quantize,
+                max_length=config.embedding_max_tokens
+            ),
+            model_id=onnx_model_id(
+                config.embedding_model,
+                config.embedding_quantize and quantization_available()
+            )
+        )
+
+    return LazyEmbedding(ChromaDefaultEmbedding, model_id=ChromaDefaultEmbedding.model_id)
+
+
+def embedding_tokenizer_path(config) -> Optional[str]:
+    """
+    Find the tokenizer.json of the configured embedding model.
+
+    Counting chunk tokens with the embedder's own tokenizer keeps chunks
+    within its sequence length. Chroma's extracted model files are used when
+    present, otherwise the file is fetched (once) into the model cache.
+
+    Args:
+        config: Configuration object
+
+    Returns:
+        Path of tokenizer.json, or None if it cannot be found or downloaded
+    """
+    if config.embedding_backend == "onnx":
+        model_name = config.embedding_model
+    else:
+        model_name = ChromaDefaultEmbedding.model_name
+
+        chroma_tokenizer = (
+            Path.home() / ".cache" / "chroma" / "onnx_models" / ChromaDefaultEmbedding.model_id / "onnx" / "tokenizer.json"
+        )
+        if chroma_tokenizer.exists():
+            return str(chroma_tokenizer)
+
+    try:
+        from huggingface_hub import hf_hub_download
+
+        return hf_hub_download(
+            repo_id=model_name,
+            filename="tokenizer.json",
+            cache_dir=str(config.get_embedding_cache_path())
+        )
+    except Exception as e:
+        print(f"Tokenizer of {model_name} unavailable ({e})")
+        return None
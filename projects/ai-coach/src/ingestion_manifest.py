@@ -0,0 +1,147 @@
+"""
+Ingestion manifest for incremental re-ingestion.
+Tracks path, mtime, size and content digest of every ingested file.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+class IngestionManifest:
+    """Persistent record of the files ingested into each collection."""
+
+    def __init__(self, manifest_path: str):
+        """
+        Initialize manifest.
+
+        Args:
+            manifest_path: Path of the JSON manifest file
+        """
+        self.manifest_path = Path(manifest_path)
+        self.data = {"collections": {}}
+
+        if self.manifest_path.exists():
+            try:
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    self.data = json.load(f)
+            except (json.JSONDecodeError, OSError) as e:
+                print(f"Ignoring unreadable manifest {self.manifest_path}: {e}")
+
+    def get_files(self, collection_name: str) -> Dict[str, Dict]:
+        """Get the manifest entries of a collection, keyed by file path."""
+        return self.data["collections"].setdefault(collection_name, {})
+
+    def record(
+        self,
+        collection_name: str,
+        file_path: str,
+        mtime: float,
+        size: int,
+        digest: str,
+        num_chunks: int
+    ) -> None:
+        """
+        Record a file as ingested.
+
+        Args:
+            collection_name: Name of the collection
+            file_path: Absolute path of the file
+            mtime: File modification time
+            size: File size in bytes
+            digest: SHA-256 digest of the file content
+            num_chunks: Number of chunks stored for the file
+        """
+        self.get_files(collection_name)[file_path] = {
+            "mtime": mtime,
+            "size": size,
+            "digest": digest,
+            "num_chunks": num_chunks,
+            "ingested_at": datetime.now().isoformat()
+        }
+
+    def remove(self, collection_name: str, file_path: str) -> None:
+        """Forget a file."""
+        self.get_files(collection_name).pop(file_path, None)
+
+    def clear(self, collection_name: str) -> None:
+        """Forget every file of a collection."""
+        self.data["collections"][collection_name] = {}
+
+    def diff(self, collection_name: str, file_paths: List[Path]) -> Dict[str, List]:
+        """
+        Compare files on disk with the manifest.
+
+        Files whose mtime and size match are not read. Otherwise the content
+        digest decides whether the file really changed.
+
+        Args:
+            collection_name: Name of the collection
+            file_paths: Files currently present in the source directory
+
+        Returns:
+            Dictionary with 'changed' (list of file info dicts for new or
+            modified files), 'unchanged' (list of paths) and 'removed'
+            (list of paths no longer on disk)
+        """
+        entries = self.get_files(collection_name)
+        changed = []
+        unchanged = []
+        seen = set()
+
+        for file_path in file_paths:
+            path = str(Path(file_path).absolute())
+            seen.add(path)
+            stat = os.stat(path)
+            entry = entries.get(path)
+
+            if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+                unchanged.append(path)
+                continue
+
+            digest = self.file_digest(path)
+
+            if entry and entry["digest"] == digest:
+                # Touched but identical: refresh stat info only
+                entry["mtime"] = stat.st_mtime
+                entry["size"] = stat.st_size
+                unchanged.append(path)
+                continue
+
+            changed.append({
+                "path": path,
+                "mtime": stat.st_mtime,
+                "size": stat.st_size,
+                "digest": digest,
+                "is_new": entry is None
+            })
+
+        removed = [path for path in entries if path not in seen]
+
+        return {
+            "changed": changed,
+            "unchanged": unchanged,
+            "removed": removed
+        }
+
+    def save(self) -> None:
+        """Write the manifest atomically."""
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+
+        os.replace(tmp_path, self.manifest_path)
+
+    @staticmethod
+    def file_digest(file_path: str, block_size: int = 1 << 20) -> str:
+        """Compute the SHA-256 digest of a file's content."""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(block_size), b""):
+                digest.update(block)
+        return digest.hexdigest()
@@ -0,0 +1,146 @@
+"""
+Streaming ingestion pipeline.
+Connects DocumentLoader, TextChunker and VectorStore with generators so
+memory stays bounded regardless of corpus size.
+"""
+
+from collections import deque
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+from document_loader import DocumentLoader
+from text_chunker import TextChunker
+from vectorstore import VectorStore
+
+
+class IngestionPipeline:
+    """Pull-based loader -> chunker -> vectorstore pipeline."""
+
+    def __init__(
+        self,
+        vectorstore: VectorStore,
+        chunker: TextChunker,
+        workers: int = 1,
+        max_in_flight: int = 8,
+        batch_size: int = 100,
+        load_timeout: Optional[float] = None
+    ):
+        """
+        Initialize pipeline.
+
+        Backpressure comes from the generators: the loader only parses a new
+        file when the store has consumed the previous chunks, so at most
+        max_in_flight documents plus one batch of chunks are held in memory.
+
+        Args:
+            vectorstore: VectorStore instance
+            chunker: TextChunker instance
+            workers: Number of processes used to parse documents
+            max_in_flight: Maximum number of documents parsed ahead of the store
+            batch_size: Number of chunks written to the store at once
+            load_timeout: Seconds after which a file still parsing is skipped
+                (worker processes only; None: no limit)
+        """
+        self.vectorstore = vectorstore
+        self.chunker = chunker
+        self.workers = workers
+        self.max_in_flight = max_in_flight
+        self.batch_size = batch_size
+        self.load_timeout = load_timeout
+
+    def run(
+        self,
+        collection_name: str,
+        file_paths: Iterable,
+        extra_metadata: Optional[Dict] = None,
+        on_document_start: Optional[Callable[[Dict], None]] = None,
+        on_document_done: Optional[Callable[[Dict, int], None]] = None,
+        on_batch_stored: Optional[Callable[[int], None]] = None
+    ) -> Dict[str, int]:
+        """
+        Stream files into a collection.
+
+        on_document_done only fires once every chunk of the document has been
+        written to the store, so progress recorded there (e.g. in the
+        ingestion manifest) never covers chunks lost to a failed write.
+
+        Args:
+            collection_name: Name of the (already created) collection
+            file_paths: Paths of the files to ingest
+            extra_metadata: Metadata added to every chunk
+            on_document_start: Called with a document's metadata before its chunks are written
+            on_document_done: Called with a document's metadata and chunk count
+                once all its chunks are stored
+            on_batch_stored: Called with the number of chunks of each stored
+                batch, after the documents it completed were reported
+
+        Returns:
+            Dictionary with the number of documents and chunks ingested, the
+            number of chunks whose embedding came from the cache and the
+            store's write throughput in chunks per second
+        """
+        stats = {"documents": 0, "chunks": 0, "cached": 0, "chunks_per_second": 0.0}
+
+        # Documents fully chunked, waiting for their last chunk to be stored:
+        # (chunks handed to the store when the document ended, metadata, chunk count)
+        finished = deque()
+        stored = [0]
+
+        def report_stored() -> None:
+            while finished and finished[0][0] <= stored[0]:
+                _, metadata, num_chunks = finished.popleft()
+                stats["documents"] += 1
+                if on_document_done:
+                    on_document_done(metadata, num_chunks)
+
+        def document_chunked(metadata: Dict, num_chunks: int) -> None:
+            finished.append((stats["chunks"], metadata, num_chunks))
+            # A document without chunks may have nothing left to wait for
+            report_stored()
+
+        def batch_stored(num_chunks: int) -> None:
+            stored[0] += num_chunks
+            report_stored()
+            if on_batch_stored:
+                on_batch_stored(num_chunks)
+
+        documents = DocumentLoader.iter_documents(
+            file_paths,
+            workers=self.workers,
+            max_in_flight=self.max_in_flight,
+            timeout=self.load_timeout
+        )
+
+        chunks = self._iter_chunks(documents, extra_metadata or {}, stats,
+                                   on_document_start, document_chunked)
+
+        self.vectorstore.add_chunks(
+            collection_name,
+            chunks,
+            batch_size=self.batch_size,
+            on_batch_stored=batch_stored
+        )
+        stats["chunks_per_second"] = self.vectorstore.last_add_stats.get("chunks_per_second", 0.0)
+        stats["cached"] = self.vectorstore.last_add_stats.get("cached", 0)
+
+        return stats
+
+    def _iter_chunks(
+        self,
+        documents: Iterator[Tuple[str, Dict]],
+        extra_metadata: Dict,
+        stats: Dict[str, int],
+        on_document_start: Optional[Callable[[Dict], None]],
+        on_document_chunked: Callable[[Dict, int], None]
+    ) -> Iterator[Dict]:
+        """Chunk documents one at a time, tagging chunks and firing callbacks."""
+        for content, metadata in documents:
+            if on_document_start:
+                on_document_start(metadata)
+
+            num_chunks = 0
+            for chunk in self.chunker.iter_chunk_documents([(content, metadata)]):
+                chunk.update(extra_metadata)
+                num_chunks += 1
+                stats["chunks"] += 1
+                yield chunk
+
+            on_document_chunked(metadata, num_chunks)
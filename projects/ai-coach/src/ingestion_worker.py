@@ -0,0 +1,166 @@
+"""
+Background ingestion of conversation history.
+Chunks and embeds session exchanges on a worker thread so replies never
+wait for the vector database.
+"""
+
+import queue
+import threading
+from typing import Callable, Dict, Optional
+from text_chunker import TextChunker
+from vectorstore import VectorStore
+
+
+class HistoryIngestionWorker:
+    """Single-thread queue that writes session excerpts to the history collection."""
+
+    def __init__(
+        self,
+        vectorstore: VectorStore,
+        chunker: TextChunker,
+        collection_name: str = "historique_coach",
+        collection_description: str = "Conversations passées avec le coach",
+        hnsw: Optional[Dict] = None
+    ):
+        """
+        Initialize worker (the thread starts on the first submit).
+
+        Args:
+            vectorstore: VectorStore instance
+            chunker: TextChunker instance
+            collection_name: Collection receiving the conversation chunks
+            collection_description: Description stored on the chunks and collection
+            hnsw: HNSW parameters used if the collection has to be created
+        """
+        self.vectorstore = vectorstore
+        self.chunker = chunker
+        self.collection_name = collection_name
+        self.collection_description = collection_description
+        self.hnsw = hnsw
+
+        self.ingested_batches = 0
+        self.ingested_chunks = 0
+        self.dropped_batches = 0
+        self.errors = 0
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    def submit(
+        self,
+        session_data: Dict,
+        on_done: Optional[Callable[[Dict, bool], None]] = None,
+        should_ingest: Optional[Callable[[Dict], bool]] = None
+    ) -> None:
+        """
+        Queue a session excerpt for ingestion.
+
+        Args:
+            session_data: Dictionary with text and metadata, as returned by
+                ConversationManager.get_session_for_ingestion()
+            on_done: Called on the worker thread with (session_data, succeeded)
+                once the excerpt is stored or has failed
+            should_ingest: Called on the worker thread right before ingesting;
+                if it returns False the excerpt is dropped (on_done is not called)
+        """
+        self._ensure_started()
+        self._queue.put((session_data, on_done, should_ingest))
+
+    def queue_depth(self) -> int:
+        """Get number of excerpts waiting to be ingested."""
+        return self._queue.qsize()
+
+    def stats(self) -> Dict[str, int]:
+        """Get queue depth and ingestion counters."""
+        return {
+            "queue_depth": self.queue_depth(),
+            "ingested_batches": self.ingested_batches,
+            "ingested_chunks": self.ingested_chunks,
+            "dropped_batches": self.dropped_batches,
+            "errors": self.errors
+        }
+
+    def flush(self) -> None:
+        """Block until every queued excerpt has been processed."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Process the remaining excerpts, then stop the thread.
+
+        Args:
+            timeout: Maximum time to wait for the thread (None waits indefinitely)
+        """
+        with self._thread_lock:
+            thread = self._thread
+            if thread is None:
+                return
+            self._queue.put(None)
+            self._thread = None
+
+        thread.join(timeout)
+
+    def _ensure_started(self) -> None:
+        """Start the worker thread if it is not running."""
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="history-ingestion",
+                    daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        """Worker loop: ingest excerpts until the stop sentinel."""
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                session_data, on_done, should_ingest = item
+
+                if should_ingest is not None and not should_ingest(session_data):
+                    self.dropped_batches += 1
+                    continue
+
+                try:
+                    self._ingest(session_data)
+                    succeeded = True
+                except Exception as e:
+                    succeeded = False
+                    self.errors += 1
+                    print(f"\n[Erreur auto-ingestion] {e}\n")
+
+                if on_done is not None:
+                    try:
+                        on_done(session_data, succeeded)
+                    except Exception as e:
+                        print(f"\n[Erreur auto-ingestion] {e}\n")
+            finally:
+                self._queue.task_done()
+
+    def _ingest(self, session_data: Dict) -> None:
+        """Chunk and store one session excerpt."""
+        chunks = self.chunker.chunk_text(session_data["text"], session_data["metadata"])
+
+        for chunk in chunks:
+            chunk["collection"] = self.collection_name
+            chunk["type"] = self.collection_description
+
+        # The collection may exist on disk without being loaded in this process
+        if self.vectorstore.load_collection(self.collection_name) is None:
+            self.vectorstore.create_collection(
+                self.collection_name,
+                metadata={"description": self.collection_description},
+                hnsw=self.hnsw
+            )
+
+        # Chunk IDs derive from session, position and text, so a retried
+        # excerpt overwrites its previous copy instead of duplicating it
+        self.vectorstore.add_chunks(self.collection_name, chunks)
+
+        self.ingested_batches += 1
+        self.ingested_chunks += len(chunks)
@@ -0,0 +1,135 @@
+"""
+Keyword classifier for user messages.
+Compiles keyword sets into a single regular expression matched on word
+boundaries, so one scan of a message finds every category it mentions.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Tuple
+
+
+def normalize(text: str) -> str:
+    """Lowercase a text and unify typographic apostrophes."""
+    return text.lower().replace("’", "'")
+
+
+class KeywordClassifier:
+    """
+    Multi-category keyword matcher.
+
+    Keywords match whole words only ("go" does not match inside "gorge").
+    A trailing "*" makes a prefix keyword ("hésit*" matches "hésite",
+    "hésitation"...). Spaces inside a keyword match any whitespace.
+    """
+
+    def __init__(self, categories: Dict[str, List[str]], cache_size: int = 256):
+        """
+        Initialize classifier (the pattern is compiled once).
+
+        Args:
+            categories: Dictionary of category -> keywords
+            cache_size: Number of recent texts whose categories are kept
+                (a message is classified for its state, then for retrieval)
+        """
+        # Keyword -> categories listing it (a keyword may belong to several)
+        keyword_categories: Dict[str, set] = {}
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                keyword = " ".join(normalize(keyword).split())
+                if keyword and keyword != "*":
+                    keyword_categories.setdefault(keyword, set()).add(category)
+
+        # Longest first: a prefix keyword is resolved to its longest match
+        keywords = sorted(keyword_categories, key=len, reverse=True)
+
+        self._exact: Dict[str, FrozenSet[str]] = {}
+        self._prefixes: List[Tuple[str, FrozenSet[str]]] = []
+        for keyword in keywords:
+            if keyword.endswith("*"):
+                self._prefixes.append((keyword[:-1].rstrip(), frozenset(keyword_categories[keyword])))
+            else:
+                self._exact[keyword] = frozenset(keyword_categories[keyword])
+
+        self.categories = list(categories)
+        self.pattern = re.compile(
+            r"(?<!\w)" + self._trie_pattern(self._build_trie(keywords)) + r"(?!\w)"
+        ) if keywords else None
+
+        self._classify_cached = lru_cache(maxsize=cache_size)(self._classify)
+
+    @staticmethod
+    def _build_trie(keywords: List[str]) -> Dict:
+        """
+        Build a trie of keyword pieces.
+
+        Pieces are escaped characters, r"\s+" for a space and r"\w*" for the
+        trailing "*" of a prefix keyword; "" marks the end of a keyword.
+        """
+        trie: Dict = {}
+        for keyword in keywords:
+            prefix = keyword.endswith("*")
+            if prefix:
+                keyword = keyword[:-1].rstrip()
+
+            node = trie
+            for char in keyword:
+                node = node.setdefault(r"\s+" if char == " " else re.escape(char), {})
+            if prefix:
+                node = node.setdefault(r"\w*", {})
+            node[""] = {}
+        return trie
+
+    @classmethod
+    def _trie_pattern(cls, node: Dict) -> str:
+        """
+        Turn a trie into a regex.
+
+        Keywords sharing a beginning share its pattern, so at each position
+        the engine follows one branch instead of trying every keyword.
+        """
+        # Longer continuations first: the longest keyword wins
+        branches = [piece + cls._trie_pattern(child) for piece, child in node.items() if piece]
+        branches.sort(key=lambda branch: branch.startswith(r"\w*"))
+        if "" in node:
+            if not branches:
+                return ""
+            return "(?:" + "|".join(branches) + ")?"
+        if len(branches) == 1:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")"
+
+    def classify(self, text: str) -> FrozenSet[str]:
+        """
+        Find every category whose keywords appear in a text.
+
+        Args:
+            text: Text to classify
+
+        Returns:
+            Set of matched categories (empty if none)
+        """
+        return self._classify_cached(text)
+
+    def _classify(self, text: str) -> FrozenSet[str]:
+        """Scan a text once and collect the categories of every match."""
+        if self.pattern is None:
+            return frozenset()
+
+        matched = set()
+        for matched_text in self.pattern.findall(normalize(text)):
+            matched |= self._match_categories(" ".join(matched_text.split()))
+
+        return frozenset(matched)
+
+    def _match_categories(self, matched_text: str) -> FrozenSet[str]:
+        """Get the categories of the keyword that produced a match."""
+        if matched_text in self._exact:
+            return self._exact[matched_text]
+
+        # Prefix keywords, longest first like in the pattern
+        for prefix, categories in self._prefixes:
+            if matched_text.startswith(prefix):
+                return categories
+
+        return frozenset()
@@ -0,0 +1,251 @@
+"""
+Lexical (BM25) index of the chunks stored in ChromaDB.
+Complements dense search with exact-term matching.
+"""
+
+import math
+import re
+import sqlite3
+import unicodedata
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Frequent French and English words carrying no lexical signal
+STOPWORDS = frozenset("""
+a au aux avec ce ces dans de des du elle en et eux il ils je la le les leur lui ma mais me meme mes moi mon ne nos
+notre nous on ou par pas pour qu que qui sa se ses son sur ta te tes toi ton tu un une vos votre vous c d j l m n s t
+y est suis es sont etre ai as avons avez ont avoir fait faire cette cet ca plus tres
+the an and or of to in on is are was be it this that for with as at by i you he she we they my your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into normalized terms (lowercase, accents removed, stopwords dropped).
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of terms in order of appearance
+    """
+    normalized = unicodedata.normalize("NFKD", text.lower())
+    normalized = "".join(c for c in normalized if not unicodedata.combining(c))
+    return [
+        token for token in TOKEN_PATTERN.findall(normalized)
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+class LexicalIndex:
+    """Inverted index with BM25 scoring, persisted in SQLite."""
+
+    # IDs per "IN (...)" query (SQLite limits the number of parameters)
+    ID_BATCH_SIZE = 500
+
+    def __init__(self, db_path: str, k1: float = 1.2, b: float = 0.75):
+        """
+        Initialize index (creates the database if needed).
+
+        Args:
+            db_path: Path of the SQLite database file
+            k1: BM25 term frequency saturation
+            b: BM25 length normalization
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.k1 = k1
+        self.b = b
+
+        with self._connect() as conn:
+            # Readers (chat) and writers (ingestion) work concurrently
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS docs (
+                    collection TEXT NOT NULL,
+                    chunk_id TEXT NOT NULL,
+                    length INTEGER NOT NULL,
+                    PRIMARY KEY (collection, chunk_id)
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS postings (
+                    collection TEXT NOT NULL,
+                    term TEXT NOT NULL,
+                    chunk_id TEXT NOT NULL,
+                    tf INTEGER NOT NULL,
+                    PRIMARY KEY (collection, term, chunk_id)
+                ) WITHOUT ROWID
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_postings_chunk ON postings (collection, chunk_id)"
+            )
+
+            # Document count and total length per collection, kept up to date
+            # by every write so a query never scans docs for BM25 statistics
+            has_stats = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'collection_stats'"
+            ).fetchone()
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS collection_stats (
+                    collection TEXT PRIMARY KEY,
+                    num_docs INTEGER NOT NULL,
+                    total_length INTEGER NOT NULL
+                )
+                """
+            )
+            if not has_stats:
+                # Index created before statistics were stored
+                conn.execute(
+                    """
+                    INSERT INTO collection_stats
+                    SELECT collection, COUNT(*), SUM(length) FROM docs GROUP BY collection
+                    """
+                )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a short-lived connection (safe to use from any thread)."""
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def add(self, collection_name: str, ids: List[str], texts: List[str]) -> None:
+        """
+        Index chunks (chunks already indexed under the same ID are replaced).
+
+        Args:
+            collection_name: Name of the collection
+            ids: Chunk IDs
+            texts: Chunk texts, aligned with ids
+        """
+        docs = []
+        postings = []
+        for chunk_id, text in zip(ids, texts):
+            terms = Counter(tokenize(text))
+            docs.append((collection_name, chunk_id, sum(terms.values())))
+            postings.extend((collection_name, term, chunk_id, tf) for term, tf in terms.items())
+
+        with self._connect() as conn:
+            self._delete(conn, collection_name, ids)
+            conn.executemany("INSERT INTO docs VALUES (?, ?, ?)", docs)
+            conn.executemany("INSERT INTO postings VALUES (?, ?, ?, ?)", postings)
+            self._update_stats(conn, collection_name, len(docs), sum(length for _, _, length in docs))
+
+    def remove(self, collection_name: str, ids: List[str]) -> None:
+        """Remove chunks from the index."""
+        with self._connect() as conn:
+            self._delete(conn, collection_name, ids)
+
+    def remove_collection(self, collection_name: str) -> None:
+        """Remove every chunk of a collection."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM postings WHERE collection = ?", (collection_name,))
+            conn.execute("DELETE FROM docs WHERE collection = ?", (collection_name,))
+            conn.execute("DELETE FROM collection_stats WHERE collection = ?", (collection_name,))
+
+    @classmethod
+    def _delete(cls, conn: sqlite3.Connection, collection_name: str, ids: List[str]) -> None:
+        """Delete chunks within an open transaction."""
+        # Size of what is actually deleted (some IDs may not be indexed)
+        num_docs, total_length = 0, 0
+        for first in range(0, len(ids), cls.ID_BATCH_SIZE):
+            batch = ids[first:first + cls.ID_BATCH_SIZE]
+            count, length = conn.execute(
+                f"""
+                SELECT COUNT(*), COALESCE(SUM(length), 0) FROM docs
+                WHERE collection = ? AND chunk_id IN ({', '.join('?' for _ in batch)})
+                """,
+                [collection_name, *batch]
+            ).fetchone()
+            num_docs += count
+            total_length += length
+
+        if not num_docs:
+            return
+
+        rows = [(collection_name, chunk_id) for chunk_id in ids]
+        conn.executemany("DELETE FROM postings WHERE collection = ? AND chunk_id = ?", rows)
+        conn.executemany("DELETE FROM docs WHERE collection = ? AND chunk_id = ?", rows)
+        cls._update_stats(conn, collection_name, -num_docs, -total_length)
+
+    @staticmethod
+    def _update_stats(conn: sqlite3.Connection, collection_name: str, num_docs: int, total_length: int) -> None:
+        """Add to the document count and total length of a collection within an open transaction."""
+        if not num_docs:
+            return
+        conn.execute(
+            """
+            INSERT INTO collection_stats VALUES (?, ?, ?)
+            ON CONFLICT (collection) DO UPDATE SET
+                num_docs = num_docs + excluded.num_docs,
+                total_length = total_length + excluded.total_length
+            """,
+            (collection_name, num_docs, total_length)
+        )
+
+    def count(self, collection_name: str) -> int:
+        """Get the number of indexed chunks of a collection."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT num_docs FROM collection_stats WHERE collection = ?", (collection_name,)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def search(self, collection_name: str, query: str, n_results: int = 5) -> List[Tuple[str, float]]:
+        """
+        Rank the chunks of a collection against a query with BM25.
+
+        Args:
+            collection_name: Name of the collection
+            query: Query text
+            n_results: Number of results to return
+
+        Returns:
+            List of (chunk_id, score), best first; only chunks sharing a term with the query
+        """
+        terms = sorted(set(tokenize(query)))
+        if not terms:
+            return []
+
+        with self._connect() as conn:
+            stats = conn.execute(
+                "SELECT num_docs, total_length FROM collection_stats WHERE collection = ?", (collection_name,)
+            ).fetchone()
+            if not stats or not stats[0]:
+                return []
+            num_docs, total_length = stats
+
+            rows = conn.execute(
+                f"""
+                SELECT p.term, p.chunk_id, p.tf, d.length
+                FROM postings p JOIN docs d
+                    ON d.collection = p.collection AND d.chunk_id = p.chunk_id
+                WHERE p.collection = ? AND p.term IN ({', '.join('?' for _ in terms)})
+                """,
+                [collection_name, *terms]
+            ).fetchall()
+
+        doc_freq = Counter(term for term, _, _, _ in rows)
+        avg_length = total_length / num_docs or 1.0
+
+        scores: Dict[str, float] = {}
+        for term, chunk_id, tf, length in rows:
+            idf = math.log(1 + (num_docs - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+            norm = tf + self.k1 * (1 - self.b + self.b * length / avg_length)
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:n_results]
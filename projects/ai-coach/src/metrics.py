@@ -0,0 +1,333 @@
+"""
+Latency and token metrics for the coach pipeline.
+Timing spans are grouped per request into a trace, written as one JSON log
+line when the request ends, and aggregated into counters and histograms
+rendered in the Prometheus text format.
+"""
+
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+# One JSON object per line on this logger
+logger = logging.getLogger("ai_coach.metrics")
+
+# Latency buckets in seconds: local stages take milliseconds, Claude calls seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _label_key(labels: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+    """Build a hashable key from label values (empty values are dropped)."""
+    return tuple(sorted((name, str(value)) for name, value in labels.items() if value not in (None, "")))
+
+
+def _escape(value: str) -> str:
+    """Escape a label value (backslash, double quote and newline)."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: Tuple[Tuple[str, str], ...], extra: Optional[Tuple[str, str]] = None) -> str:
+    """Render labels as {name="value",...} (empty string when there are none)."""
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, value: float = 1.0, **labels) -> None:
+        """Add a value to the counter of a label set."""
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + value
+
+    def render(self) -> List[str]:
+        """Render the samples in Prometheus text format."""
+        with self._lock:
+            return [f"{self.name}{_format_labels(key)} {value:g}" for key, value in sorted(self._values.items())]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        # Label key -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[tuple, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        """Record one observation for a label set."""
+        key = _label_key(labels)
+        with self._lock:
+            state = self._values.setdefault(key, [0] * (len(self.buckets) + 1) + [0.0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[len(self.buckets)] += 1
+            state[-1] += value
+
+    def render(self) -> List[str]:
+        """Render the samples in Prometheus text format."""
+        lines = []
+        with self._lock:
+            for key, state in sorted(self._values.items()):
+                for bound, count in zip(self.buckets, state):
+                    lines.append(f"{self.name}_bucket{_format_labels(key, ('le', f'{bound:g}'))} {count}")
+                count = state[len(self.buckets)]
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', '+Inf'))} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {state[-1]:.6f}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Set of metrics exported together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        """Get or create a counter."""
+        return self._register(name, lambda: Counter(name, help_text))
+
+    def histogram(self, name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        """Get or create a histogram."""
+        return self._register(name, lambda: Histogram(name, help_text, buckets))
+
+    def _register(self, name: str, factory):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = factory()
+            return self._metrics[name]
+
+    def render_prometheus(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format (version 0.0.4).
+
+        Returns:
+            Exposition text, ending with a newline
+        """
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+REQUESTS = REGISTRY.counter(
+    "ai_coach_requests_total",
+    "Coach replies, by endpoint and response cache outcome."
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "ai_coach_request_duration_seconds",
+    "End-to-end time of a coach reply."
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    "ai_coach_stage_duration_seconds",
+    "Time spent in each stage of a coach reply (collection searches are labelled by collection)."
+)
+TOKENS = REGISTRY.counter(
+    "ai_coach_tokens_total",
+    "Tokens of coach replies: Claude input and output, and retrieved context packed into the prompt."
+)
+ERRORS = REGISTRY.counter(
+    "ai_coach_errors_total",
+    "Failures skipped without failing the reply, by stage (collection searches are labelled by collection)."
+)
+
+
+# Trace of the request being processed by the current thread
+_current_trace: ContextVar[Optional["RequestTrace"]] = ContextVar("ai_coach_trace", default=None)
+
+
+class RequestTrace:
+    """Timing spans and token counts of one coach reply."""
+
+    def __init__(self, endpoint: str):
+        """
+        Initialize trace.
+
+        Args:
+            endpoint: Name of the entry point (get_response, stream_response)
+        """
+        self.endpoint = endpoint
+        self.spans: List[Dict] = []
+        self.tokens: Dict[str, int] = {}
+        self.fields: Dict = {}
+        self.errors: List[Dict] = []
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add_span(self, stage: str, seconds: float, **labels) -> None:
+        """Record a finished span (thread-safe: parallel searches report here)."""
+        with self._lock:
+            self.spans.append({"stage": stage, **labels, "ms": round(seconds * 1000, 3)})
+
+    def add_tokens(self, kind: str, count: Optional[int]) -> None:
+        """Add a token count of some kind (input, output, context)."""
+        if count is None:
+            return
+        with self._lock:
+            self.tokens[kind] = self.tokens.get(kind, 0) + int(count)
+        TOKENS.inc(count, kind=kind)
+
+    def add_error(self, stage: str, error: str, **labels) -> None:
+        """Record a skipped failure (thread-safe: parallel searches report here)."""
+        with self._lock:
+            self.errors.append({"stage": stage, **labels, "error": error})
+
+    def set(self, **fields) -> None:
+        """Attach fields to the JSON log line (user state, cache hit...)."""
+        self.fields.update(fields)
+
+    def finish(self) -> Dict:
+        """
+        Close the trace: update request metrics and emit the JSON log line.
+
+        Returns:
+            The logged record
+        """
+        seconds = time.perf_counter() - self._start
+        cache = "hit" if self.fields.get("cache_hit") else "miss"
+        REQUESTS.inc(endpoint=self.endpoint, cache=cache)
+        REQUEST_SECONDS.observe(seconds, endpoint=self.endpoint)
+
+        record = {
+            "event": "coach_request",
+            "endpoint": self.endpoint,
+            "total_ms": round(seconds * 1000, 3),
+            **self.fields,
+            "spans": self.spans,
+            "tokens": self.tokens
+        }
+        if self.errors:
+            record["errors"] = self.errors
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps(record, ensure_ascii=False))
+        return record
+
+
+@contextmanager
+def trace_request(endpoint: str) -> Iterator[RequestTrace]:
+    """
+    Trace a coach reply; spans opened while it is active are attached to it.
+
+    Args:
+        endpoint: Name of the entry point
+
+    Yields:
+        RequestTrace of the reply
+    """
+    trace = RequestTrace(endpoint)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        try:
+            _current_trace.reset(token)
+        except ValueError:
+            # Streaming generator closed from another context
+            pass
+        trace.finish()
+
+
+def current_trace() -> Optional[RequestTrace]:
+    """Get the trace of the reply being processed, if any."""
+    return _current_trace.get()
+
+
+@contextmanager
+def span(stage: str, **labels) -> Iterator[None]:
+    """
+    Time a stage of the pipeline.
+
+    The duration always feeds the stage histogram, and is added to the
+    current trace when there is one.
+
+    Args:
+        stage: Stage name
+        **labels: Extra labels (e.g. collection)
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        STAGE_SECONDS.observe(seconds, stage=stage, **labels)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add_span(stage, seconds, **labels)
+
+
+def add_tokens(kind: str, count: Optional[int]) -> None:
+    """Add a token count to the current trace (and the token counter)."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_tokens(kind, count)
+    elif count is not None:
+        TOKENS.inc(count, kind=kind)
+
+
+def add_error(stage: str, error: Exception, **labels) -> None:
+    """
+    Count a failure the pipeline skipped, and add it to the current trace.
+
+    Args:
+        stage: Stage that failed
+        error: The exception
+        **labels: Extra labels (e.g. collection)
+    """
+    ERRORS.inc(stage=stage, **labels)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_error(stage, f"{type(error).__name__}: {error}", **labels)
+
+
+def setup_metrics_logging(log_path: Optional[Path]) -> None:
+    """
+    Write the JSON trace lines of this process to a file.
+
+    Args:
+        log_path: Log file (appended to); None leaves logging unconfigured
+    """
+    if log_path is None or any(getattr(h, "_ai_coach_metrics", False) for h in logger.handlers):
+        return
+
+    log_path = Path(log_path)
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+
+    handler = logging.FileHandler(log_path, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    handler._ai_coach_metrics = True
+
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    # Keep trace lines out of the console and server logs
+    logger.propagate = False
@@ -3,14 +3,22 @@ RAG (Retrieval Augmented Generation) engine.
 Retrieves relevant context from multiple collections.
 """
 
-from typing import List, Dict, Optional
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple
 from vectorstore import VectorStore
-import re
+from context_packer import ContextPacker
+from keyword_classifier import KeywordClassifier
+import metrics
 
 
 class RAGEngine:
     """RAG engine for context retrieval."""
 
+    # In hybrid mode, each ranker contributes this many candidates per requested result
+    HYBRID_CANDIDATES_FACTOR = 3
+
     def __init__(self, vectorstore: VectorStore, config):
         """
         Initialize RAG engine.
@@ -22,23 +30,52 @@ class RAGEngine:
         self.vectorstore = vectorstore
         self.config = config
 
-        # Load collections
-        self._ensure_collections_loaded()
+        # Thread pool for concurrent collection searches (threads start lazily)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(len(config.collections), 1),
+            thread_name_prefix="rag-search"
+        )
+
+        # Fits retrieved chunks into the prompt's context budget
+        self.context_packer = ContextPacker(config.context_token_budget)
+
+        # User states and query topics, matched in one pass over a message
+        self.keyword_classifier = KeywordClassifier(config.keyword_categories)
+
+        # Collections are opened on the first search (or by warm_up)
+        self._collections_loaded = False
+        self._load_lock = threading.Lock()
 
     def _ensure_collections_loaded(self):
-        """Ensure all collections are loaded."""
-        for collection_name in self.config.collections.keys():
-            if self.vectorstore.collection_exists(collection_name):
-                if collection_name not in self.vectorstore.collections:
-                    self.vectorstore.collections[collection_name] = \
-                        self.vectorstore.client.get_collection(collection_name)
+        """Ensure all collections are loaded (once, with a single listing of the database)."""
+        if self._collections_loaded:
+            return
+
+        with self._load_lock:
+            if self._collections_loaded:
+                return
+
+            for collection_name in self.vectorstore.load_collections(self.config.collections.keys()):
+                # Backfill the lexical index of collections ingested before it existed
+                if self.config.hybrid_search:
+                    self.vectorstore.sync_lexical_index(collection_name)
+
+            self._collections_loaded = True
+
+    def warm_up(self):
+        """Open the collections and load the embedding model ahead of the first query."""
+        self._ensure_collections_loaded()
+
+        warm_up_embedding = getattr(self.vectorstore.embedding_function, "warm_up", None)
+        if warm_up_embedding is not None:
+            warm_up_embedding()
 
     def retrieve_context(
         self,
         query: str,
         user_state: Optional[str] = None,
         max_chunks: int = None
-    ) -> str:
+    ) -> Tuple[str, Dict]:
         """
         Retrieve relevant context from multiple collections.
 
@@ -48,40 +85,171 @@ class RAGEngine:
             max_chunks: Maximum number of chunks to retrieve per collection
 
         Returns:
-            Formatted context string
+            Tuple of (formatted context string, token usage of the packed
+            context as returned by ContextPacker.pack)
         """
         if max_chunks is None:
             max_chunks = self.config.rag_top_k
 
+        self._ensure_collections_loaded()
+
         # Determine which collections to search
         search_strategy = self._determine_search_strategy(query, user_state)
 
         # Retrieve from each collection
-        all_results = []
+        searches = {
+            collection_name: num_results
+            for collection_name, num_results in search_strategy.items()
+            if num_results > 0
+        }
 
-        for collection_name, num_results in search_strategy.items():
-            if num_results == 0:
-                continue
+        if not searches:
+            return self._format_context([])
+
+        # Embed the query once and reuse the vector for every collection
+        with metrics.span("embed_query"):
+            query_embedding = self.vectorstore.embed_query(query)
+
+        if self.config.parallel_retrieval and len(searches) > 1:
+            all_results = self._search_parallel(query, query_embedding, searches)
+        else:
+            all_results = []
+            for collection_name, num_results in searches.items():
+                all_results.extend(
+                    self._search_collection(collection_name, query, query_embedding, num_results)
+                )
+
+        # Sort by relevance (fused rank score, or distance for dense-only search).
+        # RRF scores only reflect ranks within their own collection, so the
+        # order across collections is approximate: the n-th results of two
+        # collections tie, and ties go to the closer embedding (distances
+        # are comparable, every collection uses the same model).
+        if self.config.hybrid_search:
+            all_results.sort(key=lambda x: (
+                -x.get("rrf_score", 0.0),
+                x["distance"] if x.get("distance") is not None else float('inf')
+            ))
+        else:
+            all_results.sort(key=lambda x: x.get("distance", float('inf')))
 
-            results = self.vectorstore.search(
-                collection_name,
-                query,
-                n_results=num_results
-            )
+        # Build context string
+        return self._format_context(all_results)
 
-            # Add collection name to each result
-            for result in results:
-                result["collection"] = collection_name
+    def _search_collection(
+        self,
+        collection_name: str,
+        query: str,
+        query_embedding: List[float],
+        num_results: int
+    ) -> List[Dict]:
+        """
+        Search a single collection and tag results with its name.
+
+        In hybrid mode, dense and BM25 rankings of the collection are merged
+        with reciprocal rank fusion, so chunks containing the exact query
+        terms surface even when their embedding is not among the closest.
 
-            all_results.extend(results)
+        Args:
+            collection_name: Name of the collection
+            query: User's query
+            query_embedding: Precomputed embedding of the query
+            num_results: Number of results to retrieve
 
-        # Sort by relevance (distance)
-        all_results.sort(key=lambda x: x.get("distance", float('inf')))
+        Returns:
+            List of search results
+        """
+        if self.config.hybrid_search:
+            num_candidates = num_results * self.HYBRID_CANDIDATES_FACTOR
+            with metrics.span("dense_search", collection=collection_name):
+                dense_results = self.vectorstore.search(
+                    collection_name,
+                    query,
+                    n_results=num_candidates,
+                    query_embedding=query_embedding
+                )
+            with metrics.span("lexical_search", collection=collection_name):
+                lexical_results = self.vectorstore.lexical_search(collection_name, query, num_candidates)
+            results = self._fuse_rankings([dense_results, lexical_results])[:num_results]
+        else:
+            with metrics.span("dense_search", collection=collection_name):
+                results = self.vectorstore.search(
+                    collection_name,
+                    query,
+                    n_results=num_results,
+                    query_embedding=query_embedding
+                )
+
+        # Add collection name to each result
+        for result in results:
+            result["collection"] = collection_name
+
+        return results
+
+    def _fuse_rankings(self, rankings: List[List[Dict]]) -> List[Dict]:
+        """
+        Merge ranked result lists with reciprocal rank fusion.
 
-        # Build context string
-        context = self._format_context(all_results)
+        Each result scores sum(1 / (rrf_k + rank)) over the lists it appears
+        in, so only ranks matter and BM25 scores need no calibration against
+        cosine distances.
 
-        return context
+        Args:
+            rankings: Result lists, each best first (results must have an 'id')
+
+        Returns:
+            Merged results with an 'rrf_score' field, best first
+        """
+        rrf_k = self.config.rrf_k
+        merged = {}
+
+        for ranking in rankings:
+            for rank, result in enumerate(ranking, 1):
+                entry = merged.setdefault(result["id"], {**result, "rrf_score": 0.0})
+                entry["rrf_score"] += 1.0 / (rrf_k + rank)
+                if entry.get("distance") is None and result.get("distance") is not None:
+                    entry["distance"] = result["distance"]
+
+        return sorted(merged.values(), key=lambda x: x["rrf_score"], reverse=True)
+
+    def _search_parallel(
+        self,
+        query: str,
+        query_embedding: List[float],
+        searches: Dict[str, int]
+    ) -> List[Dict]:
+        """
+        Search several collections concurrently on a thread pool.
+
+        Latency is bounded by the slowest collection instead of the sum of
+        all searches. A failing collection is skipped, like a missing one,
+        and the failure is counted in the metrics and added to the trace.
+
+        Args:
+            query: User's query
+            query_embedding: Precomputed embedding of the query
+            searches: Dictionary of collection_name -> num_results
+
+        Returns:
+            Combined list of search results
+        """
+        # Each search runs in a copy of the caller's context, so its spans join the request trace
+        futures = {
+            collection_name: self._executor.submit(
+                contextvars.copy_context().run,
+                self._search_collection, collection_name, query, query_embedding, num_results
+            )
+            for collection_name, num_results in searches.items()
+        }
+
+        all_results = []
+        for collection_name, future in futures.items():
+            try:
+                all_results.extend(future.result())
+            except Exception as e:
+                print(f"Error searching {collection_name}: {e}")
+                metrics.add_error("search", e, collection=collection_name)
+
+        return all_results
 
     def _determine_search_strategy(self, query: str, user_state: Optional[str]) -> Dict[str, int]:
         """
@@ -102,20 +270,17 @@ class RAGEngine:
             "textes_creatifs": 0
         }
 
-        query_lower = query.lower()
+        topics = self.keyword_classifier.classify(query)
 
-        # Adjust based on query content
-        career_keywords = ["travail", "job", "carrière", "emploi", "entretien", "cv"]
-        if any(keyword in query_lower for keyword in career_keywords):
+        # Adjust based on query content (keywords in config/keywords.json)
+        if "carriere" in topics:
             strategy["parcours"] = 2
             strategy["dev_personnel"] = 2  # Reduce dev_personnel
 
-        objective_keywords = ["objectif", "goal", "projet", "ambition"]
-        if any(keyword in query_lower for keyword in objective_keywords):
+        if "objectif" in topics:
             strategy["parcours"] = 2
 
-        creative_keywords = ["créativité", "écrire", "rap", "texte", "script"]
-        if any(keyword in query_lower for keyword in creative_keywords):
+        if "creatif" in topics:
             strategy["textes_creatifs"] = 2
             strategy["dev_personnel"] = 2
 
@@ -138,36 +303,20 @@ class RAGEngine:
 
         return strategy
 
-    def _format_context(self, results: List[Dict]) -> str:
+    def _format_context(self, results: List[Dict]) -> Tuple[str, Dict]:
         """
-        Format results into a context string.
+        Format results into a context string within the token budget.
 
         Args:
-            results: List of search results
+            results: List of search results, most relevant first
 
         Returns:
-            Formatted context string
+            Tuple of (formatted context string, token usage of the context)
         """
-        if not results:
-            return "Aucun contexte pertinent trouvé."
-
-        context_parts = []
-
-        for i, result in enumerate(results[:10], 1):  # Limit to top 10
-            collection = result.get("collection", "unknown")
-            text = result["text"]
-
-            # Truncate if too long
-            if len(text) > 500:
-                text = text[:500] + "..."
-
-            source = result.get("metadata", {}).get("source_source", "Unknown")
-
-            context_parts.append(
-                f"[{i}] Source: {collection} - {source}\n{text}\n"
-            )
-
-        return "\n---\n".join(context_parts)
+        with metrics.span("pack_context"):
+            context, stats = self.context_packer.pack(results)
+        metrics.add_tokens("context", stats.get("tokens"))
+        return context, stats
 
     def detect_user_state(self, user_message: str) -> str:
         """
@@ -179,30 +328,11 @@ class RAGEngine:
         Returns:
             Detected state: 'fatigue', 'energie', 'resistance', or 'normal'
         """
-        message_lower = user_message.lower()
-
-        # Fatigue indicators
-        fatigue_keywords = [
-            "fatigué", "crevé", "épuisé", "pas d'énergie",
-            "je ne sais pas", "perdu", "confus"
-        ]
-        if any(keyword in message_lower for keyword in fatigue_keywords):
-            return "fatigue"
-
-        # Resistance/procrastination indicators
-        resistance_keywords = [
-            "je vais réfléchir", "peut-être", "plus tard",
-            "je ne suis pas sûr", "hésit", "peur"
-        ]
-        if any(keyword in message_lower for keyword in resistance_keywords):
-            return "resistance"
-
-        # Energy indicators
-        energy_keywords = [
-            "motivé", "prêt", "en forme", "go",
-            "let's go", "c'est parti", "allons-y"
-        ]
-        if any(keyword in message_lower for keyword in energy_keywords):
-            return "energie"
+        categories = self.keyword_classifier.classify(user_message)
+
+        # Several states can match: the first in priority order wins
+        for state in self.config.user_state_priority:
+            if state in categories:
+                return state
 
         return "normal"
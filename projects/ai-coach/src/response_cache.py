@@ -0,0 +1,129 @@
+"""
+Semantic response cache for the AI Coach.
+Reuses a previous answer when a new question is nearly identical and is
+asked in the same conversation context.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import numpy as np
+
+
+class SemanticResponseCache:
+    """LRU cache of responses keyed by query embedding, user state and history."""
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.95,
+        ttl_seconds: float = 3600,
+        max_entries: int = 256
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            similarity_threshold: Minimum cosine similarity for a hit
+            ttl_seconds: Lifetime of an entry
+            max_entries: Maximum number of entries (least recently used are evicted)
+        """
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._next_key = 0
+        self._lock = threading.Lock()
+
+    def get(self, embedding: List[float], user_state: str, history_key: str = "") -> Optional[str]:
+        """
+        Look up a response for a query.
+
+        Args:
+            embedding: Query embedding
+            user_state: Detected user state (only entries with the same state match)
+            history_key: Digest of the conversation history the answer depends on
+                (only entries with the same history match; "" for no history)
+
+        Returns:
+            Cached response or None
+        """
+        vector = self._normalize(embedding)
+
+        with self._lock:
+            self._evict_expired()
+
+            best_key = None
+            best_similarity = self.similarity_threshold
+            for key, entry in self._entries.items():
+                if entry["user_state"] != user_state or entry["history_key"] != history_key:
+                    continue
+                similarity = float(np.dot(vector, entry["vector"]))
+                if similarity >= best_similarity:
+                    best_key = key
+                    best_similarity = similarity
+
+            if best_key is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(best_key)
+            self.hits += 1
+            return self._entries[best_key]["response"]
+
+    def put(self, embedding: List[float], user_state: str, response: str, history_key: str = "") -> None:
+        """
+        Store a response.
+
+        Args:
+            embedding: Query embedding
+            user_state: Detected user state
+            response: Coach response
+            history_key: Digest of the conversation history the answer was generated with
+        """
+        with self._lock:
+            self._entries[self._next_key] = {
+                "vector": self._normalize(embedding),
+                "user_state": user_state,
+                "history_key": history_key,
+                "response": response,
+                "created": time.monotonic()
+            }
+            self._next_key += 1
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Get hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries)
+            }
+
+    def _evict_expired(self) -> None:
+        """Drop entries older than the TTL (caller holds the lock)."""
+        cutoff = time.monotonic() - self.ttl_seconds
+        expired = [key for key, entry in self._entries.items() if entry["created"] < cutoff]
+        for key in expired:
+            del self._entries[key]
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        """Convert an embedding to a unit-length float32 vector."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
@@ -0,0 +1,237 @@
+"""
+SQLite index of saved conversation sessions.
+Serves session listings and lookups without parsing every session file.
+"""
+
+import base64
+import json
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class SessionIndex:
+    """Summary table of sessions: ID, times, message count, title and summary."""
+
+    COLUMNS = ("session_id", "date", "start_time", "end_time", "message_count", "title", "summary", "file_mtime")
+
+    def __init__(self, db_path: str):
+        """
+        Initialize index (creates the database if needed).
+
+        Args:
+            db_path: Path of the SQLite database file
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sessions (
+                    session_id TEXT PRIMARY KEY,
+                    date TEXT,
+                    start_time TEXT NOT NULL,
+                    end_time TEXT,
+                    message_count INTEGER NOT NULL DEFAULT 0,
+                    title TEXT,
+                    summary TEXT,
+                    file_mtime REAL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_sessions_start ON sessions (start_time DESC, session_id DESC)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a short-lived connection (safe to use from any thread)."""
+        conn = sqlite3.connect(str(self.db_path), timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def upsert(self, entry: Dict) -> None:
+        """
+        Insert or replace a session summary.
+
+        Args:
+            entry: Dictionary with the index columns
+        """
+        values = [entry.get(column) for column in self.COLUMNS]
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO sessions ({', '.join(self.COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in self.COLUMNS)})",
+                values
+            )
+
+    def remove(self, session_id: str) -> None:
+        """Remove a session from the index."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        """Get the summary of one session."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return dict(row) if row else None
+
+    def list(self, limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        """
+        List session summaries, most recent first.
+
+        Args:
+            limit: Maximum number of sessions (all if None)
+            offset: Number of sessions to skip
+
+        Returns:
+            List of summary dictionaries
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM sessions ORDER BY start_time DESC, session_id DESC LIMIT ? OFFSET ?",
+                (limit if limit is not None else -1, offset)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def list_page(self, limit: int, cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        List one page of session summaries, most recent first.
+
+        Keyset pagination: the cursor encodes the position of the last
+        session of the previous page, so each page costs O(limit) no matter
+        how deep it is.
+
+        Args:
+            limit: Number of sessions per page
+            cursor: Cursor returned with the previous page (None for the first page)
+
+        Returns:
+            Tuple of (summaries, cursor of the next page or None on the last page)
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        query = "SELECT * FROM sessions"
+        params = []
+
+        if cursor:
+            start_time, session_id = self.decode_cursor(cursor)
+            query += " WHERE start_time < ? OR (start_time = ? AND session_id < ?)"
+            params += [start_time, start_time, session_id]
+
+        query += " ORDER BY start_time DESC, session_id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        with self._connect() as conn:
+            rows = [dict(row) for row in conn.execute(query, params).fetchall()]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self.encode_cursor(rows[-1]["start_time"], rows[-1]["session_id"])
+
+        return rows, next_cursor
+
+    @staticmethod
+    def encode_cursor(start_time: str, session_id: str) -> str:
+        """Encode a listing position as an opaque cursor."""
+        raw = json.dumps([start_time, session_id]).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[str, str]:
+        """Decode a cursor produced by encode_cursor."""
+        try:
+            start_time, session_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            return str(start_time), str(session_id)
+        except Exception:
+            raise ValueError(f"Invalid cursor: {cursor}")
+
+    def count(self) -> int:
+        """Get the number of indexed sessions."""
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def sync(self, history_path: Path) -> int:
+        """
+        Bring the index in line with the session files on disk.
+
+        Only files that are new or modified since they were indexed are
+        parsed; entries of deleted files are dropped.
+
+        Args:
+            history_path: Directory containing the session JSON files
+
+        Returns:
+            Number of files (re)indexed
+        """
+        with self._connect() as conn:
+            indexed = {
+                row["session_id"]: row["file_mtime"]
+                for row in conn.execute("SELECT session_id, file_mtime FROM sessions")
+            }
+
+        on_disk = set()
+        updated = 0
+
+        for session_file in Path(history_path).glob("*.json"):
+            session_id = session_file.stem
+            on_disk.add(session_id)
+            mtime = session_file.stat().st_mtime
+
+            if indexed.get(session_id) == mtime:
+                continue
+
+            try:
+                with open(session_file, 'r', encoding='utf-8') as f:
+                    session = json.load(f)
+            except Exception as e:
+                print(f"Error indexing session {session_file}: {e}")
+                continue
+
+            session.setdefault("session_id", session_id)
+            entry = self.entry_from_session(session, mtime)
+            entry["session_id"] = session_id
+            self.upsert(entry)
+            updated += 1
+
+        for session_id in set(indexed) - on_disk:
+            self.remove(session_id)
+
+        return updated
+
+    @staticmethod
+    def entry_from_session(session: Dict, file_mtime: Optional[float] = None) -> Dict:
+        """
+        Build an index entry from a full session dictionary.
+
+        Args:
+            session: Session data as saved on disk
+            file_mtime: Modification time of the session file
+
+        Returns:
+            Dictionary with the index columns
+        """
+        session_id = session["session_id"]
+        exchanges = session.get("exchanges", [])
+        end_time = session.get("end_time")
+        if not end_time and exchanges:
+            end_time = exchanges[-1].get("timestamp")
+
+        return {
+            "session_id": session_id,
+            "date": session.get("date"),
+            "start_time": session.get("start_time") or "",
+            "end_time": end_time,
+            "message_count": len(exchanges),
+            "title": session.get("title") or f"Session {session_id[:8]}",
+            "summary": session.get("summary", ""),
+            "file_mtime": file_mtime
+        }
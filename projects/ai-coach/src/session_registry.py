@@ -0,0 +1,239 @@
+"""
+Registry of live conversation sessions for the web API.
+Keeps one ConversationManager per session with idle eviction and a size cap.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from conversation_manager import ConversationManager
+
+
+class SessionRegistry:
+    """Thread-safe map of session ID -> ConversationManager."""
+
+    def __init__(
+        self,
+        history_path: str,
+        auto_ingest_every: int = 5,
+        idle_timeout_seconds: float = 1800,
+        max_sessions: int = 1000,
+        journal_fsync: bool = True,
+        compact_every: int = 50
+    ):
+        """
+        Initialize registry.
+
+        Args:
+            history_path: Path to store conversation history
+            auto_ingest_every: Auto-ingest into vectorstore every N conversations
+            idle_timeout_seconds: Sessions unused for this long are saved and dropped
+            max_sessions: Maximum number of sessions kept in memory
+            journal_fsync: Force each session journal append to disk
+            compact_every: Compact a session journal after this many exchanges
+        """
+        self.history_path = history_path
+        self.auto_ingest_every = auto_ingest_every
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.max_sessions = max_sessions
+        self.journal_fsync = journal_fsync
+        self.compact_every = compact_every
+
+        # session_id -> {"manager", "last_used", "active"}, least recently used first
+        self._sessions = OrderedDict()
+        # session_id -> event set once the evicted session is saved
+        self._evicting: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def create(self) -> ConversationManager:
+        """
+        Start a new session and register it.
+
+        Returns:
+            Conversation manager of the new session
+        """
+        manager = self._new_manager()
+        manager.start_new_session()
+
+        with self._lock:
+            self._register(manager)
+
+        self._enforce_limits()
+        return manager
+
+    def acquire(self, session_id: Optional[str] = None) -> ConversationManager:
+        """
+        Attach a connection to a session.
+
+        Reuses a live session, resumes a saved one, or starts a new session
+        when the ID is unknown, invalid or missing (compare the returned
+        manager's current_session_id with the requested one). Call release()
+        when done.
+
+        Args:
+            session_id: Session ID requested by the client
+
+        Returns:
+            Conversation manager of the session
+        """
+        manager = None
+
+        if session_id and not ConversationManager.is_valid_session_id(session_id):
+            print(f"Rejected invalid session ID: {session_id!r}")
+            session_id = None
+
+        if session_id:
+            while True:
+                with self._lock:
+                    entry = self._sessions.get(session_id)
+                    if entry is not None:
+                        entry["active"] += 1
+                        entry["last_used"] = time.monotonic()
+                        self._sessions.move_to_end(session_id)
+                        return entry["manager"]
+                    saving = self._evicting.get(session_id)
+
+                if saving is None:
+                    break
+                # Just evicted: resuming before its save completes would lose exchanges
+                saving.wait()
+
+            # Not in memory: try the history on disk
+            manager = self._new_manager()
+            try:
+                resumed = manager.resume_session(session_id)
+            except Exception as e:
+                print(f"Error resuming session {session_id}: {e}")
+                resumed = False
+            if not resumed:
+                manager = None
+
+        if manager is None:
+            manager = self._new_manager()
+            manager.start_new_session()
+
+        with self._lock:
+            existing = self._sessions.get(manager.current_session_id)
+            if existing is not None:
+                # Another connection resumed the same session meanwhile
+                manager = existing["manager"]
+            else:
+                self._register(manager)
+            entry = self._sessions[manager.current_session_id]
+            entry["active"] += 1
+            entry["last_used"] = time.monotonic()
+
+        self._enforce_limits()
+        return manager
+
+    def release(self, manager: ConversationManager) -> None:
+        """
+        Detach a connection from its session and save it.
+
+        Args:
+            manager: Conversation manager returned by acquire()
+        """
+        manager.save_session()
+
+        with self._lock:
+            entry = self._sessions.get(manager.current_session_id)
+            if entry is not None and entry["manager"] is manager:
+                entry["active"] = max(entry["active"] - 1, 0)
+                entry["last_used"] = time.monotonic()
+
+    def get(self, session_id: str) -> Optional[ConversationManager]:
+        """Get a live session without attaching to it."""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            return entry["manager"] if entry else None
+
+    def evict_idle(self) -> int:
+        """
+        Save and drop sessions with no connection that have been idle too long.
+
+        Returns:
+            Number of sessions evicted
+        """
+        cutoff = time.monotonic() - self.idle_timeout_seconds
+
+        with self._lock:
+            expired = [
+                session_id for session_id, entry in self._sessions.items()
+                if entry["active"] == 0 and entry["last_used"] < cutoff
+            ]
+            evicted = [self._evict(session_id) for session_id in expired]
+
+        self._save_evicted(evicted)
+
+        return len(evicted)
+
+    def stats(self) -> Dict[str, int]:
+        """Get number of live and connected sessions."""
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "active": sum(1 for entry in self._sessions.values() if entry["active"] > 0)
+            }
+
+    def save_all(self) -> None:
+        """Save every live session (e.g. on shutdown)."""
+        with self._lock:
+            managers = [entry["manager"] for entry in self._sessions.values()]
+
+        self._save_each(managers)
+
+    def _save_each(self, managers) -> None:
+        """Save sessions one by one; a failing session does not stop the others."""
+        for manager in managers:
+            try:
+                manager.save_session()
+            except Exception as e:
+                print(f"Error saving session {manager.current_session_id}: {e}")
+
+    def _enforce_limits(self) -> None:
+        """Evict idle sessions, then least recently used idle ones above the cap."""
+        self.evict_idle()
+
+        with self._lock:
+            evicted = []
+            for session_id in list(self._sessions):
+                if len(self._sessions) <= self.max_sessions:
+                    break
+                if self._sessions[session_id]["active"] == 0:
+                    evicted.append(self._evict(session_id))
+
+        self._save_evicted(evicted)
+
+    def _evict(self, session_id: str) -> ConversationManager:
+        """Drop a session, marking it as being saved (caller holds the lock)."""
+        self._evicting[session_id] = threading.Event()
+        return self._sessions.pop(session_id)["manager"]
+
+    def _save_evicted(self, managers) -> None:
+        """Save evicted sessions, letting acquire() resume each one once it is saved."""
+        for manager in managers:
+            try:
+                self._save_each([manager])
+            finally:
+                with self._lock:
+                    saved = self._evicting.pop(manager.current_session_id, None)
+                if saved is not None:
+                    saved.set()
+
+    def _register(self, manager: ConversationManager) -> None:
+        """Add a manager to the registry (caller holds the lock)."""
+        self._sessions[manager.current_session_id] = {
+            "manager": manager,
+            "last_used": time.monotonic(),
+            "active": 0
+        }
+
+    def _new_manager(self) -> ConversationManager:
+        """Create a conversation manager with the registry's settings."""
+        return ConversationManager(
+            self.history_path,
+            auto_ingest_every=self.auto_ingest_every,
+            journal_fsync=self.journal_fsync,
+            compact_every=self.compact_every
+        )
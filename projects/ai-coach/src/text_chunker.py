@@ -3,23 +3,102 @@ Text chunker for splitting documents into semantic chunks.
 Uses intelligent splitting to preserve context and meaning.
 """
 
-from typing import List, Dict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import re
 
 
+# Separates the tail copied from the previous chunk from the chunk's own text
+OVERLAP_MARKER = "\n...\n"
+
+# Compiled once: chunking runs on every ingested document
+PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+')
+
+# Whatever whitespace separated them, units packed in a chunk are joined with these
+PARAGRAPH_SEPARATOR = "\n\n"
+SENTENCE_SEPARATOR = " "
+
+
 class TextChunker:
     """Intelligent text chunker that preserves semantic meaning."""
 
-    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        token_counter=None,
+        max_tokens: Optional[int] = None
+    ):
         """
         Initialize chunker.
 
+        Without a token counter, sizes are in characters. With one, they are
+        in tokens, and max_tokens caps the full text of every chunk (overlap
+        included) so the embedder never truncates it.
+
         Args:
-            chunk_size: Target size for chunks (in characters)
-            chunk_overlap: Number of characters to overlap between chunks
+            chunk_size: Target size for chunks (in characters or tokens)
+            chunk_overlap: Size of the overlap between chunks (same unit)
+            token_counter: Token counter (see token_counter.py) enabling token mode
+            max_tokens: Maximum number of tokens of a chunk's text (token mode only)
+
+        Raises:
+            ValueError: If max_tokens leaves no room for chunk content
         """
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.token_counter = token_counter
+        self.max_tokens = max_tokens if token_counter is not None else None
+        # Shown by ingestion scripts, so chunks sized by estimates are visible
+        self.counter_name = "characters" if token_counter is None else f"tokens ({token_counter.name})"
+
+        if self.max_tokens is not None:
+            # The overlap and marker are embedded with the chunk: keep room for them
+            marker_tokens = token_counter.count(OVERLAP_MARKER)
+            room = self.max_tokens - self.chunk_overlap - marker_tokens
+            if room <= 0:
+                raise ValueError(
+                    f"max_tokens={max_tokens} leaves no room for chunks with "
+                    f"chunk_overlap={chunk_overlap}"
+                )
+            self.chunk_size = min(chunk_size, room)
+
+    @classmethod
+    def from_config(cls, config) -> "TextChunker":
+        """
+        Build the chunker described by the configuration.
+
+        Args:
+            config: Configuration object
+
+        Returns:
+            Character-based chunker, or token-based one if chunk_unit is "tokens"
+        """
+        if config.chunk_unit != "tokens":
+            return cls(chunk_size=config.chunk_size, chunk_overlap=config.chunk_overlap)
+
+        from token_counter import load_token_counter
+        from embeddings import embedding_tokenizer_path
+
+        # Default to the embedder's own tokenizer: its counts are the ones that matter
+        tokenizer = config.tokenizer or embedding_tokenizer_path(config)
+        token_counter = load_token_counter(tokenizer)
+
+        if not token_counter.exact:
+            print(
+                "\n⚠ WARNING: chunk_unit is \"tokens\" but no tokenizer could be loaded.\n"
+                "  Chunk sizes are ESTIMATED, so chunks may exceed embedding_max_tokens\n"
+                f"  ({config.embedding_max_tokens}) and be truncated by the embedder.\n"
+                "  Set \"tokenizer\" in settings.json to a tokenizer.json path to restore the limit.\n"
+            )
+
+        return cls(
+            chunk_size=config.chunk_size_tokens,
+            chunk_overlap=config.chunk_overlap_tokens,
+            token_counter=token_counter,
+            # [CLS] and [SEP] are added by the embedder
+            max_tokens=config.embedding_max_tokens - 2
+        )
 
     def chunk_text(self, text: str, metadata: Dict = None) -> List[Dict]:
         """
@@ -30,136 +109,220 @@ class TextChunker:
             metadata: Optional metadata to attach to each chunk
 
         Returns:
-            List of chunk dictionaries with text and metadata
+            List of chunk dictionaries with text, offsets and metadata
         """
-        if not text or not text.strip():
-            return []
-
-        # First, try to split on double newlines (paragraphs)
-        paragraphs = self._split_into_paragraphs(text)
-
-        # Build chunks from paragraphs
-        chunks = []
-        current_chunk = ""
-
-        for para in paragraphs:
-            # If paragraph itself is too large, split it further
-            if len(para) > self.chunk_size:
-                # First, add current chunk if it exists
-                if current_chunk:
-                    chunks.append(current_chunk)
-                    current_chunk = ""
-
-                # Split large paragraph
-                sub_chunks = self._split_large_paragraph(para)
-                chunks.extend(sub_chunks)
-            else:
-                # Try to add paragraph to current chunk
-                if len(current_chunk) + len(para) + 2 <= self.chunk_size:
-                    if current_chunk:
-                        current_chunk += "\n\n" + para
-                    else:
-                        current_chunk = para
-                else:
-                    # Current chunk is full, start new one
-                    if current_chunk:
-                        chunks.append(current_chunk)
-                    current_chunk = para
-
-        # Add final chunk
-        if current_chunk:
-            chunks.append(current_chunk)
-
-        # Add overlap between chunks
-        chunks_with_overlap = self._add_overlap(chunks)
-
-        # Build chunk dictionaries with metadata
-        chunk_dicts = []
-        for i, chunk_text in enumerate(chunks_with_overlap):
-            chunk_dict = {
-                "text": chunk_text,
-                "chunk_index": i,
-                "total_chunks": len(chunks_with_overlap)
-            }
+        chunks = list(self.iter_chunks(text, metadata))
 
-            # Add source metadata if provided
-            if metadata:
-                chunk_dict.update({
-                    f"source_{k}": v for k, v in metadata.items()
-                })
-
-            chunk_dicts.append(chunk_dict)
-
-        return chunk_dicts
-
-    def _split_into_paragraphs(self, text: str) -> List[str]:
-        """Split text into paragraphs on double newlines."""
-        # Split on double newlines, filter empty
-        paragraphs = re.split(r'\n\s*\n', text)
-        return [p.strip() for p in paragraphs if p.strip()]
-
-    def _split_large_paragraph(self, para: str) -> List[str]:
-        """Split a large paragraph into sentence-based chunks."""
-        # Split on sentence boundaries
-        sentences = re.split(r'(?<=[.!?])\s+', para)
-
-        chunks = []
-        current_chunk = ""
-
-        for sentence in sentences:
-            if len(current_chunk) + len(sentence) + 1 <= self.chunk_size:
-                if current_chunk:
-                    current_chunk += " " + sentence
-                else:
-                    current_chunk = sentence
-            else:
-                if current_chunk:
-                    chunks.append(current_chunk)
-
-                # If single sentence is too large, split it hard
-                if len(sentence) > self.chunk_size:
-                    hard_chunks = self._hard_split(sentence)
-                    chunks.extend(hard_chunks[:-1])
-                    current_chunk = hard_chunks[-1] if hard_chunks else ""
-                else:
-                    current_chunk = sentence
-
-        if current_chunk:
-            chunks.append(current_chunk)
+        for chunk in chunks:
+            chunk["total_chunks"] = len(chunks)
 
         return chunks
 
-    def _hard_split(self, text: str) -> List[str]:
-        """Hard split text into chunks (last resort)."""
-        chunks = []
-        for i in range(0, len(text), self.chunk_size):
-            chunks.append(text[i:i + self.chunk_size])
-        return chunks
+    def iter_chunks(self, text: str, metadata: Dict = None) -> Iterator[Dict]:
+        """
+        Split text into semantic chunks lazily.
 
-    def _add_overlap(self, chunks: List[str]) -> List[str]:
-        """Add overlap between consecutive chunks."""
-        if len(chunks) <= 1 or self.chunk_overlap == 0:
-            return chunks
+        Chunks are built from character offsets into the text in a single
+        pass: paragraphs are packed up to chunk_size, oversized paragraphs
+        are packed by sentence, and oversized sentences are cut hard.
+        Packed paragraphs are joined with a blank line and packed sentences
+        with a space, whatever whitespace separated them in the text. Each
+        chunk's text is prefixed with the tail of the previous chunk
+        (overlap) and OVERLAP_MARKER.
 
-        overlapped_chunks = [chunks[0]]
+        Args:
+            text: Text to split
+            metadata: Optional metadata to attach to each chunk
+
+        Yields:
+            Chunk dictionaries with text, chunk_index, start and end (span of
+            the chunk in the source text), length (of the chunk's own text,
+            which ends 'text') and source_* metadata ('total_chunks' is only
+            set by chunk_text)
+        """
+        if not text:
+            return
+
+        source_metadata = {f"source_{k}": v for k, v in (metadata or {}).items()}
+        previous_text = None
 
-        for i in range(1, len(chunks)):
-            prev_chunk = chunks[i - 1]
-            current_chunk = chunks[i]
+        for chunk_index, (pieces, separator) in enumerate(self._iter_chunk_spans(text)):
+            own_text = separator.join(text[piece_start:piece_end] for piece_start, piece_end in pieces)
+            chunk_text = own_text
 
-            # Take last N characters from previous chunk
-            overlap_text = prev_chunk[-self.chunk_overlap:] if len(prev_chunk) > self.chunk_overlap else prev_chunk
+            if previous_text is not None and self.chunk_overlap > 0:
+                with_overlap = self._overlap_text(previous_text) + OVERLAP_MARKER + own_text
+                # Tokenizers are not always additive: never let the overlap break the limit
+                if self.max_tokens is None or self.token_counter.count(with_overlap) <= self.max_tokens:
+                    chunk_text = with_overlap
 
-            # Try to start overlap at a word boundary
-            space_idx = overlap_text.find(' ')
-            if space_idx != -1:
-                overlap_text = overlap_text[space_idx + 1:]
+            chunk_dict = {
+                "text": chunk_text,
+                "chunk_index": chunk_index,
+                "start": pieces[0][0],
+                "end": pieces[-1][1],
+                "length": len(own_text)
+            }
+            chunk_dict.update(source_metadata)
+
+            previous_text = own_text
+            yield chunk_dict
+
+    def _size(self, text: str, start: int, end: int) -> int:
+        """Measure text[start:end] in the chunker's unit."""
+        if self.token_counter is None:
+            return end - start
+        return self.token_counter.count(text[start:end])
+
+    def _joined_size(self, size: int, unit_size: int, separator: str) -> int:
+        """Measure a chunk of the given size extended with one more unit."""
+        if self.token_counter is None:
+            # Characters: the separator counts too
+            return size + len(separator) + unit_size
+        # Tokens: whitespace separators add no token
+        return size + unit_size
+
+    def _iter_chunk_spans(self, text: str) -> Iterator[Tuple[List[Tuple[int, int]], str]]:
+        """Pack paragraphs into chunks, as (list of (start, end) spans, separator)."""
+        current = None  # (spans, size)
+
+        for para_start, para_end in self._iter_paragraph_spans(text):
+            para_size = self._size(text, para_start, para_end)
+
+            if para_size > self.chunk_size:
+                # Paragraph too large: close the current chunk and split it by sentence
+                if current is not None:
+                    yield current[0], PARAGRAPH_SEPARATOR
+                    current = None
+                yield from self._iter_sentence_chunk_spans(text, para_start, para_end)
+                continue
+
+            if current is not None:
+                joined_size = self._joined_size(current[1], para_size, PARAGRAPH_SEPARATOR)
+                if joined_size <= self.chunk_size:
+                    current[0].append((para_start, para_end))
+                    current = (current[0], joined_size)
+                    continue
+                # Current chunk is full, start new one
+                yield current[0], PARAGRAPH_SEPARATOR
+
+            current = ([(para_start, para_end)], para_size)
+
+        if current is not None:
+            yield current[0], PARAGRAPH_SEPARATOR
+
+    def _iter_paragraph_spans(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Find non-empty paragraphs (separated by blank lines) as stripped spans."""
+        position = 0
+
+        for match in PARAGRAPH_BREAK.finditer(text):
+            span = self._strip_span(text, position, match.start())
+            if span:
+                yield span
+            position = match.end()
+
+        span = self._strip_span(text, position, len(text))
+        if span:
+            yield span
+
+    def _iter_sentence_chunk_spans(
+        self,
+        text: str,
+        start: int,
+        end: int
+    ) -> Iterator[Tuple[List[Tuple[int, int]], str]]:
+        """Pack the sentences of a large paragraph into chunks."""
+        current = None  # (spans, size)
+
+        for sentence_start, sentence_end in self._iter_sentence_spans(text, start, end):
+            sentence_size = self._size(text, sentence_start, sentence_end)
+
+            if current is not None:
+                joined_size = self._joined_size(current[1], sentence_size, SENTENCE_SEPARATOR)
+                if joined_size <= self.chunk_size:
+                    current[0].append((sentence_start, sentence_end))
+                    current = (current[0], joined_size)
+                    continue
+                yield current[0], SENTENCE_SEPARATOR
+
+            if sentence_size <= self.chunk_size:
+                current = ([(sentence_start, sentence_end)], sentence_size)
+                continue
+
+            # Sentence too large: split it hard, the last piece stays open
+            pieces = self._hard_split_spans(text, sentence_start, sentence_end)
+            for piece_start, piece_end, _ in pieces[:-1]:
+                yield [(piece_start, piece_end)], SENTENCE_SEPARATOR
+            current = ([pieces[-1][:2]], pieces[-1][2])
+
+        if current is not None:
+            yield current[0], SENTENCE_SEPARATOR
+
+    def _hard_split_spans(self, text: str, start: int, end: int) -> List[Tuple[int, int, int]]:
+        """Cut text[start:end] into consecutive pieces of at most chunk_size (last resort)."""
+        if self.token_counter is None:
+            return [
+                (piece_start, min(piece_start + self.chunk_size, end), min(self.chunk_size, end - piece_start))
+                for piece_start in range(start, end, self.chunk_size)
+            ]
+
+        tokens = self.token_counter.token_spans(text, start, end)
+        if not tokens:
+            return [(start, end, 0)]
+
+        pieces = []
+        for first in range(0, len(tokens), self.chunk_size):
+            window = tokens[first:first + self.chunk_size]
+            pieces.append((window[0][0], window[-1][1], len(window)))
+        return pieces
+
+    @staticmethod
+    def _iter_sentence_spans(text: str, start: int, end: int) -> Iterator[Tuple[int, int]]:
+        """Find the sentences of text[start:end] as spans."""
+        sentence_start = start
+
+        for match in SENTENCE_BREAK.finditer(text, start, end):
+            yield (sentence_start, match.start())
+            sentence_start = match.end()
+
+        yield (sentence_start, end)
+
+    def _overlap_text(self, previous_text: str) -> str:
+        """Get the last chunk_overlap characters (or tokens) of the previous chunk, from a word boundary."""
+        if self.token_counter is None:
+            overlap_start = max(len(previous_text) - self.chunk_overlap, 0)
+        else:
+            tokens = self.token_counter.token_spans(previous_text)
+            overlap_start = tokens[-self.chunk_overlap][0] if len(tokens) > self.chunk_overlap else 0
+
+        # Try to start overlap at a word boundary
+        space_idx = previous_text.find(' ', overlap_start)
+        if space_idx != -1:
+            overlap_start = space_idx + 1
+
+        return previous_text[overlap_start:]
+
+    @staticmethod
+    def _strip_span(text: str, start: int, end: int) -> Optional[Tuple[int, int]]:
+        """Shrink a span to exclude leading and trailing whitespace (None if empty)."""
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        return (start, end) if start < end else None
+
+    def iter_chunk_documents(self, documents: Iterable[tuple]) -> Iterator[Dict]:
+        """
+        Chunk documents lazily, one document at a time.
 
-            # Combine with current chunk
-            overlapped_chunk = overlap_text + "\n...\n" + current_chunk
-            overlapped_chunks.append(overlapped_chunk)
+        Args:
+            documents: Iterable of (content, metadata) tuples
 
-        return overlapped_chunks
+        Yields:
+            Chunks of each document, in document order
+        """
+        for content, metadata in documents:
+            yield from self.chunk_text(content, metadata)
 
     def chunk_documents(self, documents: List[tuple]) -> List[Dict]:
         """
@@ -171,10 +334,4 @@ class TextChunker:
         Returns:
             List of all chunks from all documents
         """
-        all_chunks = []
-
-        for content, metadata in documents:
-            chunks = self.chunk_text(content, metadata)
-            all_chunks.extend(chunks)
-
-        return all_chunks
+        return list(self.iter_chunk_documents(documents))
@@ -0,0 +1,146 @@
+"""
+Token counting for chunking and prompt budgets.
+Uses a Hugging Face tokenizer when one is available, with a fast
+heuristic estimator as fallback.
+"""
+
+import math
+import re
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+
+# Words and single punctuation marks: whitespace never belongs to a token
+WORD_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of LLM tokens of a text (about 4 characters per token).
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Estimated token count
+    """
+    return math.ceil(len(text) / 4)
+
+
+class HeuristicTokenCounter:
+    """
+    Tokenizer-free estimator.
+
+    Words are counted as pieces of chars_per_token characters and each
+    punctuation mark as one token. This is only an estimate: WordPiece
+    splits rare and accented words into short pieces, so the default of 2
+    characters leaves a margin but does not guarantee that a chunk fits the
+    embedder. Use the model's tokenizer when it is available.
+    """
+
+    name = "heuristic"
+    # Counts are estimates: a token limit is not guaranteed
+    exact = False
+
+    def __init__(self, chars_per_token: int = 2):
+        """
+        Initialize estimator.
+
+        Args:
+            chars_per_token: Characters of a word counted as one token
+        """
+        self.chars_per_token = chars_per_token
+
+    def count(self, text: str) -> int:
+        """Estimate the number of tokens of a text."""
+        return sum(
+            -(-(match.end() - match.start()) // self.chars_per_token)
+            for match in WORD_PATTERN.finditer(text)
+        )
+
+    def token_spans(self, text: str, start: int = 0, end: Optional[int] = None) -> List[Tuple[int, int]]:
+        """
+        Get the character spans of the estimated tokens of text[start:end].
+
+        Args:
+            text: Text containing the range
+            start: Start offset of the range
+            end: End offset of the range (end of text if None)
+
+        Returns:
+            List of (start, end) offsets into text, one per token
+        """
+        end = len(text) if end is None else end
+        spans = []
+        for match in WORD_PATTERN.finditer(text, start, end):
+            for piece_start in range(match.start(), match.end(), self.chars_per_token):
+                spans.append((piece_start, min(piece_start + self.chars_per_token, match.end())))
+        return spans
+
+
+class HFTokenCounter:
+    """Exact counts from a Hugging Face `tokenizers` tokenizer (special tokens excluded)."""
+
+    exact = True
+
+    def __init__(self, tokenizer, name: str = "huggingface"):
+        """
+        Initialize counter.
+
+        Args:
+            tokenizer: tokenizers.Tokenizer instance
+            name: Name shown in logs
+        """
+        # Counts must reflect the whole text, not a truncated or padded encoding
+        tokenizer.no_truncation()
+        tokenizer.no_padding()
+        self.tokenizer = tokenizer
+        self.name = name
+
+    def count(self, text: str) -> int:
+        """Count the tokens of a text."""
+        return len(self.tokenizer.encode(text, add_special_tokens=False).ids)
+
+    def token_spans(self, text: str, start: int = 0, end: Optional[int] = None) -> List[Tuple[int, int]]:
+        """
+        Get the character spans of the tokens of text[start:end].
+
+        Args:
+            text: Text containing the range
+            start: Start offset of the range
+            end: End offset of the range (end of text if None)
+
+        Returns:
+            List of (start, end) offsets into text, one per token
+        """
+        end = len(text) if end is None else end
+        encoding = self.tokenizer.encode(text[start:end], add_special_tokens=False)
+        return [(start + token_start, start + token_end) for token_start, token_end in encoding.offsets]
+
+
+def load_token_counter(tokenizer: Optional[str] = None):
+    """
+    Load a token counter.
+
+    Args:
+        tokenizer: Path of a tokenizer.json file or name of a Hugging Face
+            model; None selects the heuristic estimator (see
+            embeddings.embedding_tokenizer_path for the embedder's own)
+
+    Returns:
+        HFTokenCounter, or HeuristicTokenCounter if no tokenizer is configured
+        or it cannot be loaded
+    """
+    if not tokenizer:
+        return HeuristicTokenCounter()
+
+    try:
+        from tokenizers import Tokenizer
+
+        if Path(tokenizer).exists():
+            return HFTokenCounter(Tokenizer.from_file(str(tokenizer)), name=Path(tokenizer).name)
+        return HFTokenCounter(Tokenizer.from_pretrained(tokenizer), name=tokenizer)
+
+    except Exception as e:
+        print(f"Tokenizer {tokenizer} unavailable ({e}), using token estimates instead")
+        return HeuristicTokenCounter()
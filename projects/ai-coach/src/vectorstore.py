@@ -3,61 +3,356 @@ Vectorstore wrapper for ChromaDB.
 Manages collections, embeddings, and semantic search.
 """
 
-import chromadb
-from chromadb.config import Settings
-from typing import List, Dict, Optional
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Tuple
 from pathlib import Path
+from lexical_index import LexicalIndex
+from embeddings import ChromaDefaultEmbedding, LazyEmbedding
+from embedding_cache import EmbeddingCache
+
+
+class _AdaptiveBatchSize:
+    """Batch size that grows while embedding throughput keeps improving."""
+
+    def __init__(self, initial: int, maximum: int):
+        self.size = initial
+        self.maximum = max(maximum, initial)
+        self._last_rate = None
+        self._settled = False
+
+    def update(self, num_chunks: int, seconds: float) -> None:
+        """Record a full batch and pick the size of the next one."""
+        if self._settled or num_chunks < self.size or seconds <= 0:
+            # Partial (last) batch or unmeasurable: not representative
+            return
+
+        rate = num_chunks / seconds
+        if self._last_rate is not None and rate < self._last_rate * 0.95:
+            # Larger batches stopped paying off: step back and keep that size
+            self.size = max(self.size // 2, 1)
+            self._settled = True
+        else:
+            self.size = min(self.size * 2, self.maximum)
+        self._last_rate = rate
 
 
 class VectorStore:
     """Wrapper for ChromaDB vector database."""
 
-    def __init__(self, persist_directory: str):
+    # HNSW parameters accepted in collections_config.json, with their Chroma metadata key
+    HNSW_METADATA_KEYS = {
+        "M": "hnsw:M",
+        "construction_ef": "hnsw:construction_ef",
+        "search_ef": "hnsw:search_ef"
+    }
+
+    def __init__(
+        self,
+        persist_directory: str,
+        query_cache_size: int = 128,
+        embedding_function=None,
+        embedding_cache: Optional[EmbeddingCache] = None
+    ):
         """
-        Initialize ChromaDB client.
+        Initialize vectorstore (the ChromaDB client is created on first use).
 
         Args:
             persist_directory: Directory to persist the database
+            query_cache_size: Number of query embeddings to keep in memory (0 disables the cache)
+            embedding_function: Embedding backend (see embeddings.py); Chroma's default model if None
+            embedding_cache: Persistent cache of chunk embeddings (None disables it)
         """
         self.persist_directory = Path(persist_directory)
         self.persist_directory.mkdir(parents=True, exist_ok=True)
 
-        # Initialize ChromaDB client with persistence
-        self.client = chromadb.PersistentClient(
-            path=str(self.persist_directory)
-        )
+        # Importing chromadb and opening the database take about a second
+        self._client = None
+        self._client_lock = threading.Lock()
 
         self.collections = {}
+        self.last_add_stats = {}
 
-    def create_collection(self, name: str, metadata: Dict = None) -> None:
+        # Every write and query passes vectors computed here, so collections
+        # never fall back to their own embedding function
+        self.embedding_function = embedding_function or LazyEmbedding(
+            ChromaDefaultEmbedding, model_id=ChromaDefaultEmbedding.model_id
+        )
+        self.embedding_cache = embedding_cache
+
+        # LRU of query embeddings keyed by normalized text
+        self.query_cache_size = query_cache_size
+        self._query_cache = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+
+        # BM25 index of the same chunks, updated with every write
+        self.lexical_index = LexicalIndex(self.persist_directory / "lexical_index.sqlite")
+
+    @property
+    def client(self):
+        """ChromaDB client with persistence, created on first access."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    import chromadb
+
+                    self._client = chromadb.PersistentClient(
+                        path=str(self.persist_directory)
+                    )
+        return self._client
+
+    def has_database(self) -> bool:
+        """Check if a ChromaDB database exists on disk, without opening it."""
+        return (self.persist_directory / "chroma.sqlite3").exists()
+
+    def create_collection(self, name: str, metadata: Dict = None, hnsw: Optional[Dict] = None) -> None:
         """
         Create or get a collection.
 
+        HNSW parameters only apply when the collection is created; use
+        rebuild_collection to change them on an existing collection.
+
         Args:
             name: Collection name
             metadata: Optional metadata for the collection
+            hnsw: Optional HNSW parameters (M, construction_ef, search_ef)
         """
         collection_metadata = metadata or {}
         collection_metadata["hnsw:space"] = "cosine"  # Use cosine similarity
+        collection_metadata["embedding_model"] = self._model_id()
+        collection_metadata.update(self._hnsw_metadata(hnsw))
 
         self.collections[name] = self.client.get_or_create_collection(
             name=name,
             metadata=collection_metadata
         )
 
+        # An existing collection keeps the parameters it was built with
+        current = self.get_hnsw_params(name)
+        stale = {key: value for key, value in (hnsw or {}).items() if current.get(key) != int(value)}
+        if stale:
+            print(
+                f"Warning: collection {name} uses HNSW {current}, configuration asks for {stale}; "
+                f"run scripts/rebuild_index.py {name} to apply it"
+            )
+
+    def _hnsw_metadata(self, hnsw: Optional[Dict]) -> Dict:
+        """
+        Convert HNSW parameters to Chroma collection metadata.
+
+        Args:
+            hnsw: HNSW parameters (M, construction_ef, search_ef)
+
+        Returns:
+            Metadata entries
+        """
+        metadata = {}
+        for key, value in (hnsw or {}).items():
+            if key not in self.HNSW_METADATA_KEYS:
+                raise ValueError(
+                    f"Unknown HNSW parameter {key} (expected one of {', '.join(self.HNSW_METADATA_KEYS)})"
+                )
+            metadata[self.HNSW_METADATA_KEYS[key]] = int(value)
+        return metadata
+
+    def get_hnsw_params(self, name: str) -> Dict:
+        """
+        Get the HNSW parameters a collection was built with.
+
+        Args:
+            name: Collection name
+
+        Returns:
+            Dictionary with M, construction_ef and search_ef (empty if the collection does not exist)
+        """
+        collection = self.load_collection(name)
+        if collection is None:
+            return {}
+
+        hnsw = (collection.configuration or {}).get("hnsw") or {}
+        return {
+            "M": hnsw.get("max_neighbors"),
+            "construction_ef": hnsw.get("ef_construction"),
+            "search_ef": hnsw.get("ef_search")
+        }
+
+    def rebuild_collection(self, name: str, hnsw: Optional[Dict] = None, page_size: int = 1000) -> Dict:
+        """
+        Re-index a collection with new HNSW parameters.
+
+        Chunks are copied with their stored embeddings (nothing is embedded
+        again) into a new collection, which then replaces the old one. ChromaDB
+        has no transactions, so the swap is two renames: the old collection
+        is renamed aside, the new one takes its name, and only then is the
+        old one deleted. If the second rename fails, the first is undone.
+
+        Args:
+            name: Collection name
+            hnsw: HNSW parameters of the new index (M, construction_ef, search_ef)
+            page_size: Number of chunks copied at once
+
+        Returns:
+            Dictionary with chunks copied, old and new parameters, and seconds
+        """
+        old_collection = self.load_collection(name)
+        if old_collection is None:
+            raise ValueError(f"Collection {name} does not exist")
+
+        start_time = time.perf_counter()
+        old_params = self.get_hnsw_params(name)
+        count = old_collection.count()
+
+        # Keep description and embedding model, replace the index parameters
+        metadata = {
+            key: value
+            for key, value in (old_collection.metadata or {}).items()
+            if not key.startswith("hnsw:")
+        }
+        metadata["hnsw:space"] = "cosine"
+        metadata.update(self._hnsw_metadata(hnsw))
+
+        rebuild_name = f"{name}__rebuild"
+        backup_name = f"{name}__old"
+        for leftover in (rebuild_name, backup_name):
+            # Remains of an interrupted rebuild
+            if leftover in self.list_collections():
+                self.client.delete_collection(name=leftover)
+
+        new_collection = self.client.create_collection(name=rebuild_name, metadata=metadata)
+
+        try:
+            for offset in range(0, count, page_size):
+                page = old_collection.get(
+                    include=["documents", "metadatas", "embeddings"],
+                    limit=page_size,
+                    offset=offset
+                )
+                if page["ids"]:
+                    new_collection.add(
+                        ids=page["ids"],
+                        documents=page["documents"],
+                        metadatas=page["metadatas"],
+                        embeddings=page["embeddings"]
+                    )
+
+            if new_collection.count() != count:
+                raise RuntimeError(
+                    f"Rebuild of {name} copied {new_collection.count()} chunks instead of {count}"
+                )
+        except Exception:
+            self.client.delete_collection(name=rebuild_name)
+            raise
+
+        # Swap in the new collection
+        old_collection.modify(name=backup_name)
+        try:
+            new_collection.modify(name=name)
+        except Exception:
+            old_collection.modify(name=name)
+            self.client.delete_collection(name=rebuild_name)
+            raise
+        self.client.delete_collection(name=backup_name)
+
+        # Same names and IDs: the lexical index stays valid
+        self.collections.pop(name, None)
+        self.load_collection(name)
+
+        return {
+            "chunks": count,
+            "old": old_params,
+            "new": self.get_hnsw_params(name),
+            "seconds": time.perf_counter() - start_time
+        }
+
+    def load_collection(self, name: str):
+        """
+        Get a collection, loading it from the database on first use.
+
+        Warns when the collection was built with another embedding model,
+        since its vectors would not be comparable with the query vectors.
+
+        Args:
+            name: Collection name
+
+        Returns:
+            Chroma collection, or None if it does not exist
+        """
+        if name in self.collections:
+            return self.collections[name]
+
+        try:
+            collection = self.client.get_collection(name)
+        except Exception:
+            return None
+
+        self._register_collection(collection)
+        return collection
+
+    def load_collections(self, names: Iterable[str]) -> List[str]:
+        """
+        Load several collections with a single listing of the database.
+
+        Args:
+            names: Collection names
+
+        Returns:
+            Names of the collections that exist
+        """
+        wanted = [name for name in names if name not in self.collections]
+        if wanted:
+            for collection in self.client.list_collections():
+                if collection.name in wanted:
+                    self._register_collection(collection)
+
+        return [name for name in names if name in self.collections]
+
+    def _register_collection(self, collection) -> None:
+        """Cache a collection, warning if it was embedded with another model."""
+        name = collection.name
+        stored_model = (collection.metadata or {}).get("embedding_model")
+        if stored_model and stored_model != self._model_id():
+            print(
+                f"Warning: collection {name} was embedded with {stored_model}, "
+                f"current model is {self._model_id()}; re-ingest it with --full"
+            )
+
+        self.collections[name] = collection
+
+    def _model_id(self) -> str:
+        """Get the identifier of the embedding model."""
+        return getattr(self.embedding_function, "model_id", type(self.embedding_function).__name__)
+
     def add_chunks(
         self,
         collection_name: str,
-        chunks: List[Dict],
-        batch_size: int = 100
+        chunks: Iterable[Dict],
+        batch_size: int = 100,
+        pipelined: bool = True,
+        max_batch_size: int = 1000,
+        on_batch_stored: Optional[Callable[[int], None]] = None
     ) -> int:
         """
         Add chunks to a collection.
 
+        Chunks are consumed lazily, so a generator is never held in memory
+        beyond one batch. In pipelined mode, embeddings for the next batch are
+        computed on a background thread while the current batch is written,
+        and the batch size adapts to the measured embedding throughput.
+        Texts already in the embedding cache are not embedded again.
+        Throughput of the call is kept in last_add_stats.
+
         Args:
             collection_name: Name of the collection
-            chunks: List of chunk dictionaries (must have 'text' field)
-            batch_size: Number of chunks to add at once
+            chunks: Iterable of chunk dictionaries (must have 'text' field)
+            batch_size: Number of chunks to add at once (initial size when pipelined)
+            pipelined: Overlap embedding of batch N+1 with the write of batch N
+            max_batch_size: Upper bound for the adaptive batch size
+            on_batch_stored: Called with the number of chunks of each batch once
+                it is written (on the calling thread)
 
         Returns:
             Number of chunks added
@@ -65,52 +360,244 @@ class VectorStore:
         if collection_name not in self.collections:
             raise ValueError(f"Collection {collection_name} not initialized")
 
-        collection = self.collections[collection_name]
-
-        # Process in batches
+        chunk_iter = iter(chunks)
+        start_time = time.perf_counter()
         total_added = 0
-        for i in range(0, len(chunks), batch_size):
-            batch = chunks[i:i + batch_size]
-
-            # Extract texts and metadata
-            texts = [chunk["text"] for chunk in batch]
-            metadatas = []
-            ids = []
-
-            for j, chunk in enumerate(batch):
-                # Create unique ID
-                chunk_id = f"{collection_name}_{i + j}_{hash(chunk['text'][:100])}"
-                ids.append(chunk_id)
-
-                # Prepare metadata (ChromaDB requires all values to be strings, ints, or floats)
-                metadata = {}
-                for key, value in chunk.items():
-                    if key != "text":
-                        # Convert to string if complex type
-                        if isinstance(value, (str, int, float, bool)):
-                            metadata[key] = value
-                        else:
-                            metadata[key] = str(value)
-
-                metadatas.append(metadata)
-
-            # Add to collection
-            collection.add(
-                documents=texts,
-                metadatas=metadatas,
-                ids=ids
+        total_embedded = 0
+
+        if not pipelined:
+            while True:
+                batch = self._prepare_batch(collection_name, chunk_iter, batch_size)
+                if batch is None:
+                    break
+                _, _, num_embedded = self._embed_batch(batch)
+                total_embedded += num_embedded
+
+                # Add to collection (existing IDs are overwritten)
+                self._call_collection(collection_name, "upsert", missing_ok=False, **batch)
+                self.lexical_index.add(collection_name, batch["ids"], batch["documents"])
+                total_added += len(batch["ids"])
+                if on_batch_stored:
+                    on_batch_stored(len(batch["ids"]))
+        else:
+            sizer = _AdaptiveBatchSize(batch_size, max_batch_size)
+
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed") as executor:
+                batch = self._prepare_batch(collection_name, chunk_iter, sizer.size)
+                pending = executor.submit(self._embed_batch, batch) if batch else None
+
+                while pending is not None:
+                    batch, embed_seconds, num_embedded = pending.result()
+                    total_embedded += num_embedded
+                    # Batches partly served by the cache say nothing about inference speed
+                    if num_embedded == len(batch["ids"]):
+                        sizer.update(num_embedded, embed_seconds)
+
+                    # Start embedding the next batch before writing this one
+                    next_batch = self._prepare_batch(collection_name, chunk_iter, sizer.size)
+                    pending = executor.submit(self._embed_batch, next_batch) if next_batch else None
+
+                    self._call_collection(collection_name, "upsert", missing_ok=False, **batch)
+                    self.lexical_index.add(collection_name, batch["ids"], batch["documents"])
+                    total_added += len(batch["ids"])
+                    if on_batch_stored:
+                        on_batch_stored(len(batch["ids"]))
+
+        elapsed = time.perf_counter() - start_time
+        self.last_add_stats = {
+            "chunks": total_added,
+            "seconds": elapsed,
+            "chunks_per_second": total_added / elapsed if elapsed > 0 else 0.0,
+            "cached": total_added - total_embedded,
+            "batch_size": sizer.size if pipelined else batch_size
+        }
+
+        return total_added
+
+    def _prepare_batch(self, collection_name: str, chunk_iter: Iterator[Dict], size: int) -> Optional[Dict]:
+        """
+        Take the next batch of chunks and build IDs, texts and metadata.
+
+        Args:
+            collection_name: Name of the collection
+            chunk_iter: Iterator over chunk dictionaries
+            size: Maximum number of chunks in the batch
+
+        Returns:
+            Keyword arguments for collection.upsert, or None when exhausted
+        """
+        batch = list(islice(chunk_iter, size))
+        if not batch:
+            return None
+
+        # Extract texts and metadata
+        texts = [chunk["text"] for chunk in batch]
+        metadatas = []
+        ids = []
+
+        for chunk in batch:
+            # Deterministic ID so re-ingesting the same chunk replaces it
+            ids.append(self.make_chunk_id(collection_name, chunk))
+
+            # Prepare metadata (ChromaDB requires all values to be strings, ints, or floats)
+            metadata = {}
+            for key, value in chunk.items():
+                if key != "text":
+                    # Convert to string if complex type
+                    if isinstance(value, (str, int, float, bool)):
+                        metadata[key] = value
+                    else:
+                        metadata[key] = str(value)
+
+            metadatas.append(metadata)
+
+        return {"ids": ids, "documents": texts, "metadatas": metadatas}
+
+    def _embed_batch(self, batch: Dict) -> Tuple[Dict, float, int]:
+        """
+        Compute embeddings for a prepared batch.
+
+        Vectors found in the embedding cache are reused; only the other
+        texts go through the model, and their vectors are then cached.
+
+        Args:
+            batch: Batch built by _prepare_batch (gets an 'embeddings' field)
+
+        Returns:
+            Tuple of (batch, seconds spent, number of texts actually embedded)
+        """
+        start_time = time.perf_counter()
+        texts = batch["documents"]
+
+        if self.embedding_cache is None:
+            embeddings = [None] * len(texts)
+        else:
+            embeddings = self.embedding_cache.get_many(self._model_id(), texts)
+
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            computed = [
+                [float(x) for x in embedding]
+                for embedding in self.embedding_function([texts[i] for i in missing])
+            ]
+            for i, embedding in zip(missing, computed):
+                embeddings[i] = embedding
+
+            if self.embedding_cache is not None:
+                self.embedding_cache.put_many(self._model_id(), [texts[i] for i in missing], computed)
+
+        batch["embeddings"] = embeddings
+        return batch, time.perf_counter() - start_time, len(missing)
+
+    @staticmethod
+    def make_chunk_id(collection_name: str, chunk: Dict) -> str:
+        """
+        Build a stable chunk ID from its source, position and text.
+
+        Args:
+            collection_name: Name of the collection
+            chunk: Chunk dictionary
+
+        Returns:
+            Chunk ID, identical across processes for identical input
+        """
+        source = chunk.get("source_file_path") or chunk.get("source_session_id") or ""
+        key = f"{collection_name}\0{source}\0{chunk.get('chunk_index', '')}\0{chunk['text']}"
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return f"{collection_name}_{digest[:32]}"
+
+    def delete_chunks(
+        self,
+        collection_name: str,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict] = None
+    ) -> None:
+        """
+        Delete chunks from a collection by ID or metadata filter.
+
+        Args:
+            collection_name: Name of the collection
+            ids: Chunk IDs to delete
+            where: Metadata filter selecting chunks to delete
+        """
+        if self.load_collection(collection_name) is None:
+            return
+
+        if not ids and not where:
+            return
+
+        if not ids:
+            # Resolve the filter so the lexical index drops the same chunks
+            found = self._call_collection(collection_name, "get", where=where, include=[])
+            ids = found["ids"] if found else []
+            if not ids:
+                return
+
+        self._call_collection(collection_name, "delete", missing_ok=False, ids=ids)
+        self.lexical_index.remove(collection_name, ids)
+
+    def sync_lexical_index(self, collection_name: str, page_size: int = 1000) -> bool:
+        """
+        Rebuild the lexical index of a collection if it is out of step with ChromaDB.
+
+        Covers collections ingested before the lexical index existed.
+
+        Args:
+            collection_name: Name of the collection
+            page_size: Number of chunks read from ChromaDB at once
+
+        Returns:
+            True if the index was rebuilt
+        """
+        count = self.get_collection_count(collection_name)
+        if self.lexical_index.count(collection_name) == count:
+            return False
+
+        self.lexical_index.remove_collection(collection_name)
+
+        for offset in range(0, count, page_size):
+            page = self._call_collection(
+                collection_name, "get", missing_ok=False, include=["documents"], limit=page_size, offset=offset
             )
+            self.lexical_index.add(collection_name, page["ids"], page["documents"])
 
-            total_added += len(batch)
+        return True
 
-        return total_added
+    def embed_query(self, query: str) -> List[float]:
+        """
+        Compute the embedding of a query, reusing a cached vector when possible.
+
+        Args:
+            query: Query text
+
+        Returns:
+            Query embedding
+        """
+        key = " ".join(query.split())
+
+        with self._query_cache_lock:
+            if key in self._query_cache:
+                self._query_cache.move_to_end(key)
+                return self._query_cache[key]
+
+        embedding = [float(x) for x in self.embedding_function([key])[0]]
+
+        if self.query_cache_size > 0:
+            with self._query_cache_lock:
+                self._query_cache[key] = embedding
+                self._query_cache.move_to_end(key)
+                while len(self._query_cache) > self.query_cache_size:
+                    self._query_cache.popitem(last=False)
+
+        return embedding
 
     def search(
         self,
         collection_name: str,
         query: str,
         n_results: int = 5,
-        where: Optional[Dict] = None
+        where: Optional[Dict] = None,
+        query_embedding: Optional[List[float]] = None
     ) -> List[Dict]:
         """
         Search for similar chunks in a collection.
@@ -120,35 +607,39 @@ class VectorStore:
             query: Query text
             n_results: Number of results to return
             where: Optional metadata filter
+            query_embedding: Precomputed query embedding (computed from query if omitted)
 
         Returns:
             List of results with text, metadata, and distance
         """
-        if collection_name not in self.collections:
-            # Try to load the collection
-            try:
-                self.collections[collection_name] = self.client.get_collection(collection_name)
-            except Exception:
-                return []
+        if self.load_collection(collection_name) is None:
+            return []
 
-        collection = self.collections[collection_name]
+        if query_embedding is None:
+            query_embedding = self.embed_query(query)
 
         # Perform query
-        results = collection.query(
-            query_texts=[query],
+        results = self._call_collection(
+            collection_name,
+            "query",
+            query_embeddings=[query_embedding],
             n_results=n_results,
             where=where
         )
+        if results is None:
+            return []
 
         # Format results
         formatted_results = []
         if results and results['documents'] and len(results['documents']) > 0:
+            ids = results['ids'][0]
             documents = results['documents'][0]
             metadatas = results['metadatas'][0] if results['metadatas'] else []
             distances = results['distances'][0] if results['distances'] else []
 
             for i, doc in enumerate(documents):
                 result = {
+                    "id": ids[i],
                     "text": doc,
                     "metadata": metadatas[i] if i < len(metadatas) else {},
                     "distance": distances[i] if i < len(distances) else None
@@ -157,20 +648,94 @@ class VectorStore:
 
         return formatted_results
 
+    def lexical_search(self, collection_name: str, query: str, n_results: int = 5) -> List[Dict]:
+        """
+        Search a collection with BM25 over exact terms.
+
+        Args:
+            collection_name: Name of the collection
+            query: Query text
+            n_results: Number of results to return
+
+        Returns:
+            List of results with id, text, metadata and BM25 score, best first
+        """
+        if self.load_collection(collection_name) is None:
+            return []
+
+        hits = self.lexical_index.search(collection_name, query, n_results)
+        if not hits:
+            return []
+
+        found = self._call_collection(
+            collection_name,
+            "get",
+            ids=[chunk_id for chunk_id, _ in hits],
+            include=["documents", "metadatas"]
+        )
+        if found is None:
+            return []
+
+        by_id = {
+            chunk_id: (document, metadata)
+            for chunk_id, document, metadata in zip(found["ids"], found["documents"], found["metadatas"])
+        }
+
+        return [
+            {
+                "id": chunk_id,
+                "text": by_id[chunk_id][0],
+                "metadata": by_id[chunk_id][1] or {},
+                "score": score
+            }
+            for chunk_id, score in hits
+            if chunk_id in by_id
+        ]
+
+    def _call_collection(self, collection_name: str, method: str, missing_ok: bool = True, **kwargs):
+        """
+        Call a method of a cached collection (reads and writes alike).
+
+        When another process rebuilt the collection, the cached handle points
+        to a deleted collection: it is reloaded by name and the call retried once.
+
+        Args:
+            collection_name: Name of the collection
+            method: Collection method to call
+            missing_ok: Return None instead of raising if the collection no
+                longer exists (writes pass False so data is never dropped silently)
+            **kwargs: Arguments of the method
+
+        Returns:
+            Result of the call, or None if the collection no longer exists
+
+        Raises:
+            ValueError: If the collection no longer exists and missing_ok is False
+        """
+        from chromadb.errors import NotFoundError
+
+        try:
+            return getattr(self.collections[collection_name], method)(**kwargs)
+        except NotFoundError:
+            self.collections.pop(collection_name, None)
+            collection = self.load_collection(collection_name)
+            if collection is None:
+                if missing_ok:
+                    return None
+                raise ValueError(f"Collection {collection_name} no longer exists")
+            return getattr(collection, method)(**kwargs)
+
     def get_collection_count(self, collection_name: str) -> int:
         """Get the number of items in a collection."""
-        if collection_name not in self.collections:
-            try:
-                self.collections[collection_name] = self.client.get_collection(collection_name)
-            except Exception:
-                return 0
+        if self.load_collection(collection_name) is None:
+            return 0
 
-        collection = self.collections[collection_name]
-        return collection.count()
+        return self._call_collection(collection_name, "count") or 0
 
     def delete_collection(self, collection_name: str) -> None:
         """Delete a collection."""
         self.client.delete_collection(name=collection_name)
+        self.lexical_index.remove_collection(collection_name)
         if collection_name in self.collections:
             del self.collections[collection_name]
 